@@ -0,0 +1,113 @@
+"""
+Orcamento de alocacao por mensagem de chat emitida (tracemalloc).
+
+Uso (na raiz do projeto):
+    python -m benchmarks.bench_event_alloc
+    python -m benchmarks.bench_event_alloc --budget 1024 --messages 2000
+
+Emite mensagens de chat pelo mesmo caminho do chat_ingest (_emit_chat_events)
+com assinantes tipicos (workflow em `chat.*`, painel, filtros) e mede o pico
+de bytes alocados durante cada emissao. Sai com codigo 1 se a media passar do
+orcamento.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import tracemalloc
+from typing import Any
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core import event_bus as event_bus_mod  # noqa: E402
+from core.event_bus import Event, EventBus, EventFilter  # noqa: E402
+
+
+DEFAULT_BUDGET_BYTES = 1024
+
+
+try:
+    from core.chat_ingest import _emit_chat_events  # noqa: E402
+except Exception:
+    # chat_ingest puxa dependencias de voz/LLM; sem elas, replica os topicos.
+    _emit_chat_events = None
+
+
+def _emit_chat_message(platform: str, kind: str, payload: dict[str, Any]) -> None:
+    if _emit_chat_events is not None:
+        _emit_chat_events(platform, kind, payload)
+        return
+    topics = [
+        "chat.message",
+        "chat.message.received",
+        f"chat.{platform}.message.received",
+        "message.received",
+    ]
+    if kind != "message":
+        topics += [f"chat.message.{kind}", f"chat.{platform}.{kind}", f"message.{kind}"]
+    event_bus_mod.emit_many(topics, payload, source=f"chat_ingest:{platform}")
+
+
+def _noop(_event: Event) -> None:
+    return None
+
+
+def measure(messages: int) -> float:
+    bus = EventBus(max_history=1000)
+    event_bus_mod.event_bus = bus
+    bus.subscribe("chat.*", _noop, subscriber_id="workflow_engine")
+    bus.subscribe("message.*", _noop, subscriber_id="panel")
+    bus.subscribe(
+        "chat.*",
+        _noop,
+        filters=[EventFilter(event="chat.message.superchat", condition="event.get('text', '') != ''")],
+    )
+
+    payloads = [
+        {
+            "platform": "twitch",
+            "user": f"user{idx % 50}",
+            "text": "oi luna",
+            "payload": f"[twitch/user{idx % 50}]: oi luna",
+            "kind": "superchat" if idx % 10 == 0 else "message",
+            "metadata": {"is_mod": idx % 7 == 0},
+        }
+        for idx in range(messages)
+    ]
+
+    # Aquece caches (indice de assinaturas, condicoes) e enche o historico.
+    for payload in payloads[: min(len(payloads), 1100)]:
+        _emit_chat_message("twitch", payload["kind"], payload)
+
+    tracemalloc.start()
+    total = 0
+    try:
+        for payload in payloads:
+            before, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            _emit_chat_message("twitch", payload["kind"], payload)
+            _, peak = tracemalloc.get_traced_memory()
+            total += max(0, peak - before)
+    finally:
+        tracemalloc.stop()
+    return total / max(1, len(payloads))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--messages", type=int, default=2000)
+    parser.add_argument("--budget", type=int, default=DEFAULT_BUDGET_BYTES)
+    args = parser.parse_args()
+
+    per_message = measure(args.messages)
+    ok = per_message <= args.budget
+    print(
+        f"bytes alocados por mensagem: {per_message:.0f} "
+        f"(orcamento {args.budget}) -> {'OK' if ok else 'ACIMA DO ORCAMENTO'}"
+    )
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+"""
+Throughput e latencia do event bridge (processo principal -> cliente externo).
+
+Uso (na raiz do projeto):
+    python -m benchmarks.bench_event_bridge
+    python -m benchmarks.bench_event_bridge --events 20000 --unix /tmp/luna_bridge.sock
+
+Sobe um EventBridgeServer sobre um EventBus isolado e conecta um cliente
+assinando `chat.*`. Mede:
+- throughput: rajada de eventos, eventos/s recebidos pelo cliente;
+- latencia: eventos em ritmo de chat movimentado (--rate por segundo),
+  latencia ponta a ponta p50/p99.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.event_bridge import EventBridgeClient, EventBridgeServer  # noqa: E402
+from core.event_bus import Event, EventBus  # noqa: E402
+
+
+_TOKEN = "bench-token"
+_TOPICS = ("chat.message", "chat.message.received", "message.received")
+_PAYLOAD = {"platform": "twitch", "user": "viewer", "text": "oi luna", "kind": "message"}
+
+
+def _chat_event() -> Event:
+    return Event(type=_TOPICS[0], payload=_PAYLOAD, source="chat_ingest:twitch", topics=_TOPICS)
+
+
+def _receive(client: EventBridgeClient, count: int) -> list[float]:
+    latencies: list[float] = []
+    while len(latencies) < count:
+        event = client.recv_event(timeout_sec=5.0)
+        if event is None:
+            break
+        latencies.append(time.time() - event.timestamp)
+    return latencies
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))] * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--events", type=int, default=10000)
+    parser.add_argument("--rate", type=int, default=500, help="eventos/s na fase de latencia")
+    parser.add_argument("--unix", default="", help="caminho de Unix socket (padrao: TCP localhost)")
+    args = parser.parse_args()
+
+    bus = EventBus(max_history=1000)
+    server = EventBridgeServer(bus=bus, port=0, unix_path=args.unix, token=_TOKEN, max_pending=args.events)
+    server.start()
+    client = EventBridgeClient(
+        host="127.0.0.1", port=server.port, unix_path=args.unix, token=_TOKEN
+    ).connect()
+    client.subscribe(["chat.*"])
+    time.sleep(0.2)
+
+    # Fase 1: throughput em rajada.
+    start = time.perf_counter()
+    for _ in range(args.events):
+        bus.emit(_chat_event())
+    emit_elapsed = time.perf_counter() - start
+    received = len(_receive(client, args.events))
+    total_elapsed = time.perf_counter() - start
+
+    # Fase 2: latencia em ritmo constante.
+    paced = max(1, args.rate)
+    interval = 1.0 / paced
+    latencies: list[float] = []
+    for _ in range(paced):
+        bus.emit(_chat_event())
+        latencies.extend(_receive(client, 1))
+        time.sleep(interval)
+
+    client.close()
+    server.stop()
+
+    print(f"transporte: {'unix' if args.unix else 'tcp'}")
+    print(
+        f"rajada: {args.events} eventos, produtor {emit_elapsed / args.events * 1e6:.1f} us/emit, "
+        f"cliente recebeu {received} ({received / total_elapsed:,.0f} eventos/s)"
+    )
+    print(
+        f"latencia a {paced} eventos/s: p50={_percentile(latencies, 0.5):.3f} ms "
+        f"p99={_percentile(latencies, 0.99):.3f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
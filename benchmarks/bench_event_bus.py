@@ -0,0 +1,113 @@
+"""
+Microbenchmark do EventBus: custo de emit() em funcao do numero de assinantes.
+
+Uso (na raiz do projeto):
+    python -m benchmarks.bench_event_bus
+    python -m benchmarks.bench_event_bus --subscribers 1,10,100,1000 --emits 20000
+
+Compara o indice de assinaturas atual com a varredura linear por fnmatch
+(comportamento anterior), usando o mesmo mix de topicos que o chat_ingest
+emite por mensagem.
+"""
+from __future__ import annotations
+
+import argparse
+import fnmatch
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.event_bus import Event, EventBus  # noqa: E402
+
+
+_CHAT_TOPICS = (
+    "chat.message",
+    "chat.message.received",
+    "chat.twitch.message.received",
+    "message.received",
+    "chat.message.superchat",
+    "chat.twitch.superchat",
+    "message.superchat",
+)
+
+_PATTERN_MIX = (
+    "chat.*",
+    "chat.*.superchat",
+    "chat.message.membership",
+    "skill.completed",
+    "skill.*",
+    "message.received",
+    "obs.scene.*",
+    "system.*",
+)
+
+
+def _noop(_event: Event) -> None:
+    return None
+
+
+def _patterns(count: int) -> list[str]:
+    # Mistura padroes reais com topicos "frios" (que nunca casam) para simular
+    # paineis, workflows e integracoes assinando coisas diferentes.
+    patterns: list[str] = []
+    for idx in range(count):
+        if idx % 4 == 0:
+            patterns.append(_PATTERN_MIX[idx % len(_PATTERN_MIX)])
+        else:
+            patterns.append(f"plugin{idx}.event.*" if idx % 2 else f"plugin{idx}.event")
+    return patterns
+
+
+class _LinearBus:
+    """Reproducao do emit anterior: copia assinaturas e roda fnmatch em todas."""
+
+    def __init__(self) -> None:
+        self._subs: list[tuple[str, object]] = []
+
+    def subscribe(self, pattern: str, callback) -> None:
+        self._subs.append((pattern, callback))
+
+    def emit(self, event: Event) -> int:
+        notified = 0
+        for pattern, callback in list(self._subs):
+            if not fnmatch.fnmatch(event.type, pattern):
+                continue
+            callback(event)
+            notified += 1
+        return notified
+
+
+def _run(bus, emits: int) -> float:
+    events = [Event(type=topic, payload={"text": "oi"}) for topic in _CHAT_TOPICS]
+    total = len(events)
+    start = time.perf_counter()
+    for idx in range(emits):
+        bus.emit(events[idx % total])
+    elapsed = time.perf_counter() - start
+    return elapsed / emits * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--subscribers", default="1,10,50,100,500,1000")
+    parser.add_argument("--emits", type=int, default=20000)
+    args = parser.parse_args()
+
+    counts = [int(item) for item in args.subscribers.split(",") if item.strip()]
+    print(f"{'subs':>6} {'indexed us/emit':>16} {'linear us/emit':>15} {'speedup':>8}")
+    for count in counts:
+        indexed = EventBus(max_history=100)
+        linear = _LinearBus()
+        for pattern in _patterns(count):
+            indexed.subscribe(pattern, _noop)
+            linear.subscribe(pattern, _noop)
+        t_indexed = _run(indexed, args.emits)
+        t_linear = _run(linear, args.emits)
+        speedup = t_linear / t_indexed if t_indexed else 0.0
+        print(f"{count:>6} {t_indexed:>16.2f} {t_linear:>15.2f} {speedup:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""
+Custo de detectar_intencao: tabela de regras pre-compilada vs. cadeia de ifs.
+
+Uso (na raiz do projeto):
+    python -m benchmarks.bench_intent
+    python -m benchmarks.bench_intent --repeat 200 --corpus benchmarks/data/intent_corpus_ptbr.tsv
+
+O corpus (TSV `intent<TAB>comando`, comandos PT-BR) traz o rotulo esperado
+de cada comando. Confere que o classificador atual e a replica do anterior
+(que montava as regex a cada chamada) acertam os mesmos rotulos, inclusive
+com os estados de sequencia ligados, e compara o tempo por comando.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.state import STATE  # noqa: E402
+from core.intent import normalizar_texto, detectar_intencao, recarregar_regras  # noqa: E402
+
+_CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "intent_corpus_ptbr.tsv")
+
+
+def _tem_palavra(cmd_norm: str, palavras: list[str]) -> bool:
+    pattern = r"\b(" + "|".join(re.escape(p) for p in palavras) + r")\b"
+    return re.search(pattern, cmd_norm) is not None
+
+
+def legacy_intent(cmd: str) -> str:
+    # Replica do detectar_intencao anterior a tabela de regras.
+    cmd = cmd.lower().strip()
+    cmd_norm = normalizar_texto(cmd)
+    if STATE.esperando_nome_sequencia or STATE.gravando_sequencia:
+        return "sequencia"
+    if STATE.esperando_loops:
+        if any(n in cmd_norm for n in ["uma vez", "duas vezes", "tres vezes", "vezes"]):
+            return "sequencia"
+        if any(char.isdigit() for char in cmd):
+            return "sequencia"
+    if _tem_palavra(cmd_norm, ["executar", "sequencia", "macro", "gravar", "parar", "grave", "rode"]):
+        return "sequencia"
+    if any(char.isdigit() for char in cmd):
+        if any(p in cmd_norm for p in ["sequencia", "macro", "executar", "rodar", "repetir", "loop"]):
+            return "sequencia"
+    palavras_foco = [
+        "roupa", "traje", "vestindo", "look", "outfit", "vestimenta", "estilo", "mao", "maos",
+        "rosto", "cabelo", "olhos", "expressao", "gesto", "gestos", "segura", "segurando",
+        "segurar", "objeto", "objetos", "acessorio", "acessorios", "chapeu", "chapeus",
+        "comida", "prato", "bebida", "placa", "texto",
+    ]
+    if _tem_palavra(cmd_norm, palavras_foco) or any(f in cmd_norm for f in ["na mao", "na maos"]):
+        return "vision"
+    if any(v in cmd_norm for v in [
+        "reanalisar", "reanalise", "analise novamente", "analise de novo",
+        "ultima captura", "ultima imagem", "ultimas imagens",
+    ]):
+        return "vision"
+    if _tem_palavra(cmd_norm, ["analise", "analisar", "veja", "olhe", "ve", "tela", "screenshot"]):
+        if _tem_palavra(cmd_norm, ["tela", "imagem", "foto", "isso", "captura", "print"]):
+            return "vision"
+    frases_jogo = [
+        "nome do jogo", "nome desse jogo", "nome deste jogo", "qual e o jogo",
+        "qual o jogo", "que jogo", "nome do game",
+    ]
+    interrogativos = ["qual", "o que", "quem", "como", "qual e", "qual o"]
+    visuais = [
+        "tela", "imagem", "foto", "print", "screenshot", "na tela", "na imagem", "visual",
+        "visao", "o que voce ve", "o que tem", "aparece", "mostra", "personagem",
+    ]
+    if any(p in cmd_norm for p in frases_jogo) or (
+        any(i in cmd_norm for i in interrogativos) and any(v in cmd_norm for v in visuais)
+    ):
+        return "vision"
+    if _tem_palavra(cmd_norm, ["level", "nivel"]) and (
+        _tem_palavra(cmd_norm, ["jogo"]) or _tem_palavra(cmd_norm, ["tela", "imagem", "foto", "print"])
+    ):
+        return "vision"
+    if _tem_palavra(cmd_norm, ["noticia", "noticias", "news", "jornal", "manchete", "manchetes", "acontecendo"]):
+        return "news"
+    if _tem_palavra(cmd_norm, ["preco", "valor", "cotacao", "bitcoin", "dolar", "real", "crypto"]):
+        return "price"
+    if _tem_palavra(cmd_norm, ["sistema", "cpu", "memoria", "ram", "temperatura"]):
+        return "system_monitor"
+    if any(y in cmd_norm for y in ["youtu.be", "youtube.com"]):
+        return "youtube_summary"
+    if _tem_palavra(cmd_norm, ["youtube", "video"]):
+        return "youtube_summary"
+    if any(x in cmd_norm for x in [
+        "coletar links", "extrair links", "listar links", "salvar links", "mapear links", "raspar links",
+    ]):
+        return "link_scraper"
+    if any(w in cmd_norm for w in ["http", "x.com", "twitter.com"]):
+        return "web_reader"
+    if re.search(r"\b(site|pagina|link|url|leia|resuma|resumo|post|tweet)\b", cmd_norm):
+        return "web_reader"
+    if _tem_palavra(cmd_norm, ["dica", "build", "guia", "tutorial"]):
+        return "game_guide"
+    if _tem_palavra(cmd_norm, ["menu", "radial", "atalho"]):
+        return "atalhos_radial"
+    if _tem_palavra(cmd_norm, ["tts", "narrar", "narracao", "murf", "voz"]):
+        return "tts"
+    if any(f in cmd_norm for f in ["ler roteiro", "leia o roteiro"]):
+        return "tts"
+    if re.search(r"\b(arquivo|file)\s*:\s*.+", cmd_norm):
+        return "tts"
+    return "conversa"
+
+
+def load_corpus(path: str) -> list[tuple[str, str]]:
+    rows: list[tuple[str, str]] = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.rstrip("\n")
+            if not line.strip() or line.startswith("#"):
+                continue
+            label, _, command = line.partition("\t")
+            rows.append((label.strip(), command))
+    return rows
+
+
+def _divergences(commands: list[str]) -> int:
+    total = 0
+    for state in (None, "esperando_loops", "gravando_sequencia"):
+        if state:
+            setattr(STATE, state, True)
+        try:
+            total += sum(1 for cmd in commands if legacy_intent(cmd) != detectar_intencao(cmd))
+        finally:
+            if state:
+                setattr(STATE, state, False)
+    return total
+
+
+def run(corpus_path: str, repeat: int) -> int:
+    # So as regras: o modelo estatistico tem benchmark proprio (bench_intent_model).
+    os.environ["LUNA_INTENT_MODEL"] = "0"
+    recarregar_regras()
+    corpus = load_corpus(corpus_path)
+    commands = [cmd for _, cmd in corpus]
+    hits_legacy = sum(1 for label, cmd in corpus if legacy_intent(cmd) == label)
+    hits_table = sum(1 for label, cmd in corpus if detectar_intencao(cmd) == label)
+    mismatches = _divergences(commands)
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for cmd in commands:
+            legacy_intent(cmd)
+    legacy = (time.perf_counter() - start) / (repeat * len(commands))
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for cmd in commands:
+            detectar_intencao(cmd)
+    table = (time.perf_counter() - start) / (repeat * len(commands))
+
+    print(f"comandos={len(commands)} repeticoes={repeat}")
+    print(f"  ifs + regex: {legacy * 1e6:8.1f} us/comando  acertos={hits_legacy}/{len(corpus)}")
+    print(f"  tabela     : {table * 1e6:8.1f} us/comando  acertos={hits_table}/{len(corpus)}  ({legacy / table:.1f}x)")
+    print(f"  divergencias: {mismatches}")
+    return 1 if mismatches or hits_table < hits_legacy else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--corpus", default=_CORPUS)
+    parser.add_argument("--repeat", type=int, default=100)
+    args = parser.parse_args()
+    return run(args.corpus, max(1, args.repeat))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
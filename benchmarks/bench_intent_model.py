@@ -0,0 +1,96 @@
+"""
+Acerto e latencia do modelo de intent (n-gramas) sobre comandos com erros de STT.
+
+Uso (na raiz do projeto):
+    python -m benchmarks.bench_intent_model
+    python -m benchmarks.bench_intent_model --copies 5 --batch 64 --min-conf 0.5
+
+Mede so o holdout do corpus rotulado (`intent_model.is_holdout`, frases que o
+treino nunca ve; as que repetem um gatilho de manifesto tambem saem), limpo e
+com variantes com erros de digitacao/transcricao, e compara o acerto de so
+regras com regras + modelo. Tambem mede o modelo chamado comando a comando vs. em lote (uma
+multiplicacao de matrizes por lote). Requer NumPy e o modelo treinado
+(`python -m core.intent_model`).
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core import intent  # noqa: E402
+from core import intent_model  # noqa: E402
+
+
+def _accuracy(samples: list[tuple[str, str]], min_conf: float | None) -> int:
+    os.environ["LUNA_INTENT_MODEL"] = intent_model.DEFAULT_MODEL_PATH if min_conf is not None else "0"
+    if min_conf is not None:
+        os.environ["LUNA_INTENT_MODEL_MIN_CONF"] = str(min_conf)
+    intent.recarregar_regras()
+    matches = intent.classificar_intencoes([text for _, text in samples])
+    return sum(1 for (label, _), match in zip(samples, matches) if match.intent == label)
+
+
+def run(corpus_path: str, copies: int, batch: int, min_conf: float) -> int:
+    if not intent_model.available():
+        print("numpy nao instalado")
+        return 1
+    if not os.path.isfile(intent_model.DEFAULT_MODEL_PATH):
+        print(f"modelo nao encontrado: {intent_model.DEFAULT_MODEL_PATH}")
+        return 1
+    model = intent_model.IntentModel.load(intent_model.DEFAULT_MODEL_PATH)
+    known = [rule["intent"] for rule in intent.INTENT_RULES] + [intent.DEFAULT_INTENT]
+    seen = {
+        intent.normalizar_comando(text)
+        for _, text in intent_model.manifest_samples(dict.fromkeys(known))
+        + intent_model.load_corpus(corpus_path, split="train")
+    }
+    corpus = [
+        row
+        for row in intent_model.load_corpus(corpus_path, split="test")
+        if intent.normalizar_comando(row[1]) not in seen
+    ]
+    if not corpus:
+        print("holdout vazio")
+        return 1
+    noisy = [row for row in intent_model.augment(corpus, copies, seed=991) if row not in corpus]
+
+    rules_clean = _accuracy(corpus, None)
+    model_clean = _accuracy(corpus, min_conf)
+    rules_noisy = _accuracy(noisy, None)
+    model_noisy = _accuracy(noisy, min_conf)
+
+    texts = [intent.normalizar_comando(text) for _, text in noisy]
+    start = time.perf_counter()
+    for text in texts:
+        model.predict([text])
+    single = (time.perf_counter() - start) / len(texts)
+
+    start = time.perf_counter()
+    for i in range(0, len(texts), batch):
+        model.predict(texts[i:i + batch])
+    batched = (time.perf_counter() - start) / len(texts)
+
+    print(f"holdout={len(corpus)} com_ruido={len(noisy)} min_conf={min_conf} intents={len(model.labels)}")
+    print(f"  limpo   : regras {rules_clean}/{len(corpus)}  regras+modelo {model_clean}/{len(corpus)}")
+    print(f"  ruido   : regras {rules_noisy}/{len(noisy)}  regras+modelo {model_noisy}/{len(noisy)}")
+    print(f"  modelo 1 a 1 : {single * 1e6:8.1f} us/comando")
+    print(f"  modelo lote {batch:<3d}: {batched * 1e6:8.1f} us/comando  ({single / batched:.1f}x)")
+    return 1 if model_clean < rules_clean else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--corpus", default=intent_model.DEFAULT_CORPUS_PATH)
+    parser.add_argument("--copies", type=int, default=3)
+    parser.add_argument("--batch", type=int, default=32)
+    parser.add_argument("--min-conf", type=float, default=intent.DEFAULT_MODEL_MIN_CONF)
+    args = parser.parse_args()
+    return run(args.corpus, max(1, args.copies), max(1, args.batch), args.min_conf)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+"""
+Tempo e memoria do primeiro comando roteado: manifestos JSON vs. import de tudo.
+
+Uso (na raiz do projeto):
+    python -m benchmarks.bench_skill_routing
+    python -m benchmarks.bench_skill_routing --command "qual o preco do bitcoin"
+
+Cada modo roda num processo novo (imports frios). `indice` usa o roteamento
+atual (so os JSON de skills/manifests); `import` reproduz o comportamento
+anterior, que importava todas as skills antes de escolher candidatas. Mede o
+tempo de candidates_by_intent + candidates_by_trigger e o pico de RSS
+(ru_maxrss, so em Linux/macOS). Skills cujas dependencias nao estao
+instaladas falham no import e entram so no tempo.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_CHILD = r"""
+import json, logging, resource, sys, time
+logging.disable(logging.CRITICAL)
+sys.path.insert(0, {root!r})
+from core.skill_registry import SkillRegistry
+registry = SkillRegistry()
+registry.discover()
+start = time.perf_counter()
+if {legacy!r}:
+    for name in registry.list_skill_names():
+        registry.load(name)
+intent = registry.candidates_by_intent({intent!r})
+trigger = registry.candidates_by_trigger({command!r})
+elapsed = time.perf_counter() - start
+skills = [m for m in sys.modules if m.startswith("skills.")]
+print(json.dumps({{
+    "ms": elapsed * 1000,
+    "rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    "imported": len(skills),
+    "candidates": intent + [n for n in trigger if n not in intent],
+}}))
+"""
+
+
+def measure(command: str, intent: str, legacy: bool) -> dict:
+    code = _CHILD.format(root=_ROOT, legacy=legacy, command=command, intent=intent)
+    proc = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        cwd=_ROOT,
+        check=True,
+    )
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--command", default="qual o preco do bitcoin")
+    parser.add_argument("--intent", default="preco")
+    args = parser.parse_args()
+
+    print(f"comando={args.command!r} intent={args.intent!r}")
+    for label, legacy in (("import", True), ("indice", False)):
+        result = measure(args.command, args.intent, legacy)
+        print(
+            f"  {label:6s}: {result['ms']:8.1f} ms  rss={result['rss_kb'] / 1024:6.1f} MB  "
+            f"skills importadas={result['imported']}  candidatas={result['candidates']}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
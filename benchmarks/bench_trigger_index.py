@@ -0,0 +1,105 @@
+"""
+Custo de SkillRegistry.candidates_by_trigger: indice de gatilhos vs. varredura.
+
+Uso (na raiz do projeto):
+    python -m benchmarks.bench_trigger_index
+    python -m benchmarks.bench_trigger_index --skills 80 --commands 20000
+
+Registra skills sinteticas (manifestos com ~6 gatilhos cada, alguns
+sobrepostos) direto no registry e compara o indice Aho-Corasick com a
+implementacao anterior, que chamava manifest.matches_command skill a skill.
+Tambem confere que as duas devolvem as mesmas skills para todos os comandos.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.skill_manifest import SkillManifest  # noqa: E402
+from core.skill_registry import SkillEntry, SkillRegistry  # noqa: E402
+
+
+_WORDS = (
+    "abrir", "tocar", "musica", "clima", "tempo", "noticias", "preco", "cotacao",
+    "resumo", "video", "link", "pagina", "guia", "jogo", "sistema", "memoria",
+    "cpu", "tela", "print", "foto", "camera", "cena", "obs", "macro", "sequencia",
+    "atalho", "menu", "voz", "ler", "roteiro", "dolar", "bitcoin", "traduzir",
+)
+
+
+def build_registry(skill_count: int, rng: random.Random) -> SkillRegistry:
+    registry = SkillRegistry()
+    for idx in range(skill_count):
+        name = f"skill_{idx:03d}"
+        gatilhos = [
+            " ".join(rng.sample(_WORDS, rng.randint(1, 2))) for _ in range(5)
+        ] + [f"{name.replace('_', ' ')}"]
+        manifest = SkillManifest.from_sources(
+            module_name=name,
+            manifest_data={"name": name, "gatilhos": gatilhos, "intents": [name]},
+        )
+        registry._entries[name] = SkillEntry(module_name=name, module=object(), manifest=manifest)
+    return registry
+
+
+def build_commands(count: int, rng: random.Random) -> list[str]:
+    return [
+        "luna " + " ".join(rng.choice(_WORDS) for _ in range(rng.randint(2, 8)))
+        for _ in range(count)
+    ]
+
+
+def legacy_candidates(registry: SkillRegistry, cmd_limpo: str) -> list[str]:
+    # Replica do candidates_by_trigger anterior ao indice.
+    selected: list[str] = []
+    for module_name in registry.list_skill_names():
+        entry = registry.load(module_name)
+        if not entry or not entry.manifest:
+            continue
+        if entry.manifest.matches_command(cmd_limpo):
+            selected.append(module_name)
+    return selected
+
+
+def run(skill_count: int, command_count: int) -> int:
+    rng = random.Random(42)
+    registry = build_registry(skill_count, rng)
+    commands = build_commands(command_count, rng)
+
+    mismatches = sum(
+        1 for cmd in commands if legacy_candidates(registry, cmd) != registry.candidates_by_trigger(cmd)
+    )
+
+    start = time.perf_counter()
+    for cmd in commands:
+        legacy_candidates(registry, cmd)
+    legacy = (time.perf_counter() - start) / command_count
+
+    start = time.perf_counter()
+    for cmd in commands:
+        registry.candidates_by_trigger(cmd)
+    indexed = (time.perf_counter() - start) / command_count
+
+    index = registry.trigger_index()
+    print(f"skills={skill_count} gatilhos={index.size} comandos={command_count}")
+    print(f"  varredura: {legacy * 1e6:8.1f} us/comando")
+    print(f"  indice   : {indexed * 1e6:8.1f} us/comando  ({legacy / indexed:.1f}x)")
+    print(f"  divergencias: {mismatches}")
+    return 1 if mismatches else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--skills", type=int, default=60)
+    parser.add_argument("--commands", type=int, default=10000)
+    args = parser.parse_args()
+    return run(max(1, args.skills), max(1, args.commands))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,137 @@
+"""
+Custo por evento do WorkflowEngine: plano compilado vs. caminho anterior.
+
+Uso (na raiz do projeto):
+    python -m benchmarks.bench_workflow_plan
+    python -m benchmarks.bench_workflow_plan --nodes 200 --events 2000
+
+Gera um workflow sintetico em camadas (cada node recebe de ate 3 nodes da
+camada anterior, com event_filters em parte deles) e mede _process_event com o
+CompiledWorkflow contra a implementacao anterior, que recalculava contagens de
+entrada e varria todas as conexoes para cada node a cada evento.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+from typing import Any
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.event_bus import Event, EventBus  # noqa: E402
+from core.workflow_engine import WorkflowDefinition, WorkflowEngine  # noqa: E402
+
+
+_LAYER_WIDTH = 10
+
+
+def build_workflow(node_count: int) -> dict[str, Any]:
+    nodes: list[dict[str, Any]] = [{"id": "n0", "type": "manual-input", "config": {}}]
+    connections: list[dict[str, Any]] = []
+    for idx in range(1, node_count):
+        node: dict[str, Any] = {"id": f"n{idx}", "type": "console-output", "config": {}}
+        if idx % 5 == 0:
+            node["event_filters"] = [
+                {"event": "chat.*", "condition": "event.get('text', '') != ''"}
+            ]
+        nodes.append(node)
+        layer_start = max(0, ((idx - 1) // _LAYER_WIDTH - 1) * _LAYER_WIDTH)
+        for offset in range(3):
+            src = layer_start + (idx + offset) % _LAYER_WIDTH
+            if src >= idx:
+                continue
+            connections.append(
+                {
+                    "id": f"c{idx}_{offset}",
+                    "from": {"nodeId": f"n{src}", "port": "text"},
+                    "to": {"nodeId": f"n{idx}", "port": "text"},
+                }
+            )
+    return {"id": "bench", "name": "bench", "nodes": nodes, "connections": connections}
+
+
+def _legacy_process_event(
+    engine: WorkflowEngine,
+    workflow: WorkflowDefinition,
+    order: list,
+    filters: dict,
+    event: Event,
+) -> None:
+    # Replica do _process_event anterior ao plano compilado.
+    outputs: dict[str, dict[str, Any]] = {}
+    counts = {node.id: 0 for node in workflow.nodes}
+    for conn in workflow.connections:
+        if conn.to_node in counts:
+            counts[conn.to_node] += 1
+
+    for node in order:
+        node_filters = filters.get(node.id)
+        if node_filters and not any(f.matches(event) for f in node_filters):
+            continue
+        inputs: dict[str, Any] = {}
+        for conn in workflow.connections:
+            if conn.to_node != node.id:
+                continue
+            upstream = outputs.get(conn.from_node)
+            if not upstream:
+                continue
+            if conn.from_port and conn.from_port in upstream:
+                value = upstream.get(conn.from_port)
+            elif "text" in upstream:
+                value = upstream.get("text")
+            else:
+                value = upstream
+            inputs[conn.to_port or conn.from_port or "input"] = value
+        if not inputs and counts.get(node.id, 0) == 0:
+            inputs = dict(engine._event_to_inputs(event))
+        if not inputs and counts.get(node.id, 0) > 0:
+            continue
+        outputs[node.id] = engine._execute_node(node, inputs, event=event)
+
+
+def run(node_count: int, events: int) -> None:
+    engine = WorkflowEngine(bus=EventBus())
+    data = build_workflow(node_count)
+    plan = engine.compile_workflow(data)
+    engine._plan = plan
+    workflow = plan.workflow
+    order = engine._get_execution_order(workflow)
+    filters = {node.id: engine._build_node_filters(node) for node in order}
+
+    event = Event(
+        "chat.message",
+        {"platform": "twitch", "user": "bench", "text": "oi luna"},
+        "bench",
+        time.time(),
+    )
+
+    start = time.perf_counter()
+    for _ in range(events):
+        _legacy_process_event(engine, workflow, order, filters, event)
+    legacy = (time.perf_counter() - start) / events
+
+    start = time.perf_counter()
+    for _ in range(events):
+        engine._process_event(event)
+    compiled = (time.perf_counter() - start) / events
+
+    print(
+        f"nodes={len(workflow.nodes)} conexoes={len(workflow.connections)} eventos={events}"
+    )
+    print(f"  anterior : {legacy * 1e6:9.1f} us/evento")
+    print(f"  compilado: {compiled * 1e6:9.1f} us/evento  ({legacy / compiled:.1f}x)")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--nodes", type=int, default=200)
+    parser.add_argument("--events", type=int, default=2000)
+    args = parser.parse_args()
+    run(max(2, args.nodes), max(1, args.events))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import json
+import re
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, Mapping
+
+
+# Resposta em lote: varias mensagens do chat viram um unico prompt e a saida
+# (JSON ou linhas "usuario: resposta") e dividida de volta por usuario.
+
+ReplyGenerator = Callable[[str], str]
+
+# "1. (twitch) @fulano: resposta" -> ("fulano", "resposta")
+_LINE_RE = re.compile(r"^\s*(?:[-*]|\d+[.)])?\s*(?:\(\w+\)\s*)?@?([^:]{1,60}?)\s*:\s*(.+?)\s*$")
+
+
+@dataclass(frozen=True, slots=True)
+class ChatItem:
+    platform: str
+    user: str
+    text: str
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> "ChatItem":
+        return cls(
+            platform=str(data.get("platform", "") or "").strip(),
+            user=str(data.get("user", "") or "").strip() or "anon",
+            text=str(data.get("text", "") or "").strip(),
+        )
+
+
+def _default_generator(prompt: str) -> str:
+    from skills import conversa
+
+    return conversa.executar(prompt)
+
+
+def build_batch_prompt(items: Iterable[ChatItem]) -> str:
+    linhas = [f"{i}. ({item.platform or 'chat'}) {item.user}: {item.text}"
+              for i, item in enumerate(items, start=1)]
+    return (
+        "Mensagens do chat para responder:\n"
+        + "\n".join(linhas)
+        + "\nResponda cada pessoa em portugues, chamando-a pelo nome, com 1 frase "
+        "completa e curta (sem abreviacoes, finalize com ponto).\n"
+        'Devolva somente JSON: [{"user": "<nome>", "reply": "<frase>"}], '
+        "um item por pessoa, na mesma ordem."
+    )
+
+
+def _json_payload(text: str) -> Any:
+    start = text.find("[")
+    end = text.rfind("]")
+    if start < 0 or end <= start:
+        return None
+    try:
+        return json.loads(text[start:end + 1])
+    except ValueError:
+        return None
+
+
+def split_batch_reply(raw: str, users: Iterable[str]) -> dict[str, str]:
+    """Mapeia usuario (minusculo) -> resposta; usuarios sem resposta ficam de fora."""
+    wanted = {user.lower(): user for user in users}
+    replies: dict[str, str] = {}
+    text = (raw or "").strip()
+    if not text:
+        return replies
+
+    data = _json_payload(text)
+    if isinstance(data, list):
+        for entry in data:
+            if not isinstance(entry, Mapping):
+                continue
+            user = str(entry.get("user", "") or "").strip().lstrip("@").lower()
+            reply = str(entry.get("reply", "") or "").strip()
+            if user in wanted and reply and user not in replies:
+                replies[user] = reply
+        if replies:
+            return replies
+
+    for line in text.splitlines():
+        match = _LINE_RE.match(line)
+        if not match:
+            continue
+        user = match.group(1).strip().lower()
+        if user in wanted and user not in replies:
+            replies[user] = match.group(2)
+    return replies
+
+
+def generate_batch_replies(
+    items: Iterable[ChatItem],
+    generate: ReplyGenerator | None = None,
+) -> list[tuple[ChatItem, str]]:
+    """
+    Uma chamada de LLM para o lote inteiro. Mensagens do mesmo usuario sao
+    juntadas; quem nao aparece na resposta fica sem resposta (sem nova chamada).
+    """
+    merged: dict[str, ChatItem] = {}
+    for item in items:
+        if not item.text:
+            continue
+        key = item.user.lower()
+        previous = merged.get(key)
+        if previous is not None:
+            item = ChatItem(previous.platform, previous.user, f"{previous.text} / {item.text}")
+        merged[key] = item
+    if not merged:
+        return []
+
+    batch = list(merged.values())
+    raw = (generate or _default_generator)(build_batch_prompt(batch))
+    replies = split_batch_reply(raw, (item.user for item in batch))
+    return [(item, replies[item.user.lower()]) for item in batch if item.user.lower() in replies]
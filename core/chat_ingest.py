@@ -11,9 +11,10 @@ from typing import Optional, Any
 import requests
 
 from config.env import init_env
-from core.event_bus import emit_event
+from core.event_bus import emit_event, emit_many
 from core.http_client import SESSION
 from core import memory
+from core.chat_batch_reply import ChatItem, generate_batch_replies
 from core import voice
 from skills import conversa
 
@@ -48,7 +49,8 @@ _last_user_ts: dict[str, float] = {}
 def start_chat_ingest() -> None:
     """Inicia a integracao de chat (Twitch/YouTube) se habilitada via env."""
     if _is_enabled("LUNA_CHAT_REPLY_ENABLED"):
-        t = threading.Thread(target=_reply_worker, daemon=True)
+        worker = _reply_worker_batch if _is_enabled("LUNA_CHAT_REPLY_BATCH") else _reply_worker
+        t = threading.Thread(target=worker, daemon=True)
         _threads.append(t)
         t.start()
 
@@ -107,23 +109,30 @@ def _store_chat(
 
 def _emit_chat_events(platform: str, kind: str, payload: dict[str, Any]) -> None:
     source = f"chat_ingest:{platform}"
-    emit_event("chat.message", payload, source=source)
-    emit_event("chat.message.received", payload, source=source)
-    emit_event(f"chat.{platform}.message.received", payload, source=source)
-    emit_event("message.received", payload, source=source)
+    topics = [
+        "chat.message",
+        "chat.message.received",
+        f"chat.{platform}.message.received",
+        "message.received",
+    ]
 
     if kind and kind != "message":
-        emit_event(f"chat.message.{kind}", payload, source=source)
-        emit_event(f"chat.{platform}.{kind}", payload, source=source)
-        emit_event(f"message.{kind}", payload, source=source)
+        topics.append(f"chat.message.{kind}")
+        topics.append(f"chat.{platform}.{kind}")
+        topics.append(f"message.{kind}")
 
     metadata = payload.get("metadata") if isinstance(payload.get("metadata"), dict) else {}
     if metadata.get("is_mod"):
-        emit_event("chat.message.mod", payload, source=source)
+        topics.append("chat.message.mod")
     if metadata.get("is_member"):
-        emit_event("chat.message.member", payload, source=source)
+        topics.append("chat.message.member")
     if metadata.get("is_subscriber"):
-        emit_event("chat.message.subscriber", payload, source=source)
+        topics.append("chat.message.subscriber")
+
+    # O id da plataforma correlaciona reenvios da mesma mensagem (ex.: polling).
+    message_id = str(metadata.get("message_id") or "").strip()
+    correlation_id = f"{platform}:{message_id}" if message_id else ""
+    emit_many(topics, payload, source=source, correlation_id=correlation_id)
 
 
 def _enqueue_reply(platform: str, user: str, text: str) -> None:
@@ -157,6 +166,39 @@ def _reply_worker() -> None:
             _reply_queue.task_done()
 
 
+def _reply_worker_batch() -> None:
+    """Junta as mencoes que chegam na janela e responde todas com uma chamada."""
+    window_sec = max(0, _env_int("LUNA_CHAT_REPLY_BATCH_WINDOW_MS", 3000)) / 1000
+    max_batch = max(1, _env_int("LUNA_CHAT_REPLY_BATCH_MAX", 5))
+    while True:
+        first = _reply_queue.get()
+        batch = [first] if first is not None else []
+        stop = first is None
+        deadline = time.monotonic() + window_sec
+        while not stop and len(batch) < max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = _reply_queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                stop = True
+                break
+            batch.append(item)
+        try:
+            for resposta in _gerar_respostas_lote(batch):
+                voice.falar(resposta)
+        except Exception as e:
+            print(f"ERRO CHAT REPLY: {e}")
+        finally:
+            for _ in range(len(batch) + int(stop)):
+                _reply_queue.task_done()
+        if stop:
+            return
+
+
 def _twitch_loop() -> None:
     nick = os.getenv("LUNA_TWITCH_NICK", "").strip()
     oauth = os.getenv("LUNA_TWITCH_OAUTH", "").strip()
@@ -435,7 +477,10 @@ def _should_reply(platform: str, user: str, text: str) -> bool:
     if not allowed_msg:
         return False
 
-    min_interval = _env_int("LUNA_CHAT_REPLY_MIN_INTERVAL", 8)
+    # No modo lote a janela ja limita as chamadas; so vale o cooldown por usuario.
+    min_interval = 0 if _is_enabled("LUNA_CHAT_REPLY_BATCH") else _env_int(
+        "LUNA_CHAT_REPLY_MIN_INTERVAL", 8
+    )
     per_user_cd = _env_int("LUNA_CHAT_REPLY_USER_COOLDOWN", 30)
     now = time.time()
     user_key = user.lower().strip()
@@ -528,6 +573,42 @@ def _gerar_resposta(platform: str, user: str, text: str) -> str:
         return ""
 
 
+def _gerar_respostas_lote(batch: list[tuple[str, str, str]]) -> list[str]:
+    if not batch:
+        return []
+    if len(batch) == 1:
+        resposta = _gerar_resposta(*batch[0])
+        return [resposta] if resposta else []
+
+    items = [ChatItem(platform, user, text) for platform, user, text in batch]
+    try:
+        pares = generate_batch_replies(items, conversa.executar)
+    except Exception:
+        for item in items:
+            emit_event(
+                "chat.reply_error",
+                {"platform": item.platform, "user": item.user, "text": item.text},
+                source="chat_ingest",
+            )
+        return []
+
+    respostas: list[str] = []
+    for item, resposta in pares:
+        emit_event(
+            "chat.reply_generated",
+            {
+                "platform": item.platform,
+                "user": item.user,
+                "text": item.text,
+                "reply": resposta,
+                "batch_size": len(items),
+            },
+            source="chat_ingest",
+        )
+        respostas.append(resposta)
+    return respostas
+
+
 def _resposta_incompleta(texto: str) -> bool:
     if not texto:
         return True
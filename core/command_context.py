@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, replace
+from typing import Any, Optional
+
+from core.intent import normalizar_texto, classificar_intencao, classificar_normalizado
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+@dataclass(frozen=True, slots=True)
+class CommandContext:
+    """
+    Formas de um comando calculadas uma vez e repassadas do main/orquestrador
+    ao router e as skills (`executar_contexto(ctx)`).
+
+    - raw: texto como chegou (so sem espacos nas pontas);
+    - lower: minusculo;
+    - clean: minusculo sem "luna" (o que as skills recebiam em executar());
+    - norm: `clean` sem acentos (NFKD/ascii), a forma usada pelo intent;
+    - tokens: palavras (\\w+) de `norm`;
+    - intent: intent detectada/recebida (None = ainda nao classificado).
+    """
+
+    raw: str
+    lower: str
+    clean: str
+    norm: str
+    tokens: tuple[str, ...]
+    intent: Optional[str] = None
+    source: str = ""
+
+    @classmethod
+    def from_text(cls, cmd: Any, *, intent: Optional[str] = None, source: str = "") -> "CommandContext":
+        raw = str(cmd or "").strip()
+        lower = raw.lower()
+        clean = lower.replace("luna", "").strip()
+        norm = normalizar_texto(clean)
+        return cls(
+            raw=raw,
+            lower=lower,
+            clean=clean,
+            norm=norm,
+            tokens=tuple(_TOKEN_RE.findall(norm)),
+            intent=intent or None,
+            source=source or "",
+        )
+
+    @property
+    def addressed(self) -> bool:
+        """Comando comeca com "luna" (exigido no modo assistente)."""
+        return self.lower.startswith("luna")
+
+    def with_intent(self, intent: Optional[str]) -> "CommandContext":
+        return replace(self, intent=intent or None)
+
+    def classified(self, *, raw: bool = False) -> "CommandContext":
+        """
+        Contexto com intent; so classifica se ainda nao houver uma. Por padrao
+        classifica `clean` (como o router); `raw=True` usa o texto completo,
+        com "luna" (como o main).
+        """
+        if self.intent:
+            return self
+        if raw:
+            return replace(self, intent=classificar_intencao(self.raw).intent)
+        return replace(self, intent=classificar_normalizado(self.clean, self.norm).intent)
+
+
+def executar_skill(module: Any, ctx: CommandContext) -> Any:
+    """Chama `executar_contexto(ctx)` se a skill tiver; senao `executar(ctx.clean)`."""
+    entrada = getattr(module, "executar_contexto", None)
+    if callable(entrada):
+        return entrada(ctx)
+    return module.executar(ctx.clean)
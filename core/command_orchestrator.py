@@ -4,19 +4,25 @@ import logging
 from typing import Any, Mapping, Optional
 
 from config.state import STATE
+from core.command_context import CommandContext
 from core.router import processar_comando as processar_comando_router
-from core.workflow_runtime import get_loaded_workflow, run_loaded_workflow_once
+from core.workflow_runtime import (
+    get_loaded_workflow,
+    get_loaded_workflow_hash,
+    run_loaded_workflow_once,
+)
 
 
 logger = logging.getLogger("CommandOrchestrator")
+# (hash do workflow carregado, aceita caminho de comando?)
+_COMMAND_PATH_CACHE: tuple[str, bool] = ("", False)
 
 
-def _is_control_command(cmd: str) -> bool:
-    cmd_lower = (cmd or "").lower().strip()
-    if not cmd_lower:
+def _is_control_command(ctx: CommandContext) -> bool:
+    if not ctx.lower:
         return False
 
-    cmd_limpo = cmd_lower.replace("luna", "").strip()
+    cmd_limpo = ctx.clean
     if "modo vtuber" in cmd_limpo or "ativar vtuber" in cmd_limpo:
         return True
     if "modo assistente" in cmd_limpo or "ativar assistente" in cmd_limpo:
@@ -42,6 +48,20 @@ def _workflow_accepts_command_path(workflow_data: Mapping[str, Any]) -> bool:
     return True
 
 
+def _loaded_workflow_accepts_commands() -> bool:
+    global _COMMAND_PATH_CACHE
+    content_hash = get_loaded_workflow_hash()
+    if not content_hash:
+        return False
+    cached_hash, accepts = _COMMAND_PATH_CACHE
+    if cached_hash == content_hash:
+        return accepts
+    loaded = get_loaded_workflow()
+    accepts = isinstance(loaded, dict) and _workflow_accepts_command_path(loaded)
+    _COMMAND_PATH_CACHE = (content_hash, accepts)
+    return accepts
+
+
 def _extract_workflow_response(
     outputs: Mapping[str, Any] | None,
     *,
@@ -54,6 +74,8 @@ def _extract_workflow_response(
 
     for _, node_output in reversed(list(outputs.items())):
         if isinstance(node_output, Mapping):
+            if node_output.get("timed_out") is True:
+                continue
             for key in ("response", "text", "message", "result"):
                 value = node_output.get(key)
                 if isinstance(value, str) and value.strip():
@@ -77,28 +99,31 @@ def processar_comando_orquestrado(
     intent: Optional[str] = None,
     *,
     source: str = "main",
+    context: Optional[CommandContext] = None,
 ) -> Optional[str]:
-    cmd_text = (cmd or "").strip()
+    ctx = context or CommandContext.from_text(cmd, source=source)
+    if intent and not ctx.intent:
+        ctx = ctx.with_intent(intent)
+    cmd_text = ctx.raw
     if not cmd_text:
         return None
+    intent = ctx.intent
 
     if (
-        _is_control_command(cmd_text)
+        _is_control_command(ctx)
         or STATE.esperando_nome_sequencia
         or STATE.esperando_loops
         or STATE.gravando_sequencia
     ):
-        return processar_comando_router(cmd_text, intent)
+        return processar_comando_router(cmd_text, intent, context=ctx)
 
-    workflow_data: dict[str, Any] | None = None
+    accepts_commands = False
     try:
-        loaded = get_loaded_workflow()
-        if isinstance(loaded, dict):
-            workflow_data = loaded
+        accepts_commands = _loaded_workflow_accepts_commands()
     except Exception as exc:
         logger.warning("Falha ao obter workflow carregado: %s", exc)
 
-    if workflow_data and _workflow_accepts_command_path(workflow_data):
+    if accepts_commands:
         initial_inputs = {
             "text": cmd_text,
             "input": cmd_text,
@@ -117,4 +142,4 @@ def processar_comando_orquestrado(
         except Exception as exc:
             logger.warning("Workflow run_once falhou (%s); fallback para router.", exc)
 
-    return processar_comando_router(cmd_text, intent)
+    return processar_comando_router(cmd_text, intent, context=ctx)
@@ -0,0 +1,514 @@
+from __future__ import annotations
+
+import hmac
+import json
+import logging
+import os
+import select
+import socket
+import struct
+import threading
+from collections import deque
+from typing import Any, Callable, Iterable, Optional
+
+from core.event_bus import Event, EventBus, event_bus
+
+
+logger = logging.getLogger("EventBridge")
+
+# Protocolo: cada frame = cabecalho (versao, tipo, tamanho do corpo) + corpo.
+# v2: evento leva correlation_id depois do source.
+PROTOCOL_VERSION = 2
+_HEADER = struct.Struct("!BBI")
+_EVENT_HEAD = struct.Struct("!dB")
+_STR_LEN = struct.Struct("!H")
+_MAX_FRAME_BYTES = 1024 * 1024
+_AUTH_TIMEOUT_SEC = 5.0
+
+FRAME_HELLO = 1
+FRAME_WELCOME = 2
+FRAME_ERROR = 3
+FRAME_SUBSCRIBE = 4
+FRAME_EVENT = 5
+FRAME_PUBLISH = 6
+
+
+class BridgeProtocolError(Exception):
+    pass
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def bridge_enabled() -> bool:
+    return os.getenv("LUNA_EVENT_BRIDGE_ENABLED", "0").strip() == "1"
+
+
+def bridge_host() -> str:
+    return os.getenv("LUNA_EVENT_BRIDGE_HOST", "127.0.0.1").strip() or "127.0.0.1"
+
+
+def bridge_port() -> int:
+    return _env_int("LUNA_EVENT_BRIDGE_PORT", 5056)
+
+
+def bridge_unix_path() -> str:
+    return os.getenv("LUNA_EVENT_BRIDGE_UNIX_PATH", "").strip()
+
+
+def bridge_token() -> str:
+    # Mesmo token do painel realtime.
+    return os.getenv("LUNA_PANEL_TOKEN", "").strip()
+
+
+def _require_token() -> bool:
+    return os.getenv("LUNA_PANEL_REQUIRE_TOKEN", "1") == "1"
+
+
+# ---------------------------------------------------------------------------
+# Codec
+# ---------------------------------------------------------------------------
+
+
+def _pack_str(value: str) -> bytes:
+    data = (value or "").encode("utf-8")[:0xFFFF]
+    return _STR_LEN.pack(len(data)) + data
+
+
+def _unpack_str(body: memoryview, offset: int) -> tuple[str, int]:
+    (size,) = _STR_LEN.unpack_from(body, offset)
+    offset += _STR_LEN.size
+    return bytes(body[offset : offset + size]).decode("utf-8"), offset + size
+
+
+def encode_frame(frame_type: int, body: bytes = b"") -> bytes:
+    if len(body) > _MAX_FRAME_BYTES:
+        raise BridgeProtocolError(f"Frame excede {_MAX_FRAME_BYTES} bytes.")
+    return _HEADER.pack(PROTOCOL_VERSION, frame_type, len(body)) + body
+
+
+def encode_event(event: Event) -> bytes:
+    topics = event.all_topics[:255]
+    parts = [
+        _EVENT_HEAD.pack(float(event.timestamp), len(topics)),
+        _pack_str(event.id),
+        _pack_str(event.source),
+        _pack_str(event.correlation_id),
+    ]
+    parts.extend(_pack_str(topic) for topic in topics)
+    parts.append(
+        json.dumps(event.payload, ensure_ascii=False, separators=(",", ":"), default=str).encode(
+            "utf-8"
+        )
+    )
+    return b"".join(parts)
+
+
+def decode_event(body: bytes) -> Event:
+    view = memoryview(body)
+    timestamp, count = _EVENT_HEAD.unpack_from(view, 0)
+    offset = _EVENT_HEAD.size
+    event_id, offset = _unpack_str(view, offset)
+    source, offset = _unpack_str(view, offset)
+    correlation_id, offset = _unpack_str(view, offset)
+    topics: list[str] = []
+    for _ in range(count):
+        topic, offset = _unpack_str(view, offset)
+        topics.append(topic)
+    raw_payload = bytes(view[offset:])
+    payload = json.loads(raw_payload.decode("utf-8")) if raw_payload else {}
+    if not topics:
+        raise BridgeProtocolError("Evento sem topico.")
+    return Event(
+        type=topics[0],
+        payload=payload if isinstance(payload, dict) else {"value": payload},
+        source=source,
+        timestamp=timestamp,
+        id=event_id,
+        topics=tuple(topics) if len(topics) > 1 else (),
+        correlation_id=correlation_id,
+    )
+
+
+def _recv_exact(sock: socket.socket, size: int) -> bytes:
+    chunks: list[bytes] = []
+    remaining = size
+    while remaining > 0:
+        chunk = sock.recv(remaining)
+        if not chunk:
+            raise ConnectionError("Conexao encerrada.")
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    return b"".join(chunks)
+
+
+def read_frame(sock: socket.socket) -> tuple[int, bytes]:
+    version, frame_type, size = _HEADER.unpack(_recv_exact(sock, _HEADER.size))
+    if version != PROTOCOL_VERSION:
+        raise BridgeProtocolError(f"Versao de protocolo nao suportada: {version}")
+    if size > _MAX_FRAME_BYTES:
+        raise BridgeProtocolError("Frame grande demais.")
+    return frame_type, _recv_exact(sock, size) if size else b""
+
+
+# ---------------------------------------------------------------------------
+# Servidor (processo principal)
+# ---------------------------------------------------------------------------
+
+
+class _BridgeConnection:
+    def __init__(self, server: "EventBridgeServer", sock: socket.socket, peer: str):
+        self._server = server
+        self._sock = sock
+        self._peer = peer
+        self._send_lock = threading.Lock()
+        self._recent_ids: deque[str] = deque()
+        self._recent_set: set[str] = set()
+        self._subscriptions: list[str] = []
+        self._closed = threading.Event()
+        self.sent = 0
+
+    def serve(self) -> None:
+        try:
+            self._sock.settimeout(_AUTH_TIMEOUT_SEC)
+            frame_type, body = read_frame(self._sock)
+            if frame_type != FRAME_HELLO or not self._server.check_token(body.decode("utf-8", "ignore")):
+                self._send(FRAME_ERROR, b"token invalido")
+                return
+            self._sock.settimeout(None)
+            self._send(FRAME_WELCOME, b"ok")
+            while not self._closed.is_set():
+                frame_type, body = read_frame(self._sock)
+                if frame_type == FRAME_SUBSCRIBE:
+                    self._subscribe(body.decode("utf-8").split("\n"))
+                elif frame_type == FRAME_PUBLISH:
+                    event = decode_event(body)
+                    self._server.bus.emit(
+                        Event(
+                            type=event.type,
+                            payload=event.payload,
+                            source=event.source or f"bridge:{self._peer}",
+                            topics=event.topics,
+                            correlation_id=event.correlation_id,
+                        )
+                    )
+                else:
+                    raise BridgeProtocolError(f"Frame inesperado: {frame_type}")
+        except (ConnectionError, OSError, socket.timeout):
+            pass
+        except Exception as exc:
+            logger.warning("Bridge %s encerrado por erro de protocolo: %s", self._peer, exc)
+        finally:
+            self.close()
+
+    def _subscribe(self, patterns: Iterable[str]) -> None:
+        for pattern in patterns:
+            pattern = pattern.strip()
+            if not pattern:
+                continue
+            sub_id = self._server.bus.subscribe(
+                pattern,
+                self._on_event,
+                subscriber_id=f"bridge:{self._peer}",
+                mode="async",
+                max_pending=self._server.max_pending,
+                overflow="drop_oldest",
+            )
+            self._subscriptions.append(sub_id)
+
+    def _on_event(self, event: Event) -> None:
+        with self._send_lock:
+            # Mesmo evento fisico pode chegar por mais de um padrao/alias; o
+            # dedup vale sempre (um SUBSCRIBE novo pode chegar com eventos em voo).
+            if event.id in self._recent_set:
+                return
+            self._recent_ids.append(event.id)
+            self._recent_set.add(event.id)
+            if len(self._recent_ids) > 256:
+                self._recent_set.discard(self._recent_ids.popleft())
+        try:
+            self._send(FRAME_EVENT, encode_event(event))
+            self.sent += 1
+        except OSError:
+            self.close()
+
+    def _send(self, frame_type: int, body: bytes) -> None:
+        frame = encode_frame(frame_type, body)
+        with self._send_lock:
+            self._sock.sendall(frame)
+
+    def close(self) -> None:
+        if self._closed.is_set():
+            return
+        self._closed.set()
+        for sub_id in self._subscriptions:
+            self._server.bus.unsubscribe(sub_id)
+        self._subscriptions = []
+        try:
+            self._sock.close()
+        except OSError:
+            pass
+        self._server.forget(self)
+
+
+class EventBridgeServer:
+    """
+    Publica o event bus local para outros processos (menu radial, pet,
+    ferramentas) via localhost TCP ou Unix socket, com frames binarios.
+
+    O cliente autentica com o token do painel (LUNA_PANEL_TOKEN), envia os
+    padroes que quer assinar e recebe eventos sem polling. Cada cliente e um
+    assinante async do bus: cliente lento nunca segura quem emite.
+    """
+
+    def __init__(
+        self,
+        *,
+        bus: EventBus | None = None,
+        host: str = "127.0.0.1",
+        port: int = 5056,
+        unix_path: str = "",
+        token: str = "",
+        require_token: bool = True,
+        max_pending: int = 500,
+    ):
+        self.bus = bus or event_bus
+        self.max_pending = max(1, int(max_pending))
+        self._host = host
+        self._port = int(port)
+        self._unix_path = unix_path
+        self._token = token
+        self._require_token = require_token
+        self._sock: socket.socket | None = None
+        self._thread: threading.Thread | None = None
+        self._connections: set[_BridgeConnection] = set()
+        self._lock = threading.Lock()
+        self._running = threading.Event()
+
+    @property
+    def address(self) -> str:
+        if self._unix_path:
+            return self._unix_path
+        if self._sock is not None:
+            host, port = self._sock.getsockname()[:2]
+            return f"{host}:{port}"
+        return f"{self._host}:{self._port}"
+
+    @property
+    def port(self) -> int:
+        if self._sock is not None and not self._unix_path:
+            return int(self._sock.getsockname()[1])
+        return self._port
+
+    def check_token(self, token: str) -> bool:
+        if not self._token:
+            return not self._require_token
+        return hmac.compare_digest(token.strip(), self._token)
+
+    def start(self) -> None:
+        if self._running.is_set():
+            return
+        if self._require_token and not self._token:
+            raise ValueError("Event bridge exige LUNA_PANEL_TOKEN configurado.")
+        if self._unix_path and hasattr(socket, "AF_UNIX"):
+            try:
+                os.unlink(self._unix_path)
+            except FileNotFoundError:
+                pass
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.bind(self._unix_path)
+        else:
+            self._unix_path = ""
+            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            sock.bind((self._host, self._port))
+        sock.listen(16)
+        self._sock = sock
+        self._running.set()
+        self._thread = threading.Thread(target=self._accept_loop, name="EventBridge", daemon=True)
+        self._thread.start()
+        logger.info("Event bridge ouvindo em %s", self.address)
+
+    def stop(self) -> None:
+        self._running.clear()
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            except OSError:
+                pass
+            self._sock = None
+        with self._lock:
+            connections = list(self._connections)
+        for conn in connections:
+            conn.close()
+
+    def forget(self, conn: _BridgeConnection) -> None:
+        with self._lock:
+            self._connections.discard(conn)
+
+    def get_status(self) -> dict[str, Any]:
+        with self._lock:
+            clients = len(self._connections)
+        return {
+            "running": self._running.is_set(),
+            "address": self.address if self._running.is_set() else "",
+            "clients": clients,
+        }
+
+    def _accept_loop(self) -> None:
+        while self._running.is_set() and self._sock is not None:
+            try:
+                client, addr = self._sock.accept()
+            except OSError:
+                break
+            if not self._unix_path:
+                client.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            peer = f"{addr[0]}:{addr[1]}" if isinstance(addr, tuple) else "unix"
+            conn = _BridgeConnection(self, client, peer)
+            with self._lock:
+                self._connections.add(conn)
+            threading.Thread(target=conn.serve, name=f"EventBridge-{peer}", daemon=True).start()
+
+
+# ---------------------------------------------------------------------------
+# Cliente (outros processos)
+# ---------------------------------------------------------------------------
+
+
+class EventBridgeClient:
+    """Cliente do event bridge para processos separados."""
+
+    def __init__(
+        self,
+        *,
+        host: str = "",
+        port: int = 0,
+        unix_path: str = "",
+        token: str = "",
+        timeout_sec: float = 5.0,
+    ):
+        self._host = host or bridge_host()
+        self._port = int(port or bridge_port())
+        self._unix_path = unix_path if unix_path else bridge_unix_path()
+        self._token = token if token else bridge_token()
+        self._timeout = timeout_sec
+        self._sock: socket.socket | None = None
+        self._send_lock = threading.Lock()
+
+    def connect(self) -> "EventBridgeClient":
+        if self._unix_path and hasattr(socket, "AF_UNIX"):
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self._timeout)
+            sock.connect(self._unix_path)
+        else:
+            sock = socket.create_connection((self._host, self._port), timeout=self._timeout)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        sock.sendall(encode_frame(FRAME_HELLO, self._token.encode("utf-8")))
+        frame_type, body = read_frame(sock)
+        if frame_type != FRAME_WELCOME:
+            sock.close()
+            raise PermissionError(body.decode("utf-8", "ignore") or "autenticacao recusada")
+        sock.settimeout(None)
+        self._sock = sock
+        return self
+
+    def subscribe(self, patterns: Iterable[str]) -> None:
+        body = "\n".join(p.strip() for p in patterns if p and p.strip()).encode("utf-8")
+        self._send(FRAME_SUBSCRIBE, body)
+
+    def publish(
+        self,
+        event_type: str | Iterable[str],
+        payload: dict[str, Any] | None = None,
+        *,
+        source: str = "",
+    ) -> None:
+        topics = (event_type,) if isinstance(event_type, str) else tuple(event_type)
+        event = Event(
+            type=topics[0],
+            payload=payload or {},
+            source=source,
+            topics=topics if len(topics) > 1 else (),
+        )
+        self._send(FRAME_PUBLISH, encode_event(event))
+
+    def recv_event(self, timeout_sec: float | None = None) -> Optional[Event]:
+        sock = self._require_sock()
+        if timeout_sec is not None:
+            # Espera o frame sem timeout no meio da leitura (nao dessincroniza).
+            ready, _, _ = select.select([sock], [], [], max(0.0, float(timeout_sec)))
+            if not ready:
+                return None
+        frame_type, body = read_frame(sock)
+        if frame_type == FRAME_ERROR:
+            raise ConnectionError(body.decode("utf-8", "ignore"))
+        if frame_type != FRAME_EVENT:
+            return None
+        return decode_event(body)
+
+    def listen(self, callback: Callable[[Event], None], stop: threading.Event | None = None) -> None:
+        while stop is None or not stop.is_set():
+            event = self.recv_event(timeout_sec=0.5)
+            if event is not None:
+                callback(event)
+
+    def close(self) -> None:
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            except OSError:
+                pass
+            self._sock = None
+
+    def _send(self, frame_type: int, body: bytes) -> None:
+        frame = encode_frame(frame_type, body)
+        with self._send_lock:
+            self._require_sock().sendall(frame)
+
+    def _require_sock(self) -> socket.socket:
+        if self._sock is None:
+            raise ConnectionError("Event bridge nao conectado.")
+        return self._sock
+
+    def __enter__(self) -> "EventBridgeClient":
+        return self.connect()
+
+    def __exit__(self, *_exc: Any) -> None:
+        self.close()
+
+
+_server: EventBridgeServer | None = None
+
+
+def start_event_bridge_from_env() -> Optional[EventBridgeServer]:
+    global _server
+    if not bridge_enabled():
+        return None
+    if _server is not None:
+        return _server
+    server = EventBridgeServer(
+        host=bridge_host(),
+        port=bridge_port(),
+        unix_path=bridge_unix_path(),
+        token=bridge_token(),
+        require_token=_require_token(),
+        max_pending=_env_int("LUNA_EVENT_BRIDGE_MAX_PENDING", 500),
+    )
+    try:
+        server.start()
+    except Exception as exc:
+        logger.warning("Falha ao iniciar event bridge: %s", exc)
+        return None
+    _server = server
+    return server
+
+
+def stop_event_bridge() -> None:
+    global _server
+    if _server is not None:
+        _server.stop()
+        _server = None
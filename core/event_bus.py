@@ -1,52 +1,356 @@
 from __future__ import annotations
 
 import fnmatch
+import itertools
+import logging
+import os
+import re
 import threading
 import time
 import uuid
+from collections import deque
 from dataclasses import dataclass, field
-from typing import Any, Callable
+from typing import Any, Callable, Iterable
 
+from core.event_condition import ConditionSyntaxError, compile_condition
+from core.event_history import EventHistory
 
 Callback = Callable[["Event"], None]
+logger = logging.getLogger("EventBus")
 
+DISPATCH_MODES = ("sync", "async")
+OVERFLOW_POLICIES = ("drop_oldest", "drop_newest", "block")
 
-@dataclass(frozen=True)
+
+# Ids de evento: prefixo aleatorio por processo + sequencia hexadecimal.
+# itertools.count e atomico no CPython, sem lock nem uuid4 por evento.
+_EVENT_ID_PREFIX = uuid.uuid4().hex[:8]
+_event_seq = itertools.count(1)
+
+
+def next_event_id() -> str:
+    return f"{_EVENT_ID_PREFIX}-{next(_event_seq):x}"
+
+
+@dataclass(frozen=True, slots=True)
 class Event:
     type: str
     payload: dict[str, Any] = field(default_factory=dict)
     source: str = ""
     timestamp: float = field(default_factory=time.time)
-    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    id: str = field(default_factory=next_event_id)
+    # Topicos extras (aliases) do mesmo evento fisico; `type` e o primario.
+    topics: tuple[str, ...] = ()
+    # Mesmo valor em eventos distintos que representam a mesma ocorrencia
+    # (ex.: id da mensagem na plataforma); vazio = o proprio id.
+    correlation_id: str = ""
+
+    @property
+    def all_topics(self) -> tuple[str, ...]:
+        return self.topics or (self.type,)
 
+    @property
+    def correlation(self) -> str:
+        return self.correlation_id or self.id
 
-@dataclass(frozen=True)
+    def as_topic(self, topic: str) -> "Event":
+        """Visao do mesmo evento (mesmo id/payload) sob outro topico logico."""
+        if topic == self.type:
+            return self
+        return Event(
+            topic,
+            self.payload,
+            self.source,
+            self.timestamp,
+            self.id,
+            self.topics,
+            self.correlation_id,
+        )
+
+
+def pattern_specificity(pattern: str) -> tuple[int, int, int]:
+    """Chave de ordenacao: topico exato > mais segmentos literais > mais caracteres literais."""
+    segments = pattern.split(".")
+    literal_segments = sum(1 for seg in segments if not _GLOB_CHARS.intersection(seg))
+    literal_chars = sum(1 for ch in pattern if ch not in _GLOB_CHARS)
+    exact = 0 if _GLOB_CHARS.intersection(pattern) else 1
+    return exact, literal_segments, literal_chars
+
+
+@dataclass(frozen=True, slots=True)
 class EventFilter:
     event: str
     condition: str = ""
+    _predicate: Callable[..., bool] | None = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    _event_match: Callable[[str], Any] | None = field(
+        default=None, init=False, repr=False, compare=False
+    )
+
+    def __post_init__(self) -> None:
+        predicate: Callable[..., bool] | None = None
+        if self.event and not _GLOB_CHARS.intersection(self.event):
+            event_name = self.event
+            object.__setattr__(self, "_event_match", lambda topic: topic == event_name)
+        elif self.event:
+            object.__setattr__(
+                self, "_event_match", re.compile(fnmatch.translate(self.event)).match
+            )
+        if self.condition.strip():
+            try:
+                predicate = compile_condition(self.condition)
+            except ConditionSyntaxError:
+                predicate = _reject
+        object.__setattr__(self, "_predicate", predicate)
 
     def matches(self, event: Event) -> bool:
-        if self.event and not fnmatch.fnmatch(event.type, self.event):
+        if not self.matches_topic(event):
             return False
-        if not self.condition:
+        return self.accepts(event)
+
+    def matches_topic(self, event: Event) -> bool:
+        """So o padrao de evento (algum topico do evento), sem a condicao."""
+        event_match = self._event_match
+        if event_match is None:
             return True
-        return _safe_eval_condition(self.condition, event)
+        if event.topics:
+            for topic in event.topics:
+                if event_match(topic):
+                    return True
+            return False
+        return bool(event_match(event.type))
+
+    def accepts(self, event: Event) -> bool:
+        """So a condicao sobre o payload."""
+        if self._predicate is None:
+            return True
+        payload = event.payload if isinstance(event.payload, dict) else {}
+        return self._predicate(payload, event.source, event.type)
+
 
+def _reject(*_args: Any) -> bool:
+    return False
+
+
+def _passes(filters: tuple[EventFilter, ...], event: Event) -> bool:
+    for flt in filters:
+        if not flt.matches(event):
+            return False
+    return True
+
+
+def _passes_any(filters: tuple[EventFilter, ...], event: Event) -> bool:
+    for flt in filters:
+        if flt.matches(event):
+            return True
+    return False
 
-@dataclass
+
+class _AsyncDispatcher:
+    """
+    Fila limitada + worker dedicado para um assinante em modo async.
+
+    O produtor (emit) so faz append numa deque; o callback roda na thread do
+    assinante. Politicas de overflow:
+    - drop_oldest: descarta o evento mais antigo pendente;
+    - drop_newest: descarta o evento que esta chegando;
+    - block: espera ate `block_timeout` por espaco e depois descarta o novo.
+    """
+
+    def __init__(
+        self,
+        callback: Callback,
+        *,
+        name: str,
+        max_pending: int,
+        overflow: str,
+        block_timeout: float,
+    ):
+        self._callback = callback
+        self._max_pending = max(1, int(max_pending))
+        self._overflow = overflow
+        self._block_timeout = max(0.0, float(block_timeout))
+        self._pending: deque[tuple[float, Event]] = deque()
+        self._cond = threading.Condition(threading.Lock())
+        self._stopped = False
+        self.delivered = 0
+        self.dropped = 0
+        self.failed = 0
+        self.max_lag = 0
+        self.last_lag_sec = 0.0
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, event: Event) -> bool:
+        with self._cond:
+            if self._stopped:
+                return False
+            if len(self._pending) >= self._max_pending:
+                if self._overflow == "drop_oldest":
+                    self._pending.popleft()
+                    self.dropped += 1
+                elif self._overflow == "block":
+                    self._cond.wait_for(
+                        lambda: self._stopped or len(self._pending) < self._max_pending,
+                        timeout=self._block_timeout,
+                    )
+                    if self._stopped or len(self._pending) >= self._max_pending:
+                        self.dropped += 1
+                        return False
+                else:
+                    self.dropped += 1
+                    return False
+            self._pending.append((time.monotonic(), event))
+            if len(self._pending) > self.max_lag:
+                self.max_lag = len(self._pending)
+            self._cond.notify_all()
+        return True
+
+    def stop(self) -> None:
+        with self._cond:
+            self._stopped = True
+            self._pending.clear()
+            self._cond.notify_all()
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._stopped or bool(self._pending))
+                if self._stopped:
+                    return
+                enqueued_at, event = self._pending.popleft()
+                self._cond.notify_all()
+            self.last_lag_sec = time.monotonic() - enqueued_at
+            try:
+                self._callback(event)
+                self.delivered += 1
+            except Exception as exc:
+                self.failed += 1
+                logger.debug("Assinante async falhou em %s: %s", event.type, exc)
+
+
+@dataclass(slots=True)
 class _Subscription:
     pattern: str
     callback: Callback
     subscriber_id: str = ""
     filters: tuple[EventFilter, ...] = ()
+    # Uniao (OU) de filtros; vazio = aceita tudo.
+    any_filters: tuple[EventFilter, ...] = ()
+    seq: int = 0
+    dispatcher: _AsyncDispatcher | None = None
+
+
+_GLOB_CHARS = frozenset("*?[")
+_MATCH_CACHE_MAX = 1024
+
+
+class _TrieNode:
+    __slots__ = ("children", "entries")
+
+    def __init__(self) -> None:
+        self.children: dict[str, _TrieNode] = {}
+        self.entries: list[tuple[Callable[[str], Any], _Subscription]] = []
+
+
+class _SubscriptionIndex:
+    """
+    Snapshot imutavel das assinaturas.
+
+    - padroes sem curinga ficam em buckets por topico exato;
+    - padroes com curinga ficam numa trie pelos segmentos literais do prefixo
+      (`chat.*.superchat` -> `chat`) e sao confirmados pelo glob compilado.
+
+    O resultado por tipo de evento e memorizado no proprio snapshot, que e
+    descartado inteiro a cada subscribe/unsubscribe.
+    """
+
+    __slots__ = ("_exact", "_root", "_cache", "_multi_cache", "size")
+
+    def __init__(self, subscriptions: list[_Subscription]):
+        self._exact: dict[str, list[_Subscription]] = {}
+        self._root = _TrieNode()
+        self._cache: dict[str, tuple[_Subscription, ...]] = {}
+        self._multi_cache: dict[tuple[str, ...], tuple[tuple[_Subscription, str], ...]] = {}
+        self.size = len(subscriptions)
+        for sub in subscriptions:
+            pattern = sub.pattern
+            if not _GLOB_CHARS.intersection(pattern):
+                self._exact.setdefault(pattern, []).append(sub)
+                continue
+            node = self._root
+            for segment in pattern.split("."):
+                if _GLOB_CHARS.intersection(segment):
+                    break
+                node = node.children.setdefault(segment, _TrieNode())
+            matcher = re.compile(fnmatch.translate(pattern)).match
+            node.entries.append((matcher, sub))
+
+    def match(self, event_type: str) -> tuple[_Subscription, ...]:
+        cached = self._cache.get(event_type)
+        if cached is not None:
+            return cached
+
+        found: list[_Subscription] = list(self._exact.get(event_type, ()))
+        node: _TrieNode | None = self._root
+        segments = event_type.split(".")
+        depth = 0
+        while node is not None:
+            for matcher, sub in node.entries:
+                if matcher(event_type):
+                    found.append(sub)
+            if depth >= len(segments):
+                break
+            node = node.children.get(segments[depth])
+            depth += 1
+
+        found.sort(key=lambda sub: sub.seq)
+        result = tuple(found)
+        if len(self._cache) >= _MATCH_CACHE_MAX:
+            self._cache.clear()
+        self._cache[event_type] = result
+        return result
+
+    def match_topics(self, topics: tuple[str, ...]) -> tuple[tuple[_Subscription, str], ...]:
+        """
+        Casa um evento com varios topicos: cada assinante aparece uma vez,
+        junto do primeiro topico (na ordem dada) que casou com seu padrao.
+        """
+        cached = self._multi_cache.get(topics)
+        if cached is not None:
+            return cached
+        first_topic: dict[int, tuple[_Subscription, str]] = {}
+        for topic in topics:
+            for sub in self.match(topic):
+                if sub.seq not in first_topic:
+                    first_topic[sub.seq] = (sub, topic)
+        result = tuple(first_topic[seq] for seq in sorted(first_topic))
+        if len(self._multi_cache) >= _MATCH_CACHE_MAX:
+            self._multi_cache.clear()
+        self._multi_cache[topics] = result
+        return result
 
 
 class EventBus:
-    def __init__(self, max_history: int = 100):
+    def __init__(self, max_history: int = 100, per_type_history: int = 256):
         self._lock = threading.RLock()
         self._subscriptions: dict[str, _Subscription] = {}
-        self._history: list[Event] = []
-        self._max_history = max(1, int(max_history))
+        self._index = _SubscriptionIndex([])
+        self._seq = 0
+        self._history = EventHistory(
+            capacity=max_history,
+            per_type_capacity=per_type_history,
+        )
+        self._max_history = self._history.capacity
+
+    def _rebuild_index(self) -> None:
+        # Chamado com self._lock; emit le self._index sem lock (copy-on-write).
+        self._index = _SubscriptionIndex(list(self._subscriptions.values()))
 
     def subscribe(
         self,
@@ -54,86 +358,206 @@ class EventBus:
         callback: Callback,
         *,
         filters: list[EventFilter] | tuple[EventFilter, ...] | None = None,
+        any_filters: list[EventFilter] | tuple[EventFilter, ...] | None = None,
         subscriber_id: str = "",
+        mode: str = "sync",
+        max_pending: int = 100,
+        overflow: str = "drop_oldest",
+        block_timeout: float = 0.5,
     ) -> str:
+        """
+        Registra um callback para eventos que casem com `pattern`.
+
+        `filters` precisam casar todos; de `any_filters` basta um. Ambos rodam
+        no emit, antes de qualquer fila do assinante.
+
+        mode="sync" (padrao) chama o callback na thread que emitiu o evento.
+        mode="async" entrega por uma fila propria de ate `max_pending` eventos
+        consumida por uma thread dedicada, com politica de `overflow`
+        (drop_oldest, drop_newest ou block com `block_timeout` segundos).
+        """
+        mode = (mode or "sync").strip().lower()
+        if mode not in DISPATCH_MODES:
+            raise ValueError(f"Modo de dispatch invalido: '{mode}'.")
+        overflow = (overflow or "drop_oldest").strip().lower()
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Politica de overflow invalida: '{overflow}'.")
+
         sub_id = uuid.uuid4().hex
-        subscription = _Subscription(
-            pattern=pattern or "*",
-            callback=callback,
-            subscriber_id=subscriber_id,
-            filters=tuple(filters or ()),
-        )
+        dispatcher = None
+        if mode == "async":
+            dispatcher = _AsyncDispatcher(
+                callback,
+                name=f"EventBus-{subscriber_id or sub_id[:8]}",
+                max_pending=max_pending,
+                overflow=overflow,
+                block_timeout=block_timeout,
+            )
         with self._lock:
+            self._seq += 1
+            subscription = _Subscription(
+                pattern=pattern or "*",
+                callback=callback,
+                subscriber_id=subscriber_id,
+                filters=tuple(filters or ()),
+                any_filters=tuple(any_filters or ()),
+                seq=self._seq,
+                dispatcher=dispatcher,
+            )
             self._subscriptions[sub_id] = subscription
+            self._rebuild_index()
         return sub_id
 
     def unsubscribe(self, sub_id: str) -> None:
         with self._lock:
-            self._subscriptions.pop(sub_id, None)
+            sub = self._subscriptions.pop(sub_id, None)
+            if sub is not None:
+                self._rebuild_index()
+        if sub is not None and sub.dispatcher is not None:
+            sub.dispatcher.stop()
 
     def clear(self, subscriber_id: str = "") -> None:
+        removed: list[_Subscription] = []
         with self._lock:
-            if not subscriber_id:
-                self._subscriptions.clear()
-                return
             for sub_id, sub in list(self._subscriptions.items()):
-                if sub.subscriber_id == subscriber_id:
-                    self._subscriptions.pop(sub_id, None)
+                if not subscriber_id or sub.subscriber_id == subscriber_id:
+                    removed.append(self._subscriptions.pop(sub_id))
+            self._rebuild_index()
+        for sub in removed:
+            if sub.dispatcher is not None:
+                sub.dispatcher.stop()
 
-    def emit(self, event: Event) -> int:
+    def get_subscription_stats(self) -> list[dict[str, Any]]:
         with self._lock:
-            self._history.append(event)
-            if len(self._history) > self._max_history:
-                self._history = self._history[-self._max_history :]
-            subscriptions = list(self._subscriptions.items())
+            items = list(self._subscriptions.items())
+        stats: list[dict[str, Any]] = []
+        for sub_id, sub in items:
+            dispatcher = sub.dispatcher
+            stats.append(
+                {
+                    "id": sub_id,
+                    "pattern": sub.pattern,
+                    "subscriber_id": sub.subscriber_id,
+                    "mode": "async" if dispatcher else "sync",
+                    "pending": dispatcher.pending if dispatcher else 0,
+                    "max_lag": dispatcher.max_lag if dispatcher else 0,
+                    "last_lag_sec": dispatcher.last_lag_sec if dispatcher else 0.0,
+                    "delivered": dispatcher.delivered if dispatcher else 0,
+                    "dropped": dispatcher.dropped if dispatcher else 0,
+                    "failed": dispatcher.failed if dispatcher else 0,
+                }
+            )
+        return stats
+
+    @property
+    def subscription_count(self) -> int:
+        return self._index.size
+
+    def emit(self, event: Event) -> int:
+        self._history.append(event, event.timestamp, event.all_topics)
+
+        # Multi-topico: uma visao (as_topic) por topico, compartilhada entre
+        # os assinantes que casaram por ele; todas carregam `topics` inteiro.
+        views: dict[str, Event] | None = None
+        if event.topics:
+            matches = self._index.match_topics(event.topics)
+            views = {event.type: event}
+        else:
+            matches = tuple((sub, event.type) for sub in self._index.match(event.type))
 
         notified = 0
-        for _, sub in subscriptions:
-            if not fnmatch.fnmatch(event.type, sub.pattern):
+        for sub, topic in matches:
+            if views is None:
+                delivered = event
+            else:
+                delivered = views.get(topic)
+                if delivered is None:
+                    delivered = views[topic] = event.as_topic(topic)
+            if sub.filters and not _passes(sub.filters, delivered):
                 continue
-            if sub.filters and not all(f.matches(event) for f in sub.filters):
+            if sub.any_filters and not _passes_any(sub.any_filters, delivered):
+                continue
+            if sub.dispatcher is not None:
+                if sub.dispatcher.submit(delivered):
+                    notified += 1
                 continue
             try:
-                sub.callback(event)
+                sub.callback(delivered)
                 notified += 1
             except Exception:
                 continue
         return notified
 
     def get_history(self, event_type: str = "", limit: int = 10) -> list[Event]:
-        limit = max(1, int(limit))
-        with self._lock:
-            history = list(self._history)
-        if event_type:
-            history = [ev for ev in history if ev.type == event_type]
-        return history[-limit:]
+        entries = self._history.query(event_type=event_type, limit=limit)
+        return [event for _, event in entries]  # type: ignore[misc]
+
+    def query_history(
+        self,
+        *,
+        event_type: str = "",
+        limit: int = 50,
+        since: float | None = None,
+        until: float | None = None,
+        before_seq: int | None = None,
+    ) -> dict[str, Any]:
+        """
+        Pagina o historico do mais recente para o mais antigo.
+
+        Retorna {"events": [...], "next_cursor": seq|None}; passe next_cursor
+        como `before_seq` para buscar a pagina anterior.
+        """
+        entries = self._history.query(
+            event_type=event_type,
+            limit=limit,
+            since=since,
+            until=until,
+            before_seq=before_seq,
+        )
+        events = [event for _, event in entries]
+        next_cursor = entries[0][0] if len(entries) >= max(1, int(limit)) else None
+        return {"events": events, "next_cursor": next_cursor}
 
 
 def _safe_eval_condition(expr: str, event: Event) -> bool:
     """
-    Avalia condicoes simples sem expor builtins.
+    Avalia condicoes simples sem eval() (ver core.event_condition).
 
     Exemplo suportado:
     - "event.text != ''"
     - "event.amount > 100"
     """
-    expr = (expr or "").strip()
-    if not expr:
-        return True
+    try:
+        predicate = compile_condition(expr)
+    except ConditionSyntaxError:
+        return False
     payload = event.payload if isinstance(event.payload, dict) else {}
-    safe_context = {
-        "event": payload,
+    return predicate(payload, event.source, event.type)
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def event_to_dict(event: Event) -> dict[str, Any]:
+    return {
+        "id": event.id,
+        "type": event.type,
+        "topics": list(event.all_topics),
+        "correlation_id": event.correlation,
         "source": event.source,
-        "event_type": event.type,
+        "timestamp": event.timestamp,
+        "payload": event.payload,
     }
-    try:
-        result = eval(expr, {"__builtins__": {}}, safe_context)  # noqa: S307
-        return bool(result)
-    except Exception:
-        return False
 
 
-event_bus = EventBus()
+event_bus = EventBus(
+    max_history=_env_int("LUNA_EVENT_HISTORY_MAX", 1000),
+    per_type_history=_env_int("LUNA_EVENT_HISTORY_PER_TYPE", 256),
+)
 
 
 def emit_event(
@@ -141,11 +565,46 @@ def emit_event(
     payload: dict[str, Any] | None = None,
     *,
     source: str = "",
+    correlation_id: str = "",
 ) -> Event:
     event = Event(
         type=event_type,
         payload=payload or {},
         source=source,
+        correlation_id=correlation_id,
+    )
+    event_bus.emit(event)
+    return event
+
+
+def emit_many(
+    event_types: Iterable[str],
+    payload: dict[str, Any] | None = None,
+    *,
+    source: str = "",
+    correlation_id: str = "",
+) -> Event | None:
+    """
+    Emite um unico evento fisico sob varios topicos (aliases).
+
+    O primeiro topico vira `Event.type`; o evento tem um id, uma entrada no
+    historico e cada assinante e notificado no maximo uma vez, recebendo o
+    evento sob o primeiro topico que casou com seu padrao. Quem ramifica por
+    topico consulta `event.topics` (todos os aliases).
+    """
+    unique: list[str] = []
+    for topic in event_types:
+        if topic and topic not in unique:
+            unique.append(topic)
+    if not unique:
+        return None
+    topics = tuple(unique)
+    event = Event(
+        type=topics[0],
+        payload=payload or {},
+        source=source,
+        topics=topics,
+        correlation_id=correlation_id,
     )
     event_bus.emit(event)
     return event
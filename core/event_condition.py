@@ -0,0 +1,221 @@
+from __future__ import annotations
+
+import ast
+import operator
+from collections.abc import Mapping
+from functools import lru_cache
+from typing import Any, Callable
+
+
+# Condicoes compiladas recebem (payload, source, event_type).
+Condition = Callable[[Mapping[str, Any], str, str], bool]
+_Getter = Callable[[Mapping[str, Any], str, str], Any]
+
+
+class ConditionSyntaxError(ValueError):
+    def __init__(self, expr: str, detail: str):
+        self.expr = expr
+        self.detail = detail
+        super().__init__(f"Condicao invalida '{expr}': {detail}")
+
+
+_COMPARE_OPS: dict[type[ast.cmpop], Callable[[Any, Any], bool]] = {
+    ast.Eq: operator.eq,
+    ast.NotEq: operator.ne,
+    ast.Lt: operator.lt,
+    ast.LtE: operator.le,
+    ast.Gt: operator.gt,
+    ast.GtE: operator.ge,
+    ast.Is: operator.is_,
+    ast.IsNot: operator.is_not,
+    ast.In: lambda a, b: a in b,
+    ast.NotIn: lambda a, b: a not in b,
+}
+
+_NAMES: dict[str, _Getter] = {
+    "event": lambda payload, source, event_type: payload,
+    "source": lambda payload, source, event_type: source,
+    "event_type": lambda payload, source, event_type: event_type,
+}
+
+# Metodos permitidos em chamadas: dict.get e alguns helpers de string.
+_METHODS = {"get", "lower", "upper", "strip", "startswith", "endswith"}
+
+
+def _attr(value: Any, name: str) -> Any:
+    if isinstance(value, Mapping):
+        return value.get(name)
+    return None
+
+
+def _subscript(value: Any, key: Any) -> Any:
+    if isinstance(value, Mapping):
+        return value.get(key)
+    try:
+        return value[key]
+    except Exception:
+        return None
+
+
+def _call_method(value: Any, name: str, args: tuple[Any, ...]) -> Any:
+    if name == "get":
+        if not isinstance(value, Mapping):
+            return None
+        return value.get(*args)
+    if not isinstance(value, str):
+        return None
+    return getattr(value, name)(*args)
+
+
+class _Compiler:
+    def __init__(self, expr: str):
+        self._expr = expr
+
+    def _fail(self, detail: str) -> ConditionSyntaxError:
+        return ConditionSyntaxError(self._expr, detail)
+
+    def compile(self, node: ast.AST) -> _Getter:
+        if isinstance(node, ast.Constant):
+            value = node.value
+            return lambda payload, source, event_type: value
+
+        if isinstance(node, (ast.Tuple, ast.List, ast.Set)):
+            if all(isinstance(elt, ast.Constant) for elt in node.elts):
+                frozen = tuple(elt.value for elt in node.elts)  # type: ignore[attr-defined]
+                return lambda payload, source, event_type: frozen
+            items = tuple(self.compile(elt) for elt in node.elts)
+            return lambda payload, source, event_type: tuple(
+                item(payload, source, event_type) for item in items
+            )
+
+        if isinstance(node, ast.Name):
+            getter = _NAMES.get(node.id)
+            if getter is None:
+                raise self._fail(f"nome desconhecido '{node.id}'")
+            return getter
+
+        if isinstance(node, ast.Attribute):
+            base = self.compile(node.value)
+            name = node.attr
+            if name.startswith("_"):
+                raise self._fail(f"atributo privado '{name}'")
+            return lambda payload, source, event_type: _attr(base(payload, source, event_type), name)
+
+        if isinstance(node, ast.Subscript):
+            base = self.compile(node.value)
+            key = self.compile(node.slice)
+            return lambda payload, source, event_type: _subscript(
+                base(payload, source, event_type),
+                key(payload, source, event_type),
+            )
+
+        if isinstance(node, ast.Call):
+            func = node.func
+            if not isinstance(func, ast.Attribute) or func.attr not in _METHODS:
+                raise self._fail("apenas chamadas .get/.lower/.upper/.strip/.startswith/.endswith")
+            if node.keywords:
+                raise self._fail("argumentos nomeados nao suportados")
+            base = self.compile(func.value)
+            name = func.attr
+            args = tuple(self.compile(arg) for arg in node.args)
+            return lambda payload, source, event_type: _call_method(
+                base(payload, source, event_type),
+                name,
+                tuple(arg(payload, source, event_type) for arg in args),
+            )
+
+        if isinstance(node, ast.UnaryOp):
+            operand = self.compile(node.operand)
+            if isinstance(node.op, ast.Not):
+                return lambda payload, source, event_type: not operand(payload, source, event_type)
+            if isinstance(node.op, ast.USub):
+                return lambda payload, source, event_type: -operand(payload, source, event_type)
+            raise self._fail("operador unario nao suportado")
+
+        if isinstance(node, ast.BoolOp):
+            values = tuple(self.compile(value) for value in node.values)
+            if isinstance(node.op, ast.And):
+                def _and(payload, source, event_type):
+                    result: Any = True
+                    for value in values:
+                        result = value(payload, source, event_type)
+                        if not result:
+                            return result
+                    return result
+                return _and
+
+            def _or(payload, source, event_type):
+                result: Any = False
+                for value in values:
+                    result = value(payload, source, event_type)
+                    if result:
+                        return result
+                return result
+            return _or
+
+        if isinstance(node, ast.Compare):
+            left = self.compile(node.left)
+            steps = []
+            for op, comparator in zip(node.ops, node.comparators):
+                fn = _COMPARE_OPS.get(type(op))
+                if fn is None:
+                    raise self._fail("comparacao nao suportada")
+                steps.append((fn, self.compile(comparator)))
+            if len(steps) == 1:
+                fn, right = steps[0]
+                return lambda payload, source, event_type: fn(
+                    left(payload, source, event_type),
+                    right(payload, source, event_type),
+                )
+
+            def _chain(payload, source, event_type):
+                current = left(payload, source, event_type)
+                for fn, right in steps:
+                    nxt = right(payload, source, event_type)
+                    if not fn(current, nxt):
+                        return False
+                    current = nxt
+                return True
+            return _chain
+
+        raise self._fail(f"sintaxe nao suportada ({type(node).__name__})")
+
+
+def _always_true(payload: Mapping[str, Any], source: str, event_type: str) -> bool:
+    return True
+
+
+@lru_cache(maxsize=512)
+def compile_condition(expr: str) -> Condition:
+    """
+    Compila uma condicao de filtro uma unica vez (cache por texto).
+
+    Subconjunto suportado: literais, comparacoes, and/or/not, `event.x`,
+    `event['x']`, `event.get('x', padrao)`, `source` e `event_type`.
+    Levanta ConditionSyntaxError para qualquer outra construcao.
+    """
+    text = (expr or "").strip()
+    if not text:
+        return _always_true
+    try:
+        tree = ast.parse(text, mode="eval")
+    except SyntaxError as exc:
+        raise ConditionSyntaxError(text, exc.msg or "erro de sintaxe") from exc
+    getter = _Compiler(text).compile(tree.body)
+
+    def _condition(payload: Mapping[str, Any], source: str, event_type: str) -> bool:
+        try:
+            return bool(getter(payload, source, event_type))
+        except Exception:
+            return False
+
+    return _condition
+
+
+def condition_error(expr: str) -> str:
+    """Retorna a mensagem de erro da condicao ou string vazia se valida."""
+    try:
+        compile_condition(expr)
+    except ConditionSyntaxError as exc:
+        return str(exc)
+    return ""
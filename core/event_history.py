@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import bisect
+import threading
+from typing import Generic, TypeVar
+
+
+T = TypeVar("T")
+
+
+class _Ring(Generic[T]):
+    """Buffer circular de capacidade fixa: append O(1), leitura das ultimas k O(k)."""
+
+    __slots__ = ("_items", "_capacity", "_head", "_count")
+
+    def __init__(self, capacity: int):
+        self._capacity = max(1, int(capacity))
+        self._items: list[T | None] = [None] * self._capacity
+        self._head = 0
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def append(self, item: T) -> None:
+        self._items[self._head] = item
+        self._head = (self._head + 1) % self._capacity
+        if self._count < self._capacity:
+            self._count += 1
+
+    def __getitem__(self, index: int) -> T:
+        # index 0 = mais antigo ainda no buffer.
+        if index < 0:
+            index += self._count
+        if index < 0 or index >= self._count:
+            raise IndexError(index)
+        start = (self._head - self._count) % self._capacity
+        return self._items[(start + index) % self._capacity]  # type: ignore[return-value]
+
+    def clear(self) -> None:
+        self._items = [None] * self._capacity
+        self._head = 0
+        self._count = 0
+
+
+class EventHistory:
+    """
+    Historico de eventos em buffer circular com indice secundario por topico.
+
+    Cada entrada recebe um numero de sequencia crescente, usado como cursor de
+    paginacao. Os aneis por topico guardam referencias (sem copia) e sao
+    truncados logicamente pela janela do anel principal.
+    """
+
+    def __init__(self, capacity: int = 1000, per_type_capacity: int = 256, max_types: int = 512):
+        self._capacity = max(1, int(capacity))
+        self._per_type_capacity = max(1, min(int(per_type_capacity), self._capacity))
+        self._max_types = max(1, int(max_types))
+        self._ring: _Ring[tuple[int, float, object]] = _Ring(self._capacity)
+        self._by_type: dict[str, _Ring[tuple[int, float, object]]] = {}
+        self._seq = 0
+        self._lock = threading.Lock()
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    def __len__(self) -> int:
+        return len(self._ring)
+
+    def append(self, item: object, timestamp: float, topics: tuple[str, ...]) -> int:
+        with self._lock:
+            self._seq += 1
+            entry = (self._seq, timestamp, item)
+            self._ring.append(entry)
+            for topic in topics:
+                ring = self._by_type.get(topic)
+                if ring is None:
+                    if len(self._by_type) >= self._max_types:
+                        self._drop_stale_types()
+                    ring = self._by_type[topic] = _Ring(self._per_type_capacity)
+                ring.append(entry)
+            return self._seq
+
+    def clear(self) -> None:
+        with self._lock:
+            self._ring.clear()
+            self._by_type.clear()
+
+    def query(
+        self,
+        *,
+        event_type: str = "",
+        limit: int = 10,
+        since: float | None = None,
+        until: float | None = None,
+        before_seq: int | None = None,
+    ) -> list[tuple[int, object]]:
+        """
+        Retorna ate `limit` entradas (seq, item), da mais antiga para a mais
+        recente, opcionalmente filtradas por topico, janela de tempo
+        [since, until] e cursor `before_seq` (exclusivo).
+        """
+        limit = max(1, int(limit))
+        with self._lock:
+            oldest_seq = self._seq - len(self._ring) + 1
+            if event_type:
+                ring = self._by_type.get(event_type)
+                if ring is None:
+                    return []
+            else:
+                ring = self._ring
+
+            end = len(ring)
+            if until is not None:
+                end = bisect.bisect_right(ring, until, key=lambda entry: entry[1])
+            if before_seq is not None:
+                end = min(end, bisect.bisect_left(ring, before_seq, key=lambda entry: entry[0]))
+
+            selected: list[tuple[int, object]] = []
+            for idx in range(end - 1, -1, -1):
+                seq, ts, item = ring[idx]
+                if seq < oldest_seq:
+                    break
+                if since is not None and ts < since:
+                    break
+                selected.append((seq, item))
+                if len(selected) >= limit:
+                    break
+        selected.reverse()
+        return selected
+
+    def _drop_stale_types(self) -> None:
+        # Remove topicos cujos eventos ja sairam do anel principal.
+        oldest_seq = self._seq - len(self._ring) + 1
+        for topic, ring in list(self._by_type.items()):
+            if not len(ring) or ring[-1][0] < oldest_seq:
+                self._by_type.pop(topic, None)
+        if len(self._by_type) >= self._max_types:
+            self._by_type.pop(next(iter(self._by_type)), None)
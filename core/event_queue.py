@@ -2,7 +2,10 @@ from __future__ import annotations
 
 import queue
 import threading
-from typing import Generic, TypeVar
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Generic, Sequence, TypeVar
 
 
 T = TypeVar("T")
@@ -65,3 +68,289 @@ class EventQueue(Generic[T]):
     @is_processing.setter
     def is_processing(self, value: bool) -> None:
         self._processing = bool(value)
+
+
+@dataclass(frozen=True, slots=True)
+class PriorityClass:
+    name: str
+    priority: int = 0
+    # 0 = sem expiracao; eventos mais velhos que isso sao descartados no get().
+    max_age_sec: float = 0.0
+    # Se True, itens com a mesma chave de coalescencia colapsam no mais recente.
+    coalesce: bool = False
+
+
+class _ClassStats:
+    __slots__ = ("enqueued", "dequeued", "dropped", "expired", "coalesced", "wait_total", "wait_max")
+
+    def __init__(self) -> None:
+        self.enqueued = 0
+        self.dequeued = 0
+        self.dropped = 0
+        self.expired = 0
+        self.coalesced = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+
+class _Entry(Generic[T]):
+    __slots__ = ("item", "enqueued_at", "key", "alive")
+
+    def __init__(self, item: T, enqueued_at: float, key: str | None):
+        self.item = item
+        self.enqueued_at = enqueued_at
+        self.key = key
+        self.alive = True
+
+
+DEFAULT_PRIORITY_CLASS = PriorityClass(name="default", priority=0)
+
+
+class PriorityEventQueue(Generic[T]):
+    """
+    Fila limitada com classes de prioridade, coalescencia e expiracao.
+
+    - get() sempre entrega primeiro a classe de maior prioridade (FIFO dentro
+      da classe);
+    - com a fila cheia, um item novo despeja o mais antigo de uma classe de
+      prioridade menor; se nao houver, o novo e descartado;
+    - em classes com `coalesce`, itens com a mesma chave colapsam no mais
+      recente, mantendo a posicao do primeiro;
+    - itens mais velhos que `max_age_sec` da classe sao descartados antes de
+      serem processados.
+
+    Mantem a mesma interface de EventQueue (put/get/task_done/clear/metricas).
+    """
+
+    def __init__(
+        self,
+        max_size: int = 100,
+        *,
+        classes: Sequence[PriorityClass] = (),
+        classify: Callable[[T], str] | None = None,
+        coalesce_key: Callable[[T], str | None] | None = None,
+    ):
+        self._max_size = max(1, int(max_size))
+        self._cond = threading.Condition(threading.Lock())
+        self._processing = False
+        self._unfinished = 0
+        self._configure(classes, classify, coalesce_key)
+
+    def _configure(
+        self,
+        classes: Sequence[PriorityClass],
+        classify: Callable[[T], str] | None,
+        coalesce_key: Callable[[T], str | None] | None,
+    ) -> None:
+        ordered = sorted(classes or (DEFAULT_PRIORITY_CLASS,), key=lambda c: -c.priority)
+        self._classes: dict[str, PriorityClass] = {c.name: c for c in ordered}
+        self._default_class = ordered[-1].name
+        self._order: list[str] = [c.name for c in ordered]
+        self._pending: dict[str, deque[_Entry[T]]] = {name: deque() for name in self._order}
+        self._stats: dict[str, _ClassStats] = {name: _ClassStats() for name in self._order}
+        self._by_key: dict[str, _Entry[T]] = {}
+        self._size = 0
+        self._classify = classify
+        self._coalesce_key = coalesce_key
+
+    def configure(
+        self,
+        *,
+        classes: Sequence[PriorityClass] = (),
+        classify: Callable[[T], str] | None = None,
+        coalesce_key: Callable[[T], str | None] | None = None,
+    ) -> None:
+        """Troca a politica; descarta itens pendentes e zera metricas."""
+        with self._cond:
+            self._configure(classes, classify, coalesce_key)
+            self._unfinished = 0
+            self._cond.notify_all()
+
+    def _class_of(self, item: T) -> str:
+        if self._classify is None:
+            return self._default_class
+        try:
+            name = self._classify(item)
+        except Exception:
+            return self._default_class
+        return name if name in self._classes else self._default_class
+
+    def put(self, item: T) -> bool:
+        cls_name = self._class_of(item)
+        key = None
+        if self._coalesce_key is not None and self._classes[cls_name].coalesce:
+            try:
+                raw_key = self._coalesce_key(item)
+            except Exception:
+                raw_key = None
+            if raw_key is not None:
+                key = f"{cls_name}:{raw_key}"
+        now = time.monotonic()
+        with self._cond:
+            stats = self._stats[cls_name]
+            if key is not None:
+                existing = self._by_key.get(key)
+                if existing is not None and existing.alive:
+                    existing.item = item
+                    existing.enqueued_at = now
+                    stats.coalesced += 1
+                    return True
+
+            if self._size >= self._max_size and not self._evict_lower(cls_name):
+                stats.dropped += 1
+                return False
+
+            entry = _Entry(item, now, key)
+            self._pending[cls_name].append(entry)
+            if key is not None:
+                self._by_key[key] = entry
+            self._size += 1
+            self._unfinished += 1
+            stats.enqueued += 1
+            self._cond.notify()
+            return True
+
+    def _evict_lower(self, cls_name: str) -> bool:
+        priority = self._classes[cls_name].priority
+        for name in reversed(self._order):
+            if self._classes[name].priority >= priority:
+                return False
+            pending = self._pending[name]
+            while pending:
+                victim = pending.popleft()
+                if not victim.alive:
+                    continue
+                self._discard(victim)
+                self._stats[name].dropped += 1
+                return True
+        return False
+
+    def _discard(self, entry: _Entry[T]) -> None:
+        entry.alive = False
+        if entry.key is not None and self._by_key.get(entry.key) is entry:
+            self._by_key.pop(entry.key, None)
+        self._size -= 1
+        self._unfinished -= 1
+
+    def _pop_next(self, now: float) -> _Entry[T] | None:
+        for name in self._order:
+            pending = self._pending[name]
+            max_age = self._classes[name].max_age_sec
+            stats = self._stats[name]
+            while pending:
+                entry = pending.popleft()
+                if not entry.alive:
+                    continue
+                age = now - entry.enqueued_at
+                self._discard(entry)
+                if max_age > 0 and age > max_age:
+                    stats.expired += 1
+                    continue
+                self._unfinished += 1
+                stats.dequeued += 1
+                stats.wait_total += age
+                if age > stats.wait_max:
+                    stats.wait_max = age
+                return entry
+        return None
+
+    def get(self, timeout_sec: float | None = None) -> T | None:
+        popped = self.get_timed(timeout_sec)
+        return popped[0] if popped is not None else None
+
+    def get_timed(self, timeout_sec: float | None = None) -> tuple[T, float] | None:
+        """Como get(), mas devolve (item, instante de entrada em time.monotonic())."""
+        deadline = None if timeout_sec is None else time.monotonic() + max(0.0, float(timeout_sec))
+        with self._cond:
+            while True:
+                entry = self._pop_next(time.monotonic())
+                if entry is not None:
+                    return entry.item, entry.enqueued_at
+                if deadline is None:
+                    self._cond.wait()
+                    continue
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                self._cond.wait(remaining)
+
+    def expired(self, item: T, enqueued_at: float) -> bool:
+        """
+        True (e conta em `expired`) se o item, retido fora da fila desde
+        `enqueued_at` (ex.: backlog de particao), ja passou do max_age_sec.
+        """
+        cls_name = self._class_of(item)
+        max_age = self._classes[cls_name].max_age_sec
+        if max_age <= 0 or time.monotonic() - enqueued_at <= max_age:
+            return False
+        with self._cond:
+            stats = self._stats.get(cls_name)
+            if stats is not None:
+                stats.expired += 1
+        return True
+
+    def task_done(self) -> None:
+        with self._cond:
+            if self._unfinished > 0:
+                self._unfinished -= 1
+
+    def clear(self) -> None:
+        with self._cond:
+            for pending in self._pending.values():
+                while pending:
+                    entry = pending.popleft()
+                    if entry.alive:
+                        self._discard(entry)
+
+    def reset_metrics(self, *, reset_dropped: bool = True) -> None:
+        with self._cond:
+            for name in self._order:
+                old = self._stats[name]
+                fresh = _ClassStats()
+                if not reset_dropped:
+                    fresh.dropped = old.dropped
+                self._stats[name] = fresh
+        self._processing = False
+
+    def metrics(self) -> dict[str, Any]:
+        with self._cond:
+            classes: dict[str, dict[str, Any]] = {}
+            for name in self._order:
+                stats = self._stats[name]
+                depth = sum(1 for entry in self._pending[name] if entry.alive)
+                classes[name] = {
+                    "priority": self._classes[name].priority,
+                    "depth": depth,
+                    "enqueued": stats.enqueued,
+                    "dequeued": stats.dequeued,
+                    "dropped": stats.dropped,
+                    "expired": stats.expired,
+                    "coalesced": stats.coalesced,
+                    "wait_avg_ms": (stats.wait_total / stats.dequeued * 1000) if stats.dequeued else 0.0,
+                    "wait_max_ms": stats.wait_max * 1000,
+                }
+        return {
+            "size": self._size,
+            "max_size": self._max_size,
+            "dropped": sum(c["dropped"] for c in classes.values()),
+            "expired": sum(c["expired"] for c in classes.values()),
+            "coalesced": sum(c["coalesced"] for c in classes.values()),
+            "classes": classes,
+        }
+
+    @property
+    def qsize(self) -> int:
+        return self._size
+
+    @property
+    def dropped_count(self) -> int:
+        with self._cond:
+            return sum(stats.dropped for stats in self._stats.values())
+
+    @property
+    def is_processing(self) -> bool:
+        return self._processing
+
+    @is_processing.setter
+    def is_processing(self, value: bool) -> None:
+        self._processing = bool(value)
@@ -1,188 +1,380 @@
 # core/intent.py - Sistema simples sem Gemini
+import glob
+import json
+import logging
+import os
 import re
+import threading
 import unicodedata
+from dataclasses import dataclass
+from typing import Any, Callable, Mapping
 
 from config.state import STATE
+from core import intent_model
+from core.trigger_index import TriggerIndex
 
+logger = logging.getLogger("Intent")
 
-def _normalizar_texto(texto: str) -> str:
+# Regras declarativas, avaliadas da maior para a menor prioridade; a primeira
+# que casar vence. Condicoes (`when`):
+# - words: palavra inteira (token \w+) do comando normalizado;
+# - phrases: substring do comando normalizado;
+# - regex: re.search no comando normalizado;
+# - digit: comando tem algum digito;
+# - state: atributo(s) verdadeiro(s) em config.state.STATE;
+# - any / all: combinam outras condicoes.
+# Manifestos em skills/manifests/ podem acrescentar regras em "intent_rules"
+# (mesmo formato; "intent" padrao = primeiro intent do manifesto).
+_TERMOS_FOCO = [
+    "roupa", "traje", "vestindo", "look", "outfit", "vestimenta", "estilo",
+    "mao", "maos", "rosto", "cabelo", "olhos", "expressao", "gesto", "gestos",
+    "segura", "segurando", "segurar", "objeto", "objetos", "acessorio",
+    "acessorios", "chapeu", "chapeus", "comida", "prato", "bebida", "placa",
+    "texto",
+]
+
+INTENT_RULES: tuple[dict[str, Any], ...] = (
+    # Estados de sequencia
+    {"intent": "sequencia", "priority": 1000,
+     "when": {"state": ["esperando_nome_sequencia", "gravando_sequencia"]}},
+    {"intent": "sequencia", "priority": 990,
+     "when": {"all": [
+         {"state": ["esperando_loops"]},
+         {"any": [{"phrases": ["uma vez", "duas vezes", "tres vezes", "vezes"]}, {"digit": True}]},
+     ]}},
+    # Sequencias
+    {"intent": "sequencia", "priority": 980,
+     "when": {"words": ["executar", "sequencia", "macro", "gravar", "parar", "grave", "rode"]}},
+    {"intent": "sequencia", "priority": 970,
+     "when": {"all": [
+         {"digit": True},
+         {"phrases": ["sequencia", "macro", "executar", "rodar", "repetir", "loop"]},
+     ]}},
+    # Visao
+    {"intent": "vision", "priority": 900,
+     "when": {"any": [{"words": _TERMOS_FOCO}, {"phrases": ["na mao", "na maos"]}]}},
+    {"intent": "vision", "priority": 890,
+     "when": {"phrases": [
+         "reanalisar", "reanalise", "analise novamente", "analise de novo",
+         "ultima captura", "ultima imagem", "ultimas imagens",
+     ]}},
+    {"intent": "vision", "priority": 880,
+     "when": {"all": [
+         {"words": ["analise", "analisar", "veja", "olhe", "ve", "tela", "screenshot"]},
+         {"words": ["tela", "imagem", "foto", "isso", "captura", "print"]},
+     ]}},
+    {"intent": "vision", "priority": 870,
+     "when": {"any": [
+         {"phrases": [
+             "nome do jogo", "nome desse jogo", "nome deste jogo", "qual e o jogo",
+             "qual o jogo", "que jogo", "nome do game",
+         ]},
+         {"all": [
+             {"phrases": ["qual", "o que", "quem", "como", "qual e", "qual o"]},
+             {"phrases": [
+                 "tela", "imagem", "foto", "print", "screenshot", "na tela", "na imagem",
+                 "visual", "visao", "o que voce ve", "o que tem", "aparece", "mostra",
+                 "personagem",
+             ]},
+         ]},
+     ]}},
+    {"intent": "vision", "priority": 860,
+     "when": {"all": [
+         {"words": ["level", "nivel"]},
+         {"words": ["jogo", "tela", "imagem", "foto", "print"]},
+     ]}},
+    # Noticias (antes de preco para evitar ambiguidade: "noticias sobre bitcoin")
+    {"intent": "news", "priority": 800,
+     "when": {"words": [
+         "noticia", "noticias", "news", "jornal", "manchete", "manchetes", "acontecendo",
+     ]}},
+    # Preco
+    {"intent": "price", "priority": 780,
+     "when": {"words": ["preco", "valor", "cotacao", "bitcoin", "dolar", "real", "crypto"]}},
+    # Sistema
+    {"intent": "system_monitor", "priority": 760,
+     "when": {"words": ["sistema", "cpu", "memoria", "ram", "temperatura"]}},
+    # YouTube
+    {"intent": "youtube_summary", "priority": 740,
+     "when": {"any": [{"phrases": ["youtu.be", "youtube.com"]}, {"words": ["youtube", "video"]}]}},
+    # Link Scraper
+    {"intent": "link_scraper", "priority": 720,
+     "when": {"phrases": [
+         "coletar links", "extrair links", "listar links", "salvar links",
+         "mapear links", "raspar links",
+     ]}},
+    # Web
+    {"intent": "web_reader", "priority": 700,
+     "when": {"any": [
+         {"phrases": ["http", "x.com", "twitter.com"]},
+         {"words": ["site", "pagina", "link", "url", "leia", "resuma", "resumo", "post", "tweet"]},
+     ]}},
+    # Game
+    {"intent": "game_guide", "priority": 680,
+     "when": {"words": ["dica", "build", "guia", "tutorial"]}},
+    # Menu
+    {"intent": "atalhos_radial", "priority": 660,
+     "when": {"words": ["menu", "radial", "atalho"]}},
+    # TTS
+    {"intent": "tts", "priority": 640,
+     "when": {"any": [
+         {"words": ["tts", "narrar", "narracao", "murf", "voz"]},
+         {"phrases": ["ler roteiro", "leia o roteiro"]},
+         {"regex": r"\b(arquivo|file)\s*:\s*.+"},
+     ]}},
+)
+
+DEFAULT_INTENT = "conversa"
+# Prioridade padrao das regras vindas de manifestos (acima so do padrao).
+MANIFEST_RULE_PRIORITY = 10
+# Palpites do modelo estatistico (core/intent_model.py) so entram quando
+# nenhuma regra casou; ficam abaixo de qualquer regra.
+MODEL_PRIORITY = 1
+DEFAULT_MODEL_MIN_CONF = 0.6
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+@dataclass(frozen=True, slots=True)
+class IntentMatch:
+    intent: str
+    priority: int
+    rule: str
+    confidence: float = 1.0
+
+
+@dataclass(frozen=True, slots=True)
+class _Features:
+    tokens: frozenset[str]
+    phrases: frozenset[str]
+    has_digit: bool
+    text: str
+
+
+_Check = Callable[[_Features], bool]
+
+
+def normalizar_texto(texto: str, forma: str = "NFKD") -> str:
+    """Remove acentos (decomposicao `forma` + ascii); usado tambem por skills."""
     return (
-        unicodedata.normalize("NFKD", texto)
+        unicodedata.normalize(forma, texto)
         .encode("ascii", "ignore")
         .decode("ascii")
     )
 
-def _eh_pergunta_visual(cmd_norm: str) -> bool:
-    interrogativos = [
-        "qual",
-        "o que",
-        "quem",
-        "como",
-        "qual e",
-        "qual o",
-    ]
-    visuais = [
-        "tela",
-        "imagem",
-        "foto",
-        "print",
-        "screenshot",
-        "na tela",
-        "na imagem",
-        "visual",
-        "visao",
-        "o que voce ve",
-        "o que tem",
-        "aparece",
-        "mostra",
-        "personagem",
-    ]
-    frases_jogo = [
-        "nome do jogo",
-        "nome desse jogo",
-        "nome deste jogo",
-        "qual e o jogo",
-        "qual o jogo",
-        "que jogo",
-        "nome do game",
-    ]
-    if any(p in cmd_norm for p in frases_jogo):
-        return True
-    return any(i in cmd_norm for i in interrogativos) and any(v in cmd_norm for v in visuais)
-
-
-def _separar_termos(termos: list[str]) -> tuple[list[str], list[str]]:
-    palavras = [t for t in termos if " " not in t]
-    frases = [t for t in termos if " " in t]
-    return palavras, frases
-
-
-def _tem_palavra(cmd_norm: str, palavras: list[str]) -> bool:
-    if not palavras:
-        return False
-    pattern = r"\b(" + "|".join(re.escape(p) for p in palavras) + r")\b"
-    return re.search(pattern, cmd_norm) is not None
 
+def normalizar_comando(cmd: str) -> str:
+    """Forma que o classificador compara: minusculo, sem pontas e sem acento."""
+    return normalizar_texto((cmd or "").lower().strip())
 
-def _tem_frase(cmd_norm: str, frases: list[str]) -> bool:
-    return any(f in cmd_norm for f in frases)
 
+class IntentClassifier:
+    """
+    Compila INTENT_RULES uma vez: todas as frases viram um unico automato
+    (TriggerIndex) e as palavras viram conjuntos; cada comando e lido uma vez
+    e as regras so consultam esses conjuntos.
+    """
 
-def detectar_intencao(cmd: str) -> str:
-    """Detecta intencao usando apenas keywords - sem API"""
+    def __init__(self, rules: tuple[Mapping[str, Any], ...] | list[Mapping[str, Any]]):
+        self._phrases: set[str] = set()
+        compiled: list[tuple[int, int, str, str, _Check]] = []
+        for order, rule in enumerate(rules):
+            intent = str(rule.get("intent", "")).strip()
+            if not intent:
+                raise ValueError(f"Regra de intent sem 'intent': {rule}")
+            priority = int(rule.get("priority", 0))
+            name = str(rule.get("name", "")).strip() or f"{intent}:{priority}"
+            compiled.append((-priority, order, intent, name, self._compile(rule.get("when") or {})))
+        compiled.sort(key=lambda item: (item[0], item[1]))
+        self._rules = tuple((intent, -neg, name, check) for neg, _, intent, name, check in compiled)
+        self._phrase_index = TriggerIndex({phrase: (phrase,) for phrase in sorted(self._phrases)})
 
-    cmd = cmd.lower().strip()
-    cmd_norm = _normalizar_texto(cmd)
+    def _compile(self, cond: Mapping[str, Any]) -> _Check:
+        if len(cond) != 1:
+            raise ValueError(f"Condicao de intent precisa de exatamente uma chave: {cond}")
+        kind, value = next(iter(cond.items()))
+        if kind in ("any", "all"):
+            checks = tuple(self._compile(item) for item in value)
+            if kind == "any":
+                return lambda f: any(check(f) for check in checks)
+            return lambda f: all(check(f) for check in checks)
+        if kind == "words":
+            words = frozenset(normalizar_texto(str(w).lower()) for w in value)
+            for word in words:
+                if not _TOKEN_RE.fullmatch(word):
+                    raise ValueError(f"'{word}' nao e palavra simples; use phrases ou regex.")
+            return lambda f: not f.tokens.isdisjoint(words)
+        if kind == "phrases":
+            phrases = frozenset(normalizar_texto(str(p).lower()) for p in value if str(p))
+            self._phrases.update(phrases)
+            return lambda f: not f.phrases.isdisjoint(phrases)
+        if kind == "regex":
+            pattern = re.compile(str(value))
+            return lambda f: pattern.search(f.text) is not None
+        if kind == "digit":
+            expected = bool(value)
+            return lambda f: f.has_digit is expected
+        if kind == "state":
+            names = (value,) if isinstance(value, str) else tuple(value)
+            return lambda f: any(getattr(STATE, name, False) for name in names)
+        raise ValueError(f"Condicao de intent desconhecida: '{kind}'")
 
-    # Estados de sequencia
-    if STATE.esperando_nome_sequencia or STATE.gravando_sequencia:
-        return "sequencia"
-    if STATE.esperando_loops:
-        if any(n in cmd_norm for n in ["uma vez", "duas vezes", "tres vezes", "vezes"]):
-            return "sequencia"
-        if any(char.isdigit() for char in cmd):
-            return "sequencia"
+    def classify(self, cmd: str) -> IntentMatch:
+        cmd = (cmd or "").lower().strip()
+        cmd_norm = normalizar_texto(cmd)
+        return self.classify_normalized(cmd, cmd_norm)
 
-    # Sequencias
-    if _tem_palavra(cmd_norm, ["executar", "sequencia", "macro", "gravar", "parar", "grave", "rode"]):
-        return "sequencia"
-    if any(char.isdigit() for char in cmd):
-        if any(p in cmd_norm for p in ["sequencia", "macro", "executar", "rodar", "repetir", "loop"]):
-            return "sequencia"
+    def classify_normalized(self, cmd: str, cmd_norm: str) -> IntentMatch:
+        features = _Features(
+            tokens=frozenset(_TOKEN_RE.findall(cmd_norm)),
+            phrases=frozenset(self._phrase_index.match(cmd_norm)),
+            has_digit=any(char.isdigit() for char in cmd),
+            text=cmd_norm,
+        )
+        for intent, priority, name, check in self._rules:
+            if check(features):
+                return IntentMatch(intent, priority, name)
+        return _DEFAULT_MATCH
 
-    # Visao
-    termos_foco = [
-        "roupa",
-        "traje",
-        "vestindo",
-        "look",
-        "outfit",
-        "vestimenta",
-        "estilo",
-        "mao",
-        "maos",
-        "na mao",
-        "na maos",
-        "rosto",
-        "cabelo",
-        "olhos",
-        "expressao",
-        "gesto",
-        "gestos",
-        "segura",
-        "segurando",
-        "segurar",
-        "objeto",
-        "objetos",
-        "acessorio",
-        "acessorios",
-        "chapeu",
-        "chapeus",
-        "comida",
-        "prato",
-        "bebida",
-        "placa",
-        "texto",
-    ]
-    palavras_foco, frases_foco = _separar_termos(termos_foco)
-    if _tem_palavra(cmd_norm, palavras_foco) or _tem_frase(cmd_norm, frases_foco):
-        return "vision"
-    if any(v in cmd_norm for v in ["reanalisar", "reanalise", "analise novamente", "analise de novo", "ultima captura", "ultima imagem", "ultimas imagens"]):
-        return "vision"
-    if _tem_palavra(cmd_norm, ["analise", "analisar", "veja", "olhe", "ve", "tela", "screenshot"]):
-        if _tem_palavra(cmd_norm, ["tela", "imagem", "foto", "isso", "captura", "print"]):
-            return "vision"
-
-    if _eh_pergunta_visual(cmd_norm):
-        return "vision"
-    if _tem_palavra(cmd_norm, ["level", "nivel"]) and (
-        _tem_palavra(cmd_norm, ["jogo"]) or _tem_palavra(cmd_norm, ["tela", "imagem", "foto", "print"])
-    ):
-        return "vision"
 
-    # Noticias (antes de preco para evitar ambiguidade: "noticias sobre bitcoin")
-    if _tem_palavra(cmd_norm, ["noticia", "noticias", "news", "jornal", "manchete", "manchetes", "acontecendo"]):
-        return "news"
+_DEFAULT_MATCH = IntentMatch(DEFAULT_INTENT, 0, "default")
 
-    # Preco
-    if _tem_palavra(cmd_norm, ["preco", "valor", "cotacao", "bitcoin", "dolar", "real", "crypto"]):
-        return "price"
 
-    # Sistema
-    if _tem_palavra(cmd_norm, ["sistema", "cpu", "memoria", "ram", "temperatura"]):
-        return "system_monitor"
+def _manifest_rules() -> list[dict[str, Any]]:
+    base = os.path.join(os.path.dirname(os.path.dirname(__file__)), "skills", "manifests")
+    rules: list[dict[str, Any]] = []
+    for path in sorted(glob.glob(os.path.join(base, "*.json"))):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except Exception:
+            continue
+        raw_rules = data.get("intent_rules") if isinstance(data, dict) else None
+        if not isinstance(raw_rules, list):
+            continue
+        intents = data.get("intents") or [data.get("id") or os.path.basename(path)[:-5]]
+        for raw in raw_rules:
+            if not isinstance(raw, dict):
+                continue
+            rule = {"intent": str(intents[0]), "priority": MANIFEST_RULE_PRIORITY, **raw}
+            rule.setdefault("name", f"{os.path.basename(path)}:{rule['intent']}")
+            rules.append(rule)
+    return rules
 
-    # YouTube
-    if any(y in cmd_norm for y in ["youtu.be", "youtube.com"]):
-        return "youtube_summary"
-    if _tem_palavra(cmd_norm, ["youtube", "video"]):
-        return "youtube_summary"
 
-    # Link Scraper
-    if any(l in cmd_norm for l in ["coletar links", "extrair links", "listar links", "salvar links", "mapear links", "raspar links"]):
-        return "link_scraper"
+_CLASSIFIER: IntentClassifier | None = None
+_CLASSIFIER_LOCK = threading.Lock()
 
-    # Web
-    if any(w in cmd_norm for w in ["http", "x.com", "twitter.com"]):
-        return "web_reader"
-    if re.search(r"\b(site|pagina|link|url|leia|resuma|resumo|post|tweet)\b", cmd_norm):
-        return "web_reader"
 
-    # Game
-    if _tem_palavra(cmd_norm, ["dica", "build", "guia", "tutorial"]):
-        return "game_guide"
+def _classifier() -> IntentClassifier:
+    global _CLASSIFIER
+    classifier = _CLASSIFIER
+    if classifier is None:
+        with _CLASSIFIER_LOCK:
+            if _CLASSIFIER is None:
+                try:
+                    _CLASSIFIER = IntentClassifier([*INTENT_RULES, *_manifest_rules()])
+                except ValueError as exc:
+                    logger.warning("Regras de intent dos manifestos ignoradas: %s", exc)
+                    _CLASSIFIER = IntentClassifier(INTENT_RULES)
+            classifier = _CLASSIFIER
+    return classifier
 
-    # Menu
-    if _tem_palavra(cmd_norm, ["menu", "radial", "atalho"]):
-        return "atalhos_radial"
 
-    # TTS
-    if _tem_palavra(cmd_norm, ["tts", "narrar", "narracao", "murf", "voz"]):
-        return "tts"
-    if _tem_frase(cmd_norm, ["ler roteiro", "leia o roteiro"]):
-        return "tts"
-    if re.search(r"\b(arquivo|file)\s*:\s*.+", cmd_norm):
-        return "tts"
-
-    # Conversa (padrao)
-    return "conversa"
+_MODEL: intent_model.IntentModel | None | bool = None
+
+
+def _model() -> intent_model.IntentModel | None:
+    global _MODEL
+    model = _MODEL
+    if model is None:
+        with _CLASSIFIER_LOCK:
+            if _MODEL is None:
+                _MODEL = _load_model()
+            model = _MODEL
+    return model or None
+
+
+def _load_model() -> intent_model.IntentModel | bool:
+    path = os.getenv("LUNA_INTENT_MODEL", "").strip() or intent_model.DEFAULT_MODEL_PATH
+    if path.lower() in ("0", "off") or not intent_model.available():
+        return False
+    if not os.path.isfile(path):
+        logger.info("Modelo de intent nao encontrado: %s", path)
+        return False
+    try:
+        return intent_model.IntentModel.load(path)
+    except Exception as exc:
+        logger.warning("Falha ao carregar modelo de intent %s: %s", path, exc)
+        return False
+
+
+def _model_min_conf() -> float:
+    try:
+        return float(os.getenv("LUNA_INTENT_MODEL_MIN_CONF", str(DEFAULT_MODEL_MIN_CONF)))
+    except ValueError:
+        return DEFAULT_MODEL_MIN_CONF
+
+
+def recarregar_regras() -> None:
+    """Descarta o classificador compilado e o modelo (ex.: apos editar manifestos)."""
+    global _CLASSIFIER, _MODEL
+    with _CLASSIFIER_LOCK:
+        _CLASSIFIER = None
+        _MODEL = None
+
+
+def classificar_intencao(cmd: str) -> IntentMatch:
+    """Intent vencedora com a prioridade e o nome da regra que casou."""
+    return classificar_intencoes([cmd])[0]
+
+
+def classificar_normalizado(cmd_lower: str, cmd_norm: str) -> IntentMatch:
+    """Como classificar_intencao, com as formas minuscula e sem acento ja prontas."""
+    return _classificar_pares([(cmd_lower, cmd_norm)])[0]
+
+
+def classificar_intencoes(cmds: list[str]) -> list[IntentMatch]:
+    """
+    Classifica varios comandos (ex.: mensagens de chat). As regras rodam
+    comando a comando; os que cairiam no padrao vao juntos ao modelo, numa
+    unica chamada vetorizada, e so trocam de intent acima da confianca minima.
+    """
+    pares = []
+    for cmd in cmds:
+        cmd = (cmd or "").lower().strip()
+        pares.append((cmd, normalizar_texto(cmd)))
+    return _classificar_pares(pares)
+
+
+def _classificar_pares(pares: list[tuple[str, str]]) -> list[IntentMatch]:
+    classifier = _classifier()
+    matches: list[IntentMatch] = []
+    pending: list[int] = []
+    pending_norm: list[str] = []
+    for cmd, cmd_norm in pares:
+        match = classifier.classify_normalized(cmd, cmd_norm)
+        if match is _DEFAULT_MATCH and cmd_norm:
+            pending.append(len(matches))
+            pending_norm.append(cmd_norm)
+        matches.append(match)
+    if not pending:
+        return matches
+    model = _model()
+    if model is None:
+        return matches
+    min_conf = _model_min_conf()
+    try:
+        guesses = model.predict(pending_norm)
+    except Exception as exc:
+        logger.warning("Modelo de intent falhou: %s", exc)
+        return matches
+    for idx, (intent, confidence) in zip(pending, guesses):
+        if intent != DEFAULT_INTENT and confidence >= min_conf:
+            matches[idx] = IntentMatch(intent, MODEL_PRIORITY, "model", confidence)
+    return matches
+
+
+def detectar_intencao(cmd: str) -> str:
+    """Detecta intencao usando apenas keywords - sem API"""
+    return classificar_intencao(cmd).intent
@@ -0,0 +1,286 @@
+"""
+Modelo estatistico local de intencao (n-gramas de caracteres + regressao
+softmax), usado quando as regras de core/intent.py nao reconhecem o comando.
+
+Treino (na raiz do projeto):
+    python -m core.intent_model
+    python -m core.intent_model --corpus benchmarks/data/intent_corpus_ptbr.tsv --out core/models/intent_char_ngram.npz
+
+Exemplos de treino: gatilhos dos manifestos em skills/manifests/ + corpus
+rotulado (TSV `intent<TAB>comando`, menos o holdout de `is_holdout`), cada um
+com copias com erros de digitacao/transcricao sinteticos. So depende de NumPy; sem ele o modelo
+fica indisponivel e o classificador usa apenas as regras.
+"""
+from __future__ import annotations
+
+import argparse
+import glob
+import json
+import os
+import random
+import sys
+import zlib
+from typing import Iterable, Sequence
+
+try:
+    import numpy as np
+except Exception:  # pragma: no cover - depende de lib externa
+    np = None
+
+_BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_MODEL_PATH = os.path.join(_BASE_DIR, "core", "models", "intent_char_ngram.npz")
+DEFAULT_CORPUS_PATH = os.path.join(_BASE_DIR, "benchmarks", "data", "intent_corpus_ptbr.tsv")
+MANIFESTS_DIR = os.path.join(_BASE_DIR, "skills", "manifests")
+
+MODEL_VERSION = 1
+DEFAULT_DIM = 1 << 12
+DEFAULT_NGRAMS = (2, 4)
+# Frases do corpus com crc32 % HOLDOUT_EVERY == 0 ficam fora do treino e sao
+# as unicas medidas em benchmarks/bench_intent_model.py.
+HOLDOUT_EVERY = 5
+
+
+def available() -> bool:
+    return np is not None
+
+
+def _grams(text: str, ngrams: tuple[int, int]) -> list[str]:
+    padded = f" {' '.join(text.split())} "
+    lo, hi = ngrams
+    grams = [f"w:{word}" for word in padded.split()]
+    for n in range(lo, hi + 1):
+        grams.extend(padded[i:i + n] for i in range(len(padded) - n + 1))
+    return grams
+
+
+def _hash_indices(text: str, dim: int, ngrams: tuple[int, int]) -> list[int]:
+    return [zlib.crc32(gram.encode("utf-8")) % dim for gram in _grams(text, ngrams)]
+
+
+class IntentModel:
+    """
+    Classificador linear sobre n-gramas com hashing (`dim` colunas).
+
+    Os textos devem chegar ja normalizados (minusculas, sem acento), como o
+    `cmd_norm` de core/intent.py. `predict` classifica uma lista inteira com
+    uma unica multiplicacao de matrizes.
+    """
+
+    __slots__ = ("labels", "weights", "bias", "dim", "ngrams")
+
+    def __init__(self, labels: Sequence[str], weights, bias, dim: int, ngrams: tuple[int, int]):
+        if np is None:
+            raise RuntimeError("numpy nao instalado")
+        self.labels = tuple(labels)
+        self.weights = np.asarray(weights, dtype=np.float32)
+        self.bias = np.asarray(bias, dtype=np.float32)
+        self.dim = int(dim)
+        self.ngrams = (int(ngrams[0]), int(ngrams[1]))
+        if self.weights.shape != (self.dim, len(self.labels)):
+            raise ValueError(f"Pesos com formato {self.weights.shape}, esperado {(self.dim, len(self.labels))}")
+
+    def features(self, texts: Sequence[str]):
+        rows: list[int] = []
+        cols: list[int] = []
+        for row, text in enumerate(texts):
+            idx = _hash_indices(text, self.dim, self.ngrams)
+            rows.extend([row] * len(idx))
+            cols.extend(idx)
+        flat = np.asarray(rows, dtype=np.intp) * self.dim + np.asarray(cols, dtype=np.intp)
+        matrix = np.bincount(flat, minlength=len(texts) * self.dim).astype(np.float32)
+        matrix = matrix.reshape(len(texts), self.dim)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return matrix / np.maximum(norms, 1e-6)
+
+    def predict_proba(self, texts: Sequence[str]):
+        if not texts:
+            return np.zeros((0, len(self.labels)), dtype=np.float32)
+        logits = self.features(texts) @ self.weights + self.bias
+        logits -= logits.max(axis=1, keepdims=True)
+        exp = np.exp(logits)
+        return exp / exp.sum(axis=1, keepdims=True)
+
+    def predict(self, texts: Sequence[str]) -> list[tuple[str, float]]:
+        """(intent, confianca) para cada texto, na mesma ordem."""
+        proba = self.predict_proba(texts)
+        best = proba.argmax(axis=1)
+        return [(self.labels[i], float(proba[row, i])) for row, i in enumerate(best)]
+
+    def save(self, path: str) -> None:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        np.savez_compressed(
+            path,
+            version=np.int32(MODEL_VERSION),
+            labels=np.asarray(self.labels),
+            weights=self.weights.astype(np.float16),
+            bias=self.bias,
+            dim=np.int32(self.dim),
+            ngrams=np.asarray(self.ngrams, dtype=np.int32),
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "IntentModel":
+        if np is None:
+            raise RuntimeError("numpy nao instalado")
+        with np.load(path, allow_pickle=False) as data:
+            version = int(data["version"])
+            if version != MODEL_VERSION:
+                raise ValueError(f"Versao de modelo {version} nao suportada")
+            return cls(
+                labels=[str(label) for label in data["labels"]],
+                weights=data["weights"],
+                bias=data["bias"],
+                dim=int(data["dim"]),
+                ngrams=tuple(int(n) for n in data["ngrams"]),
+            )
+
+
+def train(
+    samples: Sequence[tuple[str, str]],
+    dim: int = DEFAULT_DIM,
+    ngrams: tuple[int, int] = DEFAULT_NGRAMS,
+    epochs: int = 1000,
+    lr: float = 0.5,
+    l2: float = 1e-4,
+) -> IntentModel:
+    """Regressao softmax por gradiente em lote completo; samples = (intent, texto)."""
+    if np is None:
+        raise RuntimeError("numpy nao instalado")
+    labels = sorted({label for label, _ in samples})
+    index = {label: i for i, label in enumerate(labels)}
+    model = IntentModel(labels, np.zeros((dim, len(labels))), np.zeros(len(labels)), dim, ngrams)
+    x = model.features([text for _, text in samples])
+    y = np.zeros((len(samples), len(labels)), dtype=np.float32)
+    y[np.arange(len(samples)), [index[label] for label, _ in samples]] = 1.0
+
+    weights = np.zeros((dim, len(labels)), dtype=np.float32)
+    bias = np.zeros(len(labels), dtype=np.float32)
+    vel_w = np.zeros_like(weights)
+    vel_b = np.zeros_like(bias)
+    for _ in range(max(1, epochs)):
+        logits = x @ weights + bias
+        logits -= logits.max(axis=1, keepdims=True)
+        proba = np.exp(logits)
+        proba /= proba.sum(axis=1, keepdims=True)
+        grad = (proba - y) / len(samples)
+        vel_w = 0.9 * vel_w + x.T @ grad + l2 * weights
+        vel_b = 0.9 * vel_b + grad.sum(axis=0)
+        weights -= lr * vel_w
+        bias -= lr * vel_b
+    model.weights = weights
+    model.bias = bias
+    return model
+
+
+def _typo(text: str, rng: random.Random) -> str:
+    if len(text) < 4:
+        return text
+    chars = list(text)
+    pos = rng.randrange(len(chars) - 1)
+    op = rng.randrange(4)
+    if op == 0:
+        del chars[pos]
+    elif op == 1:
+        chars[pos], chars[pos + 1] = chars[pos + 1], chars[pos]
+    elif op == 2:
+        chars.insert(pos, chars[pos])
+    else:
+        chars[pos] = rng.choice("aeiourslmnt")
+    return "".join(chars)
+
+
+def augment(samples: Iterable[tuple[str, str]], copies: int = 4, seed: int = 13) -> list[tuple[str, str]]:
+    """Original + `copies` variantes com 1-2 erros de digitacao cada."""
+    rng = random.Random(seed)
+    out: list[tuple[str, str]] = []
+    for label, text in samples:
+        out.append((label, text))
+        for _ in range(copies):
+            noisy = _typo(text, rng)
+            if rng.random() < 0.5:
+                noisy = _typo(noisy, rng)
+            out.append((label, noisy))
+    return out
+
+
+def is_holdout(command: str) -> bool:
+    """Split deterministico: ~1/HOLDOUT_EVERY do corpus nunca entra no treino."""
+    key = " ".join(command.lower().split()).encode("utf-8")
+    return zlib.crc32(key) % HOLDOUT_EVERY == 0
+
+
+def load_corpus(path: str, split: str = "all") -> list[tuple[str, str]]:
+    """Le o TSV; `split` = all | train (sem o holdout) | test (so o holdout)."""
+    if split not in ("all", "train", "test"):
+        raise ValueError(f"split invalido: {split}")
+    rows: list[tuple[str, str]] = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.rstrip("\n")
+            if not line.strip() or line.startswith("#"):
+                continue
+            label, _, command = line.partition("\t")
+            if not label.strip() or not command.strip():
+                continue
+            if split != "all" and is_holdout(command) != (split == "test"):
+                continue
+            rows.append((label.strip(), command))
+    return rows
+
+
+def manifest_samples(known: Iterable[str], manifests_dir: str = MANIFESTS_DIR) -> list[tuple[str, str]]:
+    """
+    Gatilhos dos manifestos rotulados com a intent das regras: a primeira de
+    `intents` que exista em `known` ou, como no router, a que esta contida no
+    nome da skill (ex.: sequencia -> sequencia_manager).
+    """
+    known = list(known)
+    samples: list[tuple[str, str]] = []
+    for path in sorted(glob.glob(os.path.join(manifests_dir, "*.json"))):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except Exception:
+            continue
+        if not isinstance(data, dict):
+            continue
+        skill_id = str(data.get("id") or os.path.basename(path)[:-5])
+        intents = [str(i) for i in data.get("intents") or []]
+        label = next((i for i in intents if i in known), None)
+        if label is None:
+            label = next((k for k in known if k in skill_id), None)
+        if label is None:
+            continue
+        for gatilho in data.get("gatilhos") or []:
+            samples.append((label, str(gatilho)))
+    return samples
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS_PATH)
+    parser.add_argument("--out", default=DEFAULT_MODEL_PATH)
+    parser.add_argument("--dim", type=int, default=DEFAULT_DIM)
+    parser.add_argument("--epochs", type=int, default=1000)
+    parser.add_argument("--copies", type=int, default=4)
+    args = parser.parse_args()
+    if np is None:
+        print("numpy nao instalado")
+        return 1
+
+    from core.intent import DEFAULT_INTENT, INTENT_RULES, normalizar_comando
+
+    known = [rule["intent"] for rule in INTENT_RULES] + [DEFAULT_INTENT]
+    base = manifest_samples(dict.fromkeys(known)) + load_corpus(args.corpus, split="train")
+    samples = [(label, normalizar_comando(text)) for label, text in augment(base, args.copies)]
+    model = train(samples, dim=max(64, args.dim), epochs=args.epochs)
+    model.save(args.out)
+
+    hits = sum(1 for (label, _), (pred, _) in zip(base, model.predict([normalizar_comando(t) for _, t in base])) if label == pred)
+    print(f"exemplos={len(base)} (+ruido={len(samples)}) intents={len(model.labels)} acerto_treino={hits}/{len(base)}")
+    print(f"modelo salvo em {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -241,6 +241,8 @@ def _build_state(
             "events_total": 0,
             "last_event_ts": 0.0,
             "loaded_workflow": {"loaded": False},
+            "running_count": 0,
+            "workflows": [],
         }
 
     skill_snapshot = _get_skill_registry_snapshot(
@@ -512,13 +514,30 @@ def _handle_control(data: Dict[str, Any]) -> Dict[str, Any]:
             return {"ok": False, "msg": f"Falha ao executar workflow linear: {e}"}
 
     if action == "workflow_stop":
+        workflow_id = (payload.get("workflow_id") or "").strip()
         try:
             from core.workflow_runtime import stop_workflow
-            status = stop_workflow()
-            return {"ok": True, "msg": "Workflow parado.", "workflow_status": status}
+            status = stop_workflow(workflow_id)
+            msg = f"Workflow '{workflow_id}' parado." if workflow_id else "Workflows parados."
+            return {"ok": True, "msg": msg, "workflow_status": status}
         except Exception as e:
             return {"ok": False, "msg": f"Falha ao parar workflow: {e}"}
 
+    if action == "workflow_reload":
+        workflow_id = (payload.get("workflow_id") or "").strip()
+        if not workflow_id:
+            return {"ok": False, "msg": "Informe workflow_id para recarregar."}
+        try:
+            from core.workflow_runtime import reload_workflow
+            status = reload_workflow(workflow_id)
+            return {
+                "ok": True,
+                "msg": f"Workflow '{workflow_id}' recarregado.",
+                "workflow_status": status,
+            }
+        except Exception as e:
+            return {"ok": False, "msg": f"Falha ao recarregar workflow: {e}"}
+
     if action == "workflow_status":
         try:
             from core.workflow_runtime import get_runtime_status
@@ -530,6 +549,32 @@ def _handle_control(data: Dict[str, Any]) -> Dict[str, Any]:
         except Exception as e:
             return {"ok": False, "msg": f"Falha ao obter status do workflow: {e}"}
 
+    if action == "event_history":
+        try:
+            from core.event_bus import event_bus, event_to_dict
+
+            def _opt_float(key: str) -> float | None:
+                value = payload.get(key)
+                return float(value) if value not in (None, "") else None
+
+            before = payload.get("before_seq")
+            page = event_bus.query_history(
+                event_type=(payload.get("event_type") or "").strip(),
+                limit=min(200, max(1, int(payload.get("limit") or 50))),
+                since=_opt_float("since"),
+                until=_opt_float("until"),
+                before_seq=int(before) if before not in (None, "") else None,
+            )
+            events = [event_to_dict(ev) for ev in page["events"]]
+            return {
+                "ok": True,
+                "msg": f"{len(events)} evento(s) no historico.",
+                "events": events,
+                "next_cursor": page["next_cursor"],
+            }
+        except Exception as e:
+            return {"ok": False, "msg": f"Falha ao consultar historico de eventos: {e}"}
+
     if action == "skill_registry_diagnostics":
         ensure_loaded = bool(payload.get("ensure_loaded"))
         snapshot = _get_skill_registry_snapshot(
@@ -955,6 +1000,12 @@ def _render_html(token: str) -> str:
           <button onclick="workflowStop()" class="bg-gradient-to-r from-rose-700 to-rose-800 hover:from-rose-600 hover:to-rose-700 px-4 py-2 rounded-lg font-medium transition-all">Parar</button>
         </div>
         <div id="wf-status" class="text-sm text-cyan-300">Status: -</div>
+        <table class="w-full text-xs text-gray-300">
+          <thead class="text-gray-400 text-left">
+            <tr><th>Workflow</th><th>Status</th><th>Patterns</th><th>Fila</th><th>Drop</th><th>Em voo</th><th>Proc</th><th>Falhas</th><th></th></tr>
+          </thead>
+          <tbody id="wf-table"></tbody>
+        </table>
         <div id="wf-result" class="text-sm text-gray-400 min-h-[20px]"></div>
         <pre id="wf-validation" class="bg-gray-800/50 border border-amber-500/20 rounded-lg p-3 text-xs text-amber-200 whitespace-pre-wrap hidden"></pre>
       </div>
@@ -1063,9 +1114,11 @@ def _render_html(token: str) -> str:
         const w = s.workflow;
         const loaded = (w.loaded_workflow && w.loaded_workflow.loaded) ? (w.loaded_workflow.id || "sim") : "nao";
         const processing = w.queue_processing ? "on" : "off";
-        byId("wf-status").textContent = `Status: ${w.status || "-"} | loaded=${loaded} | queue=${w.queue_size || 0} | dropped=${w.queue_dropped || 0} | processing=${processing} | proc=${w.events_processed || 0} | fail=${w.events_failed || 0}`;
+        byId("wf-status").textContent = `Status: ${w.status || "-"} | rodando=${w.running_count || 0} | loaded=${loaded} | queue=${w.queue_size || 0} | dropped=${w.queue_dropped || 0} | processing=${processing} | proc=${w.events_processed || 0} | fail=${w.events_failed || 0}`;
+        renderWorkflowTable(w.workflows || []);
       } else {
         byId("wf-status").textContent = "Status: -";
+        renderWorkflowTable([]);
       }
     });
 
@@ -1174,6 +1227,48 @@ def _render_html(token: str) -> str:
     function workflowStop() {
       socket.emit("control", { action: "workflow_stop", payload: {} });
     }
+    function workflowStopId(id) {
+      socket.emit("control", { action: "workflow_stop", payload: { workflow_id: id } });
+    }
+    function workflowReloadId(id) {
+      socket.emit("control", { action: "workflow_reload", payload: { workflow_id: id } });
+    }
+    function renderWorkflowTable(rows) {
+      const body = byId("wf-table");
+      if (!body) return;
+      body.innerHTML = "";
+      rows.forEach((w) => {
+        const tr = document.createElement("tr");
+        const cells = [
+          w.id || "-",
+          w.status || "-",
+          (w.listen_patterns || []).join(", "),
+          w.queue_size || 0,
+          w.queue_dropped || 0,
+          w.in_flight || 0,
+          w.events_processed || 0,
+          w.events_failed || 0,
+        ];
+        cells.forEach((value) => {
+          const td = document.createElement("td");
+          td.textContent = String(value);
+          tr.appendChild(td);
+        });
+        const actions = document.createElement("td");
+        const reload = document.createElement("button");
+        reload.textContent = "Recarregar";
+        reload.className = "text-cyan-300 mr-2";
+        reload.onclick = () => workflowReloadId(w.id);
+        const stop = document.createElement("button");
+        stop.textContent = "Parar";
+        stop.className = "text-rose-300";
+        stop.onclick = () => workflowStopId(w.id);
+        actions.appendChild(reload);
+        actions.appendChild(stop);
+        tr.appendChild(actions);
+        body.appendChild(tr);
+      });
+    }
 
     // Notification system
     function showNotification(message, type = "info") {
@@ -4,8 +4,9 @@ import time
 from typing import Optional
 
 from config.state import STATE
+from core.command_context import CommandContext, executar_skill
 from core.event_bus import emit_event
-from core.intent import detectar_intencao
+from core.intent import recarregar_regras
 from core.skill_registry import SkillRegistry
 
 logger = logging.getLogger("Router")
@@ -101,6 +102,7 @@ class RouterLuna:
 
     def recarregar_todas(self):
         self._descobrir_skills()
+        recarregar_regras()
         carregadas = self._registry.reload_all()
         # Sincroniza cache local para manter comportamento atual.
         for nome in list(self.skills.keys()):
@@ -114,10 +116,12 @@ class RouterLuna:
             self._registrar_skill_meta(nome)
         return carregadas
 
-    def _executar_skill(self, nome: str, cmd_limpo: str, intent: Optional[str]) -> Optional[str]:
+    def _executar_skill(self, nome: str, ctx: CommandContext) -> Optional[str]:
         skill = self._carregar_skill(nome)
         if not skill:
             return None
+        cmd_limpo = ctx.clean
+        intent = ctx.intent
         try:
             emit_event(
                 "skill.started",
@@ -125,7 +129,7 @@ class RouterLuna:
                 source="router",
             )
             logger.info("Skill ativada", extra={"skill": nome, "intent": intent})
-            resp = _with_retry(skill.executar, cmd_limpo)
+            resp = _with_retry(executar_skill, skill, ctx)
             if resp:
                 STATE.adicionar_ao_historico(cmd_limpo, resp)
                 emit_event(
@@ -159,9 +163,17 @@ class RouterLuna:
     def _candidatos_por_gatilho_meta(self, cmd_limpo: str) -> list[str]:
         return self._registry.candidates_by_trigger(cmd_limpo)
 
-    def processar_comando(self, cmd: str, intent: Optional[str] = None) -> Optional[str]:
-        cmd_lower = cmd.lower().strip()
-        cmd_limpo = cmd_lower.replace("luna", "").strip()
+    def processar_comando(
+        self,
+        cmd: str,
+        intent: Optional[str] = None,
+        *,
+        context: Optional[CommandContext] = None,
+    ) -> Optional[str]:
+        ctx = context or CommandContext.from_text(cmd)
+        if intent and not ctx.intent:
+            ctx = ctx.with_intent(intent)
+        cmd_limpo = ctx.clean
 
         if "modo vtuber" in cmd_limpo or "ativar vtuber" in cmd_limpo:
             STATE.set_modo_ativacao("vtuber")
@@ -180,20 +192,21 @@ class RouterLuna:
                 if "sequencia" in nome or "macros" in nome:
                     skill = self._carregar_skill(nome)
                     if skill:
-                        return skill.executar(cmd_limpo)
+                        return executar_skill(skill, ctx)
             return "Erro: sequencia nao carregada"
 
-        if STATE.get_modo_ativacao() == "assistente" and not cmd_lower.startswith("luna"):
+        if STATE.get_modo_ativacao() == "assistente" and not ctx.addressed:
             return None
 
         if not cmd_limpo:
             return "Sim?"
 
-        if not intent:
-            intent = detectar_intencao(cmd_limpo)
+        ctx = ctx.classified()
+        intent = ctx.intent
 
+        # Intent e gatilhos vem do indice do registry (mesmo mapa de
+        # manifestos); o modulo so e importado se a skill casar.
         tentados: set[str] = set()
-
         fases = (
             self._candidatos_por_intent_nome(intent),
             self._candidatos_por_intent_meta(intent),
@@ -204,22 +217,7 @@ class RouterLuna:
                 if nome in tentados:
                     continue
                 tentados.add(nome)
-                resp = self._executar_skill(nome, cmd_limpo, intent)
-                if resp is not None:
-                    return resp
-
-        for nome in self.skill_modulos:
-            if nome in tentados:
-                continue
-            skill = self._carregar_skill(nome)
-            tentados.add(nome)
-            if not skill:
-                continue
-            meta = self._skill_meta.get(nome, {})
-            intents = meta.get("intents", ())
-            gatilhos = meta.get("gatilhos", ())
-            if (intent and intent in intents) or any(g in cmd_limpo for g in gatilhos):
-                resp = self._executar_skill(nome, cmd_limpo, intent)
+                resp = self._executar_skill(nome, ctx)
                 if resp is not None:
                     return resp
 
@@ -229,11 +227,16 @@ class RouterLuna:
 _router = None
 
 
-def processar_comando(cmd: str, intent: Optional[str] = None) -> Optional[str]:
+def processar_comando(
+    cmd: str,
+    intent: Optional[str] = None,
+    *,
+    context: Optional[CommandContext] = None,
+) -> Optional[str]:
     global _router
     if not _router:
         _router = RouterLuna()
-    return _router.processar_comando(cmd, intent)
+    return _router.processar_comando(cmd, intent, context=context)
 
 
 if __name__ == "__main__":
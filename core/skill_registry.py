@@ -9,10 +9,18 @@ from dataclasses import dataclass
 from typing import Any, Optional
 
 from core.skill_manifest import SkillManifest
+from core.trigger_index import TriggerIndex
 
 
 logger = logging.getLogger("SkillRegistry")
 _UTF8_CONSOLE_READY = False
+# Incrementado a cada reload() de qualquer registry; caches derivados (planos
+# de workflow) comparam esse valor para saber se precisam ser refeitos.
+_RELOAD_GENERATION = 0
+
+
+def reload_generation() -> int:
+    return _RELOAD_GENERATION
 
 
 def _ensure_console_utf8() -> None:
@@ -60,6 +68,10 @@ class SkillRegistry:
         self._skills_package = skills_package
         self._skills_dir = os.path.join(self._base_dir, "skills")
         self._entries: dict[str, SkillEntry] = {}
+        # Gatilhos de todas as skills; refeito so apos discover()/reload().
+        self._trigger_index: TriggerIndex | None = None
+        # Manifestos usados para rotear; refeitos junto com o indice.
+        self._routing: dict[str, SkillManifest] = {}
         self._ignored_files = {"__init__.py", "conversa1.py", "vision1.py"}
 
     def discover(self) -> list[str]:
@@ -77,6 +89,7 @@ class SkillRegistry:
                 continue
             modules.append(filename[:-3])
         modules.sort()
+        self._trigger_index = None
 
         active = set(modules)
         for module_name in list(self._entries.keys()):
@@ -127,6 +140,9 @@ class SkillRegistry:
             entry.manifest_source = manifest_source
             entry.has_external_manifest = has_external_manifest
             entry.validation_errors = ()
+            if self._routing.get(module_name) != manifest:
+                # SKILL_INFO/embutido diverge do que estava no roteamento: reindexa.
+                self._trigger_index = None
             return entry
         except Exception as exc:
             entry.module = None
@@ -139,6 +155,9 @@ class SkillRegistry:
             return None
 
     def reload(self, module_name: str) -> Optional[SkillEntry]:
+        global _RELOAD_GENERATION
+        _RELOAD_GENERATION += 1
+        self._trigger_index = None
         entry = self._entries.setdefault(module_name, SkillEntry(module_name=module_name))
         try:
             mod = importlib.import_module(f"{self._skills_package}.{module_name}")
@@ -191,24 +210,59 @@ class SkillRegistry:
     def candidates_by_intent(self, intent: str | None) -> list[str]:
         if not intent:
             return []
-        selected: list[str] = []
-        for module_name in self.list_skill_names():
-            entry = self.load(module_name)
-            if not entry or not entry.manifest:
-                continue
-            if entry.manifest.matches_intent(intent):
-                selected.append(module_name)
-        return selected
+        self.trigger_index()
+        return [
+            module_name
+            for module_name, manifest in self._routing.items()
+            if manifest.matches_intent(intent)
+        ]
 
     def candidates_by_trigger(self, cmd_limpo: str) -> list[str]:
-        selected: list[str] = []
-        for module_name in self.list_skill_names():
-            entry = self.load(module_name)
-            if not entry or not entry.manifest:
-                continue
-            if entry.manifest.matches_command(cmd_limpo):
-                selected.append(module_name)
-        return selected
+        texto = str(cmd_limpo or "").strip().lower()
+        if not texto:
+            return []
+        return self.trigger_index().match_ordered(texto)
+
+    def trigger_index(self) -> TriggerIndex:
+        index = self._trigger_index
+        if index is None:
+            routing: dict[str, SkillManifest] = {}
+            for module_name in self.list_skill_names():
+                manifest = self._read_routing_manifest(module_name)
+                if manifest is not None:
+                    routing[module_name] = manifest
+            self._routing = routing
+            index = self._trigger_index = TriggerIndex(
+                {name: manifest.gatilhos for name, manifest in routing.items()}
+            )
+        return index
+
+    def routing_manifest(self, module_name: str) -> Optional[SkillManifest]:
+        """Manifesto usado no roteamento (o mesmo do indice de gatilhos)."""
+        self.trigger_index()
+        return self._routing.get(module_name)
+
+    def _read_routing_manifest(self, module_name: str) -> Optional[SkillManifest]:
+        """
+        Manifesto para rotear sem importar a skill: o do modulo, se ja
+        carregado ou importado (inclui SKILL_INFO/GATILHOS); senao o JSON
+        externo. Skills sem JSON externo continuam sendo importadas.
+        """
+        entry = self._entries.get(module_name)
+        if entry is not None and entry.loaded:
+            return entry.manifest
+        try:
+            mod = sys.modules.get(f"{self._skills_package}.{module_name}")
+            if mod is not None:
+                return self._build_manifest(module_name, mod)[0]
+            if not self._existing_manifest_file(module_name):
+                entry = self.load(module_name)
+                return entry.manifest if entry else None
+            data, _ = self._load_manifest_file(module_name)
+        except ValueError as exc:
+            logger.warning("Manifesto ignorado no roteamento (%s): %s", module_name, exc)
+            return None
+        return SkillManifest.from_sources(module_name=module_name, manifest_data=data)
 
     def get_manifest(self, module_name: str) -> Optional[SkillManifest]:
         entry = self.load(module_name)
@@ -0,0 +1,284 @@
+from __future__ import annotations
+
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict, deque
+from typing import Any, Mapping
+
+
+# Tipos de node builtin com estado (um objeto por node e por execucao: o
+# engine cria os seus ao iniciar o modo por eventos e a cada execucao unica).
+# push() roda a cada evento; flush_due() e chamado pelo timer do engine para
+# operadores que emitem sem evento novo (e no fim de uma execucao unica).
+OPERATOR_NODE_TYPES = frozenset({"throttle", "debounce", "dedupe", "window", "batch"})
+
+OPERATOR_INPUT_PORTS = {"text", "response", "input", "command", "prompt", "message", "value"}
+OPERATOR_OUTPUT_PORTS = {"text", "count", "sum", "items", "value"}
+
+_TEXT_KEYS = ("text", "response", "message", "command", "prompt", "input")
+_DEFAULT_MAX_ITEMS = 1000
+
+
+def get_path(data: Any, path: str) -> Any:
+    """Le `a.b.c` em mappings aninhados; None se algum nivel faltar."""
+    value = data
+    for part in path.split("."):
+        if not isinstance(value, Mapping):
+            return None
+        value = value.get(part)
+    return value
+
+
+def _text_of(inputs: Mapping[str, Any]) -> str:
+    for key in _TEXT_KEYS:
+        value = inputs.get(key)
+        if isinstance(value, str) and value.strip():
+            return value.strip()
+    return ""
+
+
+def _snapshot(inputs: Mapping[str, Any]) -> dict[str, Any]:
+    item: dict[str, Any] = {"text": _text_of(inputs)}
+    for key in ("user", "platform"):
+        value = inputs.get(key)
+        if value is not None:
+            item[key] = value
+    return item
+
+
+def _as_fields(raw: Any, default: tuple[str, ...] = ()) -> tuple[str, ...]:
+    if isinstance(raw, str):
+        raw = [raw]
+    if not isinstance(raw, list):
+        return default
+    fields = tuple(str(item).strip() for item in raw if str(item).strip())
+    return fields or default
+
+
+def _number(raw: Any, default: float) -> float:
+    try:
+        return float(raw)
+    except (TypeError, ValueError):
+        return default
+
+
+class StreamOperator(ABC):
+    """Base: estado protegido por lock (eventos podem chegar de varios workers)."""
+
+    has_timer = False
+
+    def __init__(self, config: Mapping[str, Any]):
+        self._lock = threading.Lock()
+        self._key_fields = _as_fields(config.get("key"))
+        self._max_items = max(1, int(_number(config.get("max_items"), _DEFAULT_MAX_ITEMS)))
+
+    def _key(self, inputs: Mapping[str, Any]) -> str:
+        if not self._key_fields:
+            return ""
+        return "|".join(str(get_path(inputs, name)) for name in self._key_fields)
+
+    @abstractmethod
+    def push(self, inputs: Mapping[str, Any], now: float) -> dict[str, Any] | None:
+        """Recebe um evento; devolve o que emitir agora ou None."""
+
+    def flush_due(self, now: float) -> list[dict[str, Any]]:
+        return []
+
+    def next_deadline(self) -> float | None:
+        return None
+
+
+class ThrottleOperator(StreamOperator):
+    """Deixa passar no maximo um evento por `interval_ms` (por chave)."""
+
+    def __init__(self, config: Mapping[str, Any]):
+        super().__init__(config)
+        self._interval = max(0.0, _number(config.get("interval_ms"), 1000) / 1000)
+        self._last: OrderedDict[str, float] = OrderedDict()
+
+    def push(self, inputs: Mapping[str, Any], now: float) -> dict[str, Any] | None:
+        key = self._key(inputs)
+        with self._lock:
+            last = self._last.get(key)
+            if last is not None and now - last < self._interval:
+                return None
+            self._last[key] = now
+            self._last.move_to_end(key)
+            while len(self._last) > self._max_items:
+                self._last.popitem(last=False)
+        return dict(inputs)
+
+
+class DedupeOperator(StreamOperator):
+    """Descarta eventos cuja chave ja passou nos ultimos `window_sec`."""
+
+    def __init__(self, config: Mapping[str, Any]):
+        super().__init__(config)
+        if not self._key_fields:
+            self._key_fields = ("text",)
+        self._window = max(0.0, _number(config.get("window_sec"), 60))
+        self._seen: OrderedDict[str, float] = OrderedDict()
+
+    def push(self, inputs: Mapping[str, Any], now: float) -> dict[str, Any] | None:
+        key = self._key(inputs)
+        with self._lock:
+            while self._seen:
+                oldest_key, ts = next(iter(self._seen.items()))
+                if now - ts < self._window and len(self._seen) <= self._max_items:
+                    break
+                self._seen.pop(oldest_key)
+            if key in self._seen:
+                return None
+            self._seen[key] = now
+        return dict(inputs)
+
+
+class DebounceOperator(StreamOperator):
+    """Emite o ultimo evento (por chave) apos `wait_ms` sem eventos novos."""
+
+    has_timer = True
+
+    def __init__(self, config: Mapping[str, Any]):
+        super().__init__(config)
+        self._wait = max(0.0, _number(config.get("wait_ms"), 1000) / 1000)
+        # chave -> (prazo, ultimas entradas, quantidade colapsada)
+        self._pending: dict[str, tuple[float, dict[str, Any], int]] = {}
+
+    def push(self, inputs: Mapping[str, Any], now: float) -> dict[str, Any] | None:
+        key = self._key(inputs)
+        with self._lock:
+            _, _, count = self._pending.get(key, (0.0, {}, 0))
+            if key not in self._pending and len(self._pending) >= self._max_items:
+                return None
+            self._pending[key] = (now + self._wait, dict(inputs), count + 1)
+        return None
+
+    def flush_due(self, now: float) -> list[dict[str, Any]]:
+        ready: list[dict[str, Any]] = []
+        with self._lock:
+            for key, (deadline, inputs, count) in list(self._pending.items()):
+                if deadline <= now:
+                    del self._pending[key]
+                    ready.append({**inputs, "count": count})
+        return ready
+
+    def next_deadline(self) -> float | None:
+        with self._lock:
+            return min((item[0] for item in self._pending.values()), default=None)
+
+
+class WindowOperator(StreamOperator):
+    """
+    Janela de contagem/soma. `tumbling` emite ao fim de cada janela de
+    `size_ms` (via timer); `sliding` emite a cada evento o agregado dos
+    ultimos `size_ms`. `field` (caminho com pontos) e o valor somado.
+    """
+
+    def __init__(self, config: Mapping[str, Any]):
+        super().__init__(config)
+        self._size = max(0.001, _number(config.get("size_ms"), 60000) / 1000)
+        self._sliding = str(config.get("mode", "tumbling")).strip().lower() == "sliding"
+        self._field = str(config.get("field", "") or "").strip()
+        self._scale = _number(config.get("scale"), 1.0)
+        self._items: deque[tuple[float, float, dict[str, Any]]] = deque(maxlen=self._max_items)
+        self._window_end = 0.0
+        self.has_timer = not self._sliding
+
+    def _value(self, inputs: Mapping[str, Any]) -> float:
+        if not self._field:
+            return 0.0
+        return _number(get_path(inputs, self._field), 0.0) * self._scale
+
+    def _aggregate(self, items: list[tuple[float, float, dict[str, Any]]]) -> dict[str, Any]:
+        total = sum(value for _, value, _ in items)
+        count = len(items)
+        return {
+            "count": count,
+            "sum": total,
+            "items": [item for _, _, item in items],
+            "value": total if self._field else count,
+            "text": f"{count} evento(s)" + (f", soma {total:g}" if self._field else ""),
+        }
+
+    def push(self, inputs: Mapping[str, Any], now: float) -> dict[str, Any] | None:
+        entry = (now, self._value(inputs), _snapshot(inputs))
+        with self._lock:
+            if self._sliding:
+                self._items.append(entry)
+                while self._items and now - self._items[0][0] > self._size:
+                    self._items.popleft()
+                return self._aggregate(list(self._items))
+            if not self._items:
+                self._window_end = now + self._size
+            self._items.append(entry)
+        return None
+
+    def flush_due(self, now: float) -> list[dict[str, Any]]:
+        if self._sliding:
+            return []
+        with self._lock:
+            if not self._items or now < self._window_end:
+                return []
+            items = list(self._items)
+            self._items.clear()
+        return [self._aggregate(items)]
+
+    def next_deadline(self) -> float | None:
+        with self._lock:
+            return self._window_end if self._items and not self._sliding else None
+
+
+class BatchOperator(StreamOperator):
+    """Acumula eventos e emite a lista apos `size` itens ou `max_wait_ms`."""
+
+    has_timer = True
+
+    def __init__(self, config: Mapping[str, Any]):
+        super().__init__(config)
+        self._size = max(1, int(_number(config.get("size"), 10)))
+        self._max_wait = max(0.0, _number(config.get("max_wait_ms"), 5000) / 1000)
+        self._items: list[dict[str, Any]] = []
+        self._deadline = 0.0
+
+    def _emit(self) -> dict[str, Any]:
+        items = self._items
+        self._items = []
+        return {
+            "items": items,
+            "count": len(items),
+            "value": items,
+            "text": "\n".join(item["text"] for item in items if item.get("text")),
+        }
+
+    def push(self, inputs: Mapping[str, Any], now: float) -> dict[str, Any] | None:
+        with self._lock:
+            if not self._items:
+                self._deadline = now + self._max_wait
+            self._items.append(_snapshot(inputs))
+            if len(self._items) >= min(self._size, self._max_items):
+                return self._emit()
+        return None
+
+    def flush_due(self, now: float) -> list[dict[str, Any]]:
+        with self._lock:
+            if not self._items or now < self._deadline:
+                return []
+            return [self._emit()]
+
+    def next_deadline(self) -> float | None:
+        with self._lock:
+            return self._deadline if self._items else None
+
+
+_OPERATORS: dict[str, type[StreamOperator]] = {
+    "throttle": ThrottleOperator,
+    "dedupe": DedupeOperator,
+    "debounce": DebounceOperator,
+    "window": WindowOperator,
+    "batch": BatchOperator,
+}
+
+
+def create_operator(node_type: str, config: Mapping[str, Any]) -> StreamOperator | None:
+    cls = _OPERATORS.get((node_type or "").strip())
+    return cls(config) if cls else None
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+from collections import deque
+from typing import Iterable, Mapping
+
+
+class TriggerIndex:
+    """
+    Automato Aho-Corasick com os gatilhos de todas as skills.
+
+    `match(texto)` devolve, numa unica passada pelo texto, as skills com algum
+    gatilho contido nele - o mesmo resultado de `any(g in texto for g in
+    gatilhos)` skill a skill. `owners` guarda a ordem de insercao das skills.
+    """
+
+    __slots__ = ("owners", "_goto", "_fail", "_out", "size")
+
+    def __init__(self, triggers: Mapping[str, Iterable[str]]):
+        goto: list[dict[str, int]] = [{}]
+        out: list[set[str]] = [set()]
+        owners: list[str] = []
+        size = 0
+        for owner, words in triggers.items():
+            owners.append(owner)
+            for word in words:
+                if not word:
+                    continue
+                size += 1
+                state = 0
+                for ch in word:
+                    nxt = goto[state].get(ch)
+                    if nxt is None:
+                        nxt = len(goto)
+                        goto[state][ch] = nxt
+                        goto.append({})
+                        out.append(set())
+                    state = nxt
+                out[state].add(owner)
+
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in goto[state].items():
+                queue.append(nxt)
+                link = fail[state]
+                while link and ch not in goto[link]:
+                    link = fail[link]
+                candidate = goto[link].get(ch, 0)
+                fail[nxt] = candidate if candidate != nxt else 0
+                out[nxt] |= out[fail[nxt]]
+
+        self.owners = tuple(owners)
+        self._goto = goto
+        self._fail = fail
+        self._out = [frozenset(items) for items in out]
+        self.size = size
+
+    def match(self, text: str) -> set[str]:
+        goto = self._goto
+        fail = self._fail
+        out = self._out
+        found: set[str] = set()
+        state = 0
+        for ch in text:
+            nxt = goto[state].get(ch)
+            while nxt is None and state:
+                state = fail[state]
+                nxt = goto[state].get(ch)
+            state = nxt or 0
+            if out[state]:
+                found |= out[state]
+        return found
+
+    def match_ordered(self, text: str) -> list[str]:
+        """Como match(), mas na ordem de `owners`."""
+        found = self.match(text)
+        if not found:
+            return []
+        return [owner for owner in self.owners if owner in found]
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+
+class _Flight:
+    __slots__ = ("done", "value", "error")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: BaseException | None = None
+
+
+class TTLCache:
+    """
+    LRU limitado com TTL por entrada e single-flight.
+
+    `get_or_compute(key, ttl, fn)` devolve o valor em cache se ainda valido;
+    senao executa `fn()` uma unica vez mesmo com varias threads pedindo a mesma
+    chave ao mesmo tempo (as demais esperam e recebem o mesmo resultado ou a
+    mesma excecao). Excecoes nunca sao cacheadas.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self._max_entries = max(1, int(max_entries))
+        self._items: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._flights: dict[Hashable, _Flight] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expired = 0
+        self.shared = 0
+
+    def get_or_compute(self, key: Hashable, ttl_sec: float, fn: Callable[[], Any]) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            item = self._items.get(key)
+            if item is not None:
+                expires_at, value = item
+                if expires_at > now:
+                    self._items.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._items[key]
+                self.expired += 1
+
+            flight = self._flights.get(key)
+            if flight is not None:
+                self.shared += 1
+                leader = False
+            else:
+                flight = self._flights[key] = _Flight()
+                self.misses += 1
+                leader = True
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = fn()
+        except BaseException as exc:
+            flight.error = exc
+            raise
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+                if flight.error is None and ttl_sec > 0:
+                    self._items[key] = (time.monotonic() + ttl_sec, flight.value)
+                    self._items.move_to_end(key)
+                    while len(self._items) > self._max_entries:
+                        self._items.popitem(last=False)
+                        self.evictions += 1
+            flight.done.set()
+        return flight.value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "size": len(self._items),
+                "max_entries": self._max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expired": self.expired,
+                "shared": self.shared,
+            }
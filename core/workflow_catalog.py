@@ -0,0 +1,274 @@
+from __future__ import annotations
+
+import json
+import logging
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable
+
+try:
+    from watchdog.observers import Observer
+except Exception:  # pragma: no cover - depende de lib externa
+    Observer = None
+
+
+logger = logging.getLogger("WorkflowCatalog")
+
+# Rajadas de escrita (editor salvando via arquivo temporario) viram um refresh.
+_DEBOUNCE_SEC = 0.2
+# Com inotify o refresh periodico e so uma rede de seguranca.
+_SAFETY_POLL_SEC = 30.0
+
+
+@dataclass(slots=True)
+class CatalogEntry:
+    id: str
+    name: str
+    path: str
+    nodes: int
+    connections: int
+    mtime_ns: int
+    size: int
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "id": self.id,
+            "name": self.name,
+            "path": self.path,
+            "nodes": self.nodes,
+            "connections": self.connections,
+        }
+
+
+def _is_current(entry: CatalogEntry) -> bool:
+    try:
+        stat = Path(entry.path).stat()
+    except OSError:
+        return False
+    return (stat.st_mtime_ns, stat.st_size) == (entry.mtime_ns, entry.size)
+
+
+class _FsTrigger:
+    """Handler do watchdog: qualquer mudanca em .json acorda o refresh."""
+
+    def __init__(self, trigger: threading.Event):
+        self._trigger = trigger
+
+    def dispatch(self, event: Any) -> None:
+        paths = (getattr(event, "src_path", ""), getattr(event, "dest_path", ""))
+        if getattr(event, "is_directory", False) or any(
+            str(p).lower().endswith(".json") for p in paths if p
+        ):
+            self._trigger.set()
+
+
+class WorkflowCatalog:
+    """
+    Indice dos arquivos de workflow por id (e por nome do arquivo).
+
+    `refresh()` so faz stat dos arquivos e reparseia os que mudaram de
+    fingerprint (mtime_ns, tamanho); `get(id)` e uma consulta no dict. Com
+    `watch()` um watcher (inotify via watchdog, ou polling) mantem o indice
+    atualizado e avisa quais arquivos mudaram.
+    """
+
+    def __init__(self, root: Callable[[], Path]):
+        self._root = root
+        self._lock = threading.RLock()
+        self._root_path: Path | None = None
+        self._by_path: dict[str, CatalogEntry] = {}
+        # Arquivos invalidos: fingerprint do ultimo parse que falhou.
+        self._invalid: dict[str, tuple[int, int]] = {}
+        self._by_id: dict[str, CatalogEntry] = {}
+        self._watch_stop: threading.Event | None = None
+        self._watch_thread: threading.Thread | None = None
+        self._observer: Any = None
+        self.mode = ""
+        self.refreshes = 0
+        self.parsed = 0
+
+    def refresh(self) -> list[str]:
+        """Atualiza o indice; retorna os caminhos adicionados, alterados ou removidos."""
+        root = self._root().resolve()
+        with self._lock:
+            self.refreshes += 1
+            if root != self._root_path:
+                self._root_path = root
+                self._by_path.clear()
+                self._invalid.clear()
+
+            seen: set[str] = set()
+            changed: list[str] = []
+            for path in sorted(root.rglob("*.json")):
+                try:
+                    resolved = path.resolve()
+                    resolved.relative_to(root)
+                    stat = resolved.stat()
+                except (OSError, ValueError):
+                    continue
+                if not resolved.is_file():
+                    continue
+                key = str(resolved)
+                seen.add(key)
+                fingerprint = (stat.st_mtime_ns, stat.st_size)
+                entry = self._by_path.get(key)
+                if entry is not None and (entry.mtime_ns, entry.size) == fingerprint:
+                    continue
+                if entry is None and self._invalid.get(key) == fingerprint:
+                    continue
+                changed.append(key)
+                parsed = self._parse(resolved, fingerprint)
+                if parsed is None:
+                    self._by_path.pop(key, None)
+                    self._invalid[key] = fingerprint
+                else:
+                    self._by_path[key] = parsed
+                    self._invalid.pop(key, None)
+
+            for key in [k for k in self._by_path if k not in seen]:
+                del self._by_path[key]
+                changed.append(key)
+            for key in [k for k in self._invalid if k not in seen]:
+                del self._invalid[key]
+
+            if changed or not self._by_id:
+                self._rebuild_ids()
+            return changed
+
+    def _parse(self, path: Path, fingerprint: tuple[int, int]) -> CatalogEntry | None:
+        self.parsed += 1
+        try:
+            with path.open("r", encoding="utf-8") as f:
+                data = json.load(f)
+        except Exception:
+            return None
+        if not isinstance(data, dict):
+            return None
+        return CatalogEntry(
+            id=str(data.get("id", "")).strip() or path.stem,
+            name=str(data.get("name", "")).strip() or path.stem,
+            path=str(path),
+            nodes=len(data.get("nodes", []) or []),
+            connections=len(data.get("connections", []) or []),
+            mtime_ns=fingerprint[0],
+            size=fingerprint[1],
+        )
+
+    def _rebuild_ids(self) -> None:
+        # Em ordem de caminho o primeiro arquivo vence (id ou nome do arquivo).
+        by_id: dict[str, CatalogEntry] = {}
+        for key in sorted(self._by_path):
+            entry = self._by_path[key]
+            by_id.setdefault(entry.id, entry)
+            by_id.setdefault(Path(key).stem, entry)
+        self._by_id = by_id
+
+    @property
+    def watching(self) -> bool:
+        return self._watch_thread is not None and self._watch_thread.is_alive()
+
+    def get(self, workflow_id: str) -> CatalogEntry | None:
+        """
+        Busca por id. Sem watcher ativo, um acerto so vale se o arquivo ainda
+        tiver o mesmo fingerprint; falta ou arquivo mudado faz refresh.
+        """
+        wf_id = (workflow_id or "").strip()
+        with self._lock:
+            if self._root_path is None:
+                self.refresh()
+            entry = self._by_id.get(wf_id)
+            if not self.watching and (entry is None or not _is_current(entry)):
+                self.refresh()
+                entry = self._by_id.get(wf_id)
+            return entry
+
+    def entries(self) -> list[CatalogEntry]:
+        with self._lock:
+            if not self.watching:
+                self.refresh()
+            return [self._by_path[key] for key in sorted(self._by_path)]
+
+    def watch(
+        self,
+        on_change: Callable[[list[str]], None],
+        *,
+        interval_sec: float = 2.0,
+    ) -> str:
+        """Inicia o watcher (idempotente); retorna o modo: `inotify` ou `polling`."""
+        if self.watching:
+            return self.mode
+        self.refresh()
+        trigger = threading.Event()
+        stop = threading.Event()
+        interval = max(0.1, float(interval_sec))
+        mode = "polling"
+        if Observer is not None:
+            try:
+                observer = Observer()
+                observer.schedule(_FsTrigger(trigger), str(self._root().resolve()), recursive=True)
+                observer.daemon = True
+                observer.start()
+                self._observer = observer
+                mode = "inotify"
+                interval = max(interval, _SAFETY_POLL_SEC)
+            except Exception as exc:
+                logger.warning("Watcher de workflows sem inotify, usando polling: %s", exc)
+        self.mode = mode
+        self._watch_stop = stop
+        self._watch_thread = threading.Thread(
+            target=self._watch_loop,
+            args=(on_change, interval, trigger, stop),
+            daemon=True,
+            name="workflow-catalog-watch",
+        )
+        self._watch_thread.start()
+        return mode
+
+    def stop_watching(self) -> None:
+        if self._watch_stop is not None:
+            self._watch_stop.set()
+        if self._observer is not None:
+            try:
+                self._observer.stop()
+            except Exception:
+                pass
+            self._observer = None
+        if self._watch_thread is not None and self._watch_thread.is_alive():
+            self._watch_thread.join(timeout=1.5)
+        self._watch_thread = None
+        self._watch_stop = None
+        self.mode = ""
+
+    def _watch_loop(
+        self,
+        on_change: Callable[[list[str]], None],
+        interval: float,
+        trigger: threading.Event,
+        stop: threading.Event,
+    ) -> None:
+        while not stop.is_set():
+            trigger.wait(interval)
+            if stop.is_set():
+                return
+            if trigger.is_set():
+                trigger.clear()
+                if stop.wait(_DEBOUNCE_SEC):
+                    return
+            try:
+                changed = self.refresh()
+                if changed:
+                    on_change(changed)
+            except Exception as exc:
+                logger.error("Erro no watcher de workflows: %s", exc)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "size": len(self._by_path),
+                "invalid": len(self._invalid),
+                "watching": self.watching,
+                "mode": self.mode,
+                "refreshes": self.refreshes,
+                "parsed": self.parsed,
+            }
@@ -1,20 +1,84 @@
 from __future__ import annotations
 
+import json
 import logging
+import os
 import threading
 import time
+from collections import ChainMap, OrderedDict, deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from dataclasses import dataclass, field
-from typing import Any, Mapping, Optional
-
-from core.event_bus import Event, EventFilter, EventBus, event_bus
-from core.event_queue import EventQueue
-from core.skill_registry import SkillRegistry
+from typing import Any, Callable, Mapping, Optional
+
+from core.event_bus import Event, EventFilter, EventBus, event_bus, pattern_specificity
+from core.event_condition import condition_error
+from core.chat_batch_reply import ChatItem, generate_batch_replies
+from core.event_queue import PriorityClass, PriorityEventQueue
+from core.skill_registry import SkillEntry, SkillRegistry
+from core.stream_operators import (
+    OPERATOR_INPUT_PORTS,
+    OPERATOR_NODE_TYPES,
+    OPERATOR_OUTPUT_PORTS,
+    StreamOperator,
+    create_operator,
+)
+from core.ttl_cache import TTLCache
 
 
 logger = logging.getLogger("WorkflowEngine")
 
 
-@dataclass(frozen=True)
+# Classes padrao da fila de eventos: pagos > moderadores > mensagens comuns.
+# Sobrescritas por `config.queue.classes` no JSON do workflow.
+DEFAULT_QUEUE_CLASSES: tuple[dict[str, Any], ...] = (
+    {
+        "name": "paid",
+        "priority": 30,
+        "events": [
+            "chat.message.superchat",
+            "chat.message.supersticker",
+            "chat.message.bits",
+            "chat.message.membership*",
+        ],
+    },
+    {"name": "mod", "priority": 20, "events": ["chat.message.mod"]},
+    {"name": "message", "priority": 10, "max_age_sec": 30, "coalesce": True},
+)
+
+# Eventos com a mesma chave de particao sao processados em ordem; chaves
+# diferentes rodam em paralelo ate `config.max_concurrency`.
+DEFAULT_PARTITION_KEY: tuple[str, ...] = ("platform", "user")
+MAX_CONCURRENCY_LIMIT = 32
+
+# Entradas usadas como chave de cache quando `cache.key` nao e informado (as
+# mesmas que _pick_command consulta).
+DEFAULT_CACHE_KEY: tuple[str, ...] = ("command", "prompt", "text", "message", "input")
+
+# Porta de saida preenchida apenas quando o node estoura o tempo limite; nodes
+# ligados a ela rodam so nesse caso (e os ligados as demais portas, nunca).
+TIMEOUT_PORT = "timeout"
+
+# Config do workflow que so muda reiniciando o engine (swap_workflow recusa).
+RESTART_CONFIG_KEYS: tuple[str, ...] = ("queue", "max_concurrency", "partition_key")
+
+# Quantas correlacoes recentes lembrar para descartar entregas repetidas da
+# mesma ocorrencia (varios padroes assinados / varios eventos com o mesmo id).
+CORRELATION_WINDOW = 4096
+
+# Workers do pool que roda nodes com prazo (timeout_sec > 0); limita quantas
+# execucoes travadas podem se acumular.
+ISOLATED_NODE_WORKERS = MAX_CONCURRENCY_LIMIT
+
+# Nodes que nunca rodam em paralelo entre si (ex.: acoes no OBS). Um node pode
+# entrar/sair dessa lista com `config.serial: true|false`.
+SERIAL_NODE_TYPES = frozenset({"obs-scene-switch", "obs-source-toggle"})
+
+# Builtins que fazem I/O externo (ex.: chamada de LLM) e, como as skills,
+# herdam o tempo limite padrao de LUNA_WORKFLOW_NODE_TIMEOUT_SEC.
+EXTERNAL_IO_NODE_TYPES = frozenset({"chat-reply-batch"})
+
+
+@dataclass(frozen=True, slots=True)
 class FlowEventFilter:
     event: str
     condition: str = ""
@@ -29,7 +93,7 @@ class FlowEventFilter:
         )
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class FlowNode:
     id: str
     type: str
@@ -52,7 +116,7 @@ class FlowNode:
         )
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class FlowConnection:
     id: str
     from_node: str
@@ -75,12 +139,13 @@ class FlowConnection:
         )
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class WorkflowDefinition:
     id: str
     name: str
     nodes: tuple[FlowNode, ...]
     connections: tuple[FlowConnection, ...]
+    config: dict[str, Any] = field(default_factory=dict)
 
     @classmethod
     def from_dict(cls, data: Mapping[str, Any] | None) -> "WorkflowDefinition":
@@ -88,12 +153,169 @@ class WorkflowDefinition:
             return cls(id="", name="", nodes=(), connections=())
         nodes_data = data.get("nodes") if isinstance(data.get("nodes"), list) else []
         conn_data = data.get("connections") if isinstance(data.get("connections"), list) else []
+        config = data.get("config") if isinstance(data.get("config"), Mapping) else {}
         return cls(
             id=str(data.get("id", "")).strip(),
             name=str(data.get("name", "")).strip(),
             nodes=tuple(FlowNode.from_dict(item) for item in nodes_data),
             connections=tuple(FlowConnection.from_dict(item) for item in conn_data),
+            config=dict(config),
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class QueueClassRule:
+    priority_class: PriorityClass
+    filters: tuple[EventFilter, ...] = ()
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> "QueueClassRule":
+        events = data.get("events")
+        if isinstance(events, str):
+            events = [events]
+        events = [str(item).strip() for item in events or [] if str(item).strip()]
+        condition = str(data.get("condition", "") or "").strip()
+        if condition and not events:
+            events = ["*"]
+        return cls(
+            priority_class=PriorityClass(
+                name=str(data.get("name", "")).strip(),
+                priority=int(data.get("priority", 0) or 0),
+                max_age_sec=max(0.0, float(data.get("max_age_sec", 0) or 0)),
+                coalesce=bool(data.get("coalesce", False)),
+            ),
+            filters=tuple(EventFilter(event=item, condition=condition) for item in events),
+        )
+
+
+class NodeTimeoutError(Exception):
+    def __init__(self, node_id: str, timeout_sec: float):
+        self.node_id = node_id
+        self.timeout_sec = timeout_sec
+        super().__init__(f"Node '{node_id}' excedeu o tempo limite ({timeout_sec:g}s).")
+
+
+class WorkflowCancelledError(Exception):
+    pass
+
+
+class _RunContext:
+    """Estado de uma execucao do plano: entradas raiz, prazo e cancelamento."""
+
+    __slots__ = ("root_inputs", "deadline", "cancel", "operators")
+
+    def __init__(
+        self,
+        root_inputs: Callable[[], Mapping[str, Any]],
+        *,
+        timeout_sec: float = 0.0,
+        cancel: threading.Event | None = None,
+        operators: Mapping[str, StreamOperator] | None = None,
+    ):
+        self.root_inputs = root_inputs
+        self.deadline = time.monotonic() + timeout_sec if timeout_sec > 0 else 0.0
+        self.cancel = cancel
+        # Estado dos operadores de streaming desta execucao (node id -> operador).
+        self.operators = operators or {}
+
+    def node_timeout(self, node_timeout_sec: float) -> float:
+        # 0 = sem limite; senao o menor entre o limite do node e o que resta do workflow.
+        if not self.deadline:
+            return node_timeout_sec
+        remaining = max(0.001, self.deadline - time.monotonic())
+        return min(node_timeout_sec, remaining) if node_timeout_sec > 0 else remaining
+
+
+@dataclass(frozen=True, slots=True)
+class NodeCachePolicy:
+    ttl_sec: float
+    key: tuple[str, ...] = DEFAULT_CACHE_KEY
+    # Identifica o node (id, tipo e config) para nao misturar workflows.
+    scope: str = ""
+
+    @classmethod
+    def from_node(cls, node: "FlowNode") -> "NodeCachePolicy | None":
+        raw = node.config.get("cache")
+        if not isinstance(raw, Mapping):
+            return None
+        try:
+            ttl = float(raw.get("ttl_sec", 0) or 0)
+        except (TypeError, ValueError):
+            return None
+        if ttl <= 0:
+            return None
+        key = raw.get("key")
+        if isinstance(key, str):
+            key = [key]
+        fields = tuple(str(item).strip() for item in key or [] if str(item).strip())
+        scope = json.dumps(
+            [node.id, node.type, node.config],
+            sort_keys=True,
+            ensure_ascii=False,
+            default=str,
         )
+        return cls(ttl_sec=ttl, key=fields or DEFAULT_CACHE_KEY, scope=scope)
+
+    def cache_key(self, inputs: Mapping[str, Any]) -> str:
+        values = [inputs.get(name) for name in self.key]
+        return self.scope + "|" + json.dumps(values, sort_keys=True, ensure_ascii=False, default=str)
+
+
+# (node, inputs, event) -> outputs
+NodeHandler = Callable[["CompiledNode", Mapping[str, Any], Optional[Event]], dict[str, Any]]
+
+
+@dataclass(frozen=True, slots=True)
+class InboundLink:
+    source: int
+    from_port: str
+    target_port: str
+
+
+@dataclass(frozen=True, slots=True)
+class CompiledNode:
+    node: FlowNode
+    inbound: tuple[InboundLink, ...]
+    filters: tuple[EventFilter, ...]
+    handler: NodeHandler
+    skill_name: str = ""
+    skill_entry: SkillEntry | None = None
+    # Indices dos nodes que dependem deste e numero de nodes de origem distintos.
+    dependents: tuple[int, ...] = ()
+    upstream_count: int = 0
+    serial: bool = False
+    cache: NodeCachePolicy | None = None
+    timeout_sec: float = 0.0
+    # Node de streaming (throttle/debounce/dedupe/window/batch). O estado nao
+    # fica no plano (que e compartilhado/cacheado): cada execucao cria o seu.
+    stateful: bool = False
+    # Operador que emite pelo timer (debounce, batch, window tumbling).
+    timed: bool = False
+
+
+@dataclass(frozen=True, slots=True)
+class CompiledWorkflow:
+    """
+    Plano de execucao pre-computado: nodes em ordem topologica, cada um com
+    conexoes de entrada por indice, filtros compilados e handler resolvido.
+    Imutavel e sem estado de execucao (operadores, saidas, prazos ficam no
+    _RunContext), entao pode ser cacheado e usado por varias execucoes ao
+    mesmo tempo.
+    """
+
+    workflow: WorkflowDefinition
+    nodes: tuple[CompiledNode, ...]
+    # 1 = sequencial; >1 = ramos independentes em paralelo (config.parallelism).
+    parallelism: int = 1
+    # Prazo total por execucao (config.timeout_sec); 0 = sem limite.
+    timeout_sec: float = 0.0
+
+    def outputs_by_id(self, outputs: list[dict[str, Any] | None]) -> dict[str, dict[str, Any]]:
+        return {
+            compiled.node.id: output
+            for compiled, output in zip(self.nodes, outputs)
+            if output is not None
+        }
 
 
 class WorkflowCycleError(Exception):
@@ -116,14 +338,49 @@ class WorkflowEngine:
         registry: SkillRegistry | None = None,
         bus: EventBus | None = None,
         queue_size: int = 100,
+        node_cache_size: int = 256,
     ):
         self._registry = registry or SkillRegistry()
         self._bus = bus or event_bus
-        self._queue: EventQueue[Event] = EventQueue(max_size=queue_size)
+        self._queue: PriorityEventQueue[Event] = PriorityEventQueue(max_size=queue_size)
         self._workflow: WorkflowDefinition | None = None
-        self._execution_order: list[FlowNode] = []
+        self._plan: CompiledWorkflow | None = None
+        # Um pool por paralelismo; nunca e desligado enquanto o engine vive,
+        # porque outra execucao pode estar submetendo ramos nele.
+        self._node_pools: dict[int, ThreadPoolExecutor] = {}
+        # Nodes com prazo rodam neste pool limitado (criado sob demanda);
+        # node id -> execucao que estourou o prazo e ainda nao terminou.
+        self._isolated_pool: ThreadPoolExecutor | None = None
+        self._stuck_nodes: dict[str, Future] = {}
+        self._serial_lock = threading.Lock()
+        # Memoizacao de nodes com `config.cache` (LRU + TTL + single-flight).
+        self._node_cache = TTLCache(max_entries=node_cache_size)
+        self._node_timeouts: dict[str, int] = {}
+        self._nodes_cancelled = 0
+        # Setado em stop_event_driven(); execucoes em andamento abortam.
+        self._cancel = threading.Event()
         self._subscriptions: list[str] = []
         self._worker: threading.Thread | None = None
+        self._timer: threading.Thread | None = None
+        self._operators: dict[str, StreamOperator] = {}
+        self._timer_stop = threading.Event()
+        self._listen_patterns: tuple[str, ...] = ()
+        self._plan_swaps = 0
+        self._operator_flushes = 0
+        self._correlation_lock = threading.Lock()
+        self._recent_correlations: OrderedDict[str, None] = OrderedDict()
+        self._events_deduplicated = 0
+        self._subscription_filter_count = 0
+        self._executor: ThreadPoolExecutor | None = None
+        self._max_concurrency = 1
+        self._partition_fields: tuple[str, ...] = DEFAULT_PARTITION_KEY
+        self._slots = threading.Semaphore(1)
+        self._partition_lock = threading.Lock()
+        self._active_partitions: set[str] = set()
+        # particao -> (evento, entrada na fila em time.monotonic())
+        self._partition_backlog: dict[str, deque[tuple[Event, float]]] = {}
+        self._backlog_limit = max(1, int(queue_size))
+        self._partition_dropped = 0
         self._running = threading.Event()
         self._lock = threading.Lock()
         self._last_error = ""
@@ -143,6 +400,17 @@ class WorkflowEngine:
             events_failed = self._events_failed
             last_event_ts = self._last_event_ts
             events_total = events_processed + events_failed
+            node_timeouts = dict(self._node_timeouts)
+            operator_flushes = self._operator_flushes
+            nodes_cancelled = self._nodes_cancelled
+            events_deduplicated = self._events_deduplicated
+            subscription_filters = self._subscription_filter_count
+            plan_swaps = self._plan_swaps
+        queue_metrics = self._queue.metrics()
+        with self._partition_lock:
+            in_flight = len(self._active_partitions)
+            backlog = {key: len(items) for key, items in self._partition_backlog.items() if items}
+            partition_dropped = self._partition_dropped
         return {
             "status": "running" if running else "idle",
             "workflow_id": workflow_id,
@@ -152,6 +420,21 @@ class WorkflowEngine:
             "queue_size": self._queue.qsize,
             "queue_dropped": self._queue.dropped_count,
             "queue_processing": self._queue.is_processing,
+            "queue_expired": queue_metrics["expired"],
+            "queue_coalesced": queue_metrics["coalesced"],
+            "queue_classes": queue_metrics["classes"],
+            "max_concurrency": self._max_concurrency,
+            "in_flight": in_flight,
+            "partition_backlog": backlog,
+            "partition_backlog_total": sum(backlog.values()),
+            "partition_dropped": partition_dropped,
+            "node_cache": self._node_cache.stats(),
+            "node_timeouts": node_timeouts,
+            "nodes_cancelled": nodes_cancelled,
+            "events_deduplicated": events_deduplicated,
+            "subscription_filters": subscription_filters,
+            "plan_swaps": plan_swaps,
+            "operator_flushes": operator_flushes,
             "events_processed": events_processed,
             "events_failed": events_failed,
             "events_total": events_total,
@@ -223,24 +506,379 @@ class WorkflowEngine:
         start_node_id: str = "",
         initial_inputs: Mapping[str, Any] | None = None,
     ) -> dict[str, dict[str, Any]]:
-        workflow = self._prepare_workflow(workflow_data, start_node_id=start_node_id)
+        plan = self.compile_workflow(workflow_data, start_node_id=start_node_id)
+        return self.execute_plan(plan, initial_inputs=initial_inputs)
+
+    def execute_plan(
+        self,
+        plan: CompiledWorkflow,
+        *,
+        initial_inputs: Mapping[str, Any] | None = None,
+    ) -> dict[str, dict[str, Any]]:
+        """Executa uma vez um plano ja compilado (sem revalidar o workflow)."""
+        initial_inputs = dict(initial_inputs or {})
+        operators = self._create_operators(plan)
+        outputs = self._execute_plan(
+            plan, None, lambda: dict(initial_inputs), operators=operators
+        )
+        # Execucao unica: o que ficou pendente nos operadores com timer
+        # (janela, lote, debounce) e emitido agora, no fim da execucao.
+        for idx, operator in self._timed_operators(plan, operators):
+            for output in operator.flush_due(float("inf")):
+                flushed = self._run_downstream(plan, idx, output, None, operators)
+                for pos, value in enumerate(flushed):
+                    if value is not None:
+                        outputs[pos] = value
+        return plan.outputs_by_id(outputs)
+
+    def compile_workflow(
+        self,
+        workflow_data: Mapping[str, Any] | WorkflowDefinition,
+        *,
+        start_node_id: str = "",
+    ) -> CompiledWorkflow:
+        """Valida e compila o workflow em um plano reutilizavel por evento."""
+        if isinstance(workflow_data, WorkflowDefinition):
+            workflow = workflow_data
+        else:
+            workflow = self._prepare_workflow(workflow_data, start_node_id=start_node_id)
         self._validate_workflow_contract(workflow)
         order = self._get_execution_order(workflow)
-        outputs: dict[str, dict[str, Any]] = {}
-        inbound_counts = self._inbound_counts(workflow)
-        initial_inputs = dict(initial_inputs or {})
+        index = {node.id: idx for idx, node in enumerate(order)}
 
-        for node in order:
-            inputs = self._resolve_inputs(node.id, workflow, outputs)
-            if not inputs and inbound_counts.get(node.id, 0) == 0:
-                inputs = dict(initial_inputs)
-            if not inputs and inbound_counts.get(node.id, 0) > 0:
+        inbound: list[list[InboundLink]] = [[] for _ in order]
+        for conn in workflow.connections:
+            source = index.get(conn.from_node)
+            target = index.get(conn.to_node)
+            if source is None or target is None:
                 continue
+            inbound[target].append(
+                InboundLink(
+                    source=source,
+                    from_port=conn.from_port,
+                    target_port=conn.to_port or conn.from_port or "input",
+                )
+            )
+
+        dependents: list[set[int]] = [set() for _ in order]
+        for target, links in enumerate(inbound):
+            for link in links:
+                dependents[link.source].add(target)
+        upstream_counts = [len({link.source for link in links}) for links in inbound]
+
+        builtins = self._builtin_handlers()
+        nodes: list[CompiledNode] = []
+        for idx, node in enumerate(order):
+            probe = create_operator(node.type, node.config)
+            if probe is not None and probe.has_timer:
+                self._check_timed_operator(order, idx, inbound, dependents)
+            handler = builtins.get(node.type)
+            skill_name = ""
+            skill_entry = None
+            if handler is None:
+                skill_name = self._resolve_skill_name(node.type)
+                handler = self._run_skill if skill_name else self._run_unsupported
+                if skill_name:
+                    skill_entry = self._registry.load(skill_name)
+            nodes.append(
+                CompiledNode(
+                    node=node,
+                    inbound=tuple(inbound[idx]),
+                    filters=self._build_node_filters(node),
+                    handler=handler,
+                    skill_name=skill_name,
+                    skill_entry=skill_entry,
+                    dependents=tuple(sorted(dependents[idx])),
+                    upstream_count=upstream_counts[idx],
+                    serial=self._to_bool(
+                        node.config.get("serial"),
+                        default=node.type in SERIAL_NODE_TYPES,
+                    ),
+                    cache=NodeCachePolicy.from_node(node),
+                    timeout_sec=self._resolve_node_timeout(
+                        workflow,
+                        node,
+                        external_io=bool(skill_name) or node.type in EXTERNAL_IO_NODE_TYPES,
+                    ),
+                    stateful=probe is not None,
+                    timed=probe is not None and probe.has_timer,
+                )
+            )
+        return CompiledWorkflow(
+            workflow=workflow,
+            nodes=tuple(nodes),
+            parallelism=self._resolve_parallelism(workflow),
+            timeout_sec=self._positive_float(workflow.config.get("timeout_sec")),
+        )
 
-            node_output = self._execute_node(node, inputs, event=None)
-            outputs[node.id] = node_output
+    @staticmethod
+    def _check_timed_operator(
+        order: list[FlowNode],
+        start: int,
+        inbound: list[list[InboundLink]],
+        dependents: list[set[int]],
+    ) -> None:
+        # O flush pelo timer roda so o downstream do operador, sem evento: um
+        # node que tambem recebe de outro ramo ficaria sem essas entradas.
+        descendants: set[int] = set()
+        stack = list(dependents[start])
+        while stack:
+            idx = stack.pop()
+            if idx not in descendants:
+                descendants.add(idx)
+                stack.extend(dependents[idx])
+        for idx in descendants:
+            for link in inbound[idx]:
+                if link.source != start and link.source not in descendants:
+                    raise WorkflowValidationError([
+                        f"Node '{order[idx].id}' junta o operador temporizado "
+                        f"'{order[start].id}' com outro ramo ('{order[link.source].id}'); "
+                        "use o operador depois da juncao."
+                    ])
+
+    @staticmethod
+    def _positive_float(value: Any) -> float:
+        try:
+            return max(0.0, float(value or 0))
+        except (TypeError, ValueError):
+            return 0.0
+
+    def _resolve_node_timeout(
+        self,
+        workflow: WorkflowDefinition,
+        node: FlowNode,
+        *,
+        external_io: bool,
+    ) -> float:
+        # node.config.timeout_sec > workflow.config.node_timeout_sec > padrao
+        # de env (so para skills e builtins com I/O externo).
+        for value in (node.config.get("timeout_sec"), workflow.config.get("node_timeout_sec")):
+            if value is not None:
+                return self._positive_float(value)
+        if external_io:
+            return self._positive_float(os.getenv("LUNA_WORKFLOW_NODE_TIMEOUT_SEC", "60"))
+        return 0.0
+
+    @staticmethod
+    def _resolve_parallelism(workflow: WorkflowDefinition) -> int:
+        try:
+            value = int(workflow.config.get("parallelism", 1) or 1)
+        except (TypeError, ValueError):
+            value = 1
+        return max(1, min(value, MAX_CONCURRENCY_LIMIT))
+
+    def _node_executor(self, size: int) -> ThreadPoolExecutor:
+        with self._lock:
+            pool = self._node_pools.get(size)
+            if pool is None:
+                pool = ThreadPoolExecutor(
+                    max_workers=size,
+                    thread_name_prefix=f"workflow-node-p{size}",
+                )
+                self._node_pools[size] = pool
+            return pool
+
+    def _execute_plan(
+        self,
+        plan: CompiledWorkflow,
+        event: Event | None,
+        root_inputs: Callable[[], Mapping[str, Any]],
+        *,
+        cancel: threading.Event | None = None,
+        operators: Mapping[str, StreamOperator] | None = None,
+    ) -> list[dict[str, Any] | None]:
+        ctx = _RunContext(
+            root_inputs, timeout_sec=plan.timeout_sec, cancel=cancel, operators=operators
+        )
+        outputs: list[dict[str, Any] | None] = [None] * len(plan.nodes)
+        if plan.parallelism <= 1 or len(plan.nodes) <= 1:
+            for idx, compiled in enumerate(plan.nodes):
+                if cancel is not None and cancel.is_set():
+                    raise WorkflowCancelledError()
+                outputs[idx] = self._run_compiled_node(compiled, outputs, event, ctx)
+            return outputs
+        return self._execute_plan_parallel(plan, event, ctx, outputs)
+
+    def _execute_plan_parallel(
+        self,
+        plan: CompiledWorkflow,
+        event: Event | None,
+        ctx: _RunContext,
+        outputs: list[dict[str, Any] | None],
+    ) -> list[dict[str, Any] | None]:
+        # Agenda cada node assim que todas as origens terminaram (ou foram
+        # puladas). Prontos saem em ordem de indice; nodes serial nunca rodam
+        # juntos. `outputs` e indexado pelo plano, entao a ordem final nao
+        # depende de qual ramo terminou primeiro.
+        nodes = plan.nodes
+        pool = self._node_executor(plan.parallelism)
+        remaining = [compiled.upstream_count for compiled in nodes]
+        ready = [idx for idx, count in enumerate(remaining) if count == 0]
+        running: dict[Future, int] = {}
+        serial_running = False
+        error: BaseException | None = None
+
+        while ready or running:
+            if error is None and ctx.cancel is not None and ctx.cancel.is_set():
+                error = WorkflowCancelledError()
+            if error is None:
+                deferred: list[int] = []
+                while ready and len(running) < plan.parallelism:
+                    idx = ready.pop(0)
+                    compiled = nodes[idx]
+                    if compiled.serial:
+                        if serial_running:
+                            deferred.append(idx)
+                            continue
+                        serial_running = True
+                    future = pool.submit(
+                        self._run_compiled_node, compiled, outputs, event, ctx
+                    )
+                    running[future] = idx
+                ready = sorted(deferred + ready)
+            if not running:
+                break
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                idx = running.pop(future)
+                if nodes[idx].serial:
+                    serial_running = False
+                try:
+                    outputs[idx] = future.result()
+                except BaseException as exc:
+                    if error is None:
+                        error = exc
+                    continue
+                for dep in nodes[idx].dependents:
+                    remaining[dep] -= 1
+                    if remaining[dep] == 0:
+                        ready.append(dep)
+            ready.sort()
+
+        if error is not None:
+            raise error
         return outputs
 
+    def _run_compiled_node(
+        self,
+        compiled: CompiledNode,
+        outputs: list[dict[str, Any] | None],
+        event: Event | None,
+        ctx: _RunContext,
+    ) -> dict[str, Any] | None:
+        if event is not None and compiled.filters:
+            # Filtros ja ordenados do mais especifico para o mais generico: o
+            # primeiro cujo padrao casa com o evento decide (pela condicao).
+            for event_filter in compiled.filters:
+                if event_filter.matches_topic(event):
+                    if not event_filter.accepts(event):
+                        return None
+                    break
+            else:
+                return None
+
+        if compiled.inbound:
+            inputs = self._collect_inputs(compiled.inbound, outputs)
+            if not inputs:
+                return None
+        else:
+            inputs = ctx.root_inputs()
+
+        policy = compiled.cache
+        try:
+            if policy is not None:
+                return self._node_cache.get_or_compute(
+                    policy.cache_key(inputs),
+                    policy.ttl_sec,
+                    lambda: self._call_handler(compiled, inputs, event, ctx),
+                )
+            return self._call_handler(compiled, inputs, event, ctx)
+        except NodeTimeoutError as exc:
+            with self._lock:
+                self._node_timeouts[exc.node_id] = self._node_timeouts.get(exc.node_id, 0) + 1
+            logger.warning("%s", exc)
+            return {TIMEOUT_PORT: str(exc), "timed_out": True, "ok": False}
+
+    def _call_handler(
+        self,
+        compiled: CompiledNode,
+        inputs: Mapping[str, Any],
+        event: Event | None,
+        ctx: _RunContext,
+    ) -> dict[str, Any]:
+        # Cancelamento e checado antes de cada node; so nodes com prazo rodam
+        # em thread propria (o resto segue na thread do plano, sem custo extra).
+        if ctx.cancel is not None and ctx.cancel.is_set():
+            with self._lock:
+                self._nodes_cancelled += 1
+            raise WorkflowCancelledError()
+        timeout = ctx.node_timeout(compiled.timeout_sec)
+        call = compiled.handler
+        operator = ctx.operators.get(compiled.node.id) if compiled.stateful else None
+        if operator is not None:
+            call = self._operator_handler(operator)
+        if timeout > 0:
+            call = self._isolated_handler(timeout, ctx.cancel, call)
+        if compiled.serial:
+            with self._serial_lock:
+                return call(compiled, inputs, event)
+        return call(compiled, inputs, event)
+
+    def _isolated_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._isolated_pool is None:
+                self._isolated_pool = ThreadPoolExecutor(
+                    max_workers=ISOLATED_NODE_WORKERS,
+                    thread_name_prefix="workflow-node",
+                )
+            return self._isolated_pool
+
+    def _isolated_handler(
+        self,
+        timeout_sec: float,
+        cancel: threading.Event | None,
+        handler: NodeHandler,
+    ) -> NodeHandler:
+        # Roda o handler no pool limitado e espera com prazo. Threads Python
+        # nao podem ser mortas: um node travado segue ocupando um worker, e
+        # enquanto isso o mesmo node nao roda de novo (conta como timeout).
+        def call(
+            compiled: CompiledNode, inputs: Mapping[str, Any], event: Event | None
+        ) -> dict[str, Any]:
+            node_id = compiled.node.id
+            with self._lock:
+                stuck = self._stuck_nodes.get(node_id)
+                if stuck is not None and stuck.done():
+                    del self._stuck_nodes[node_id]
+                    stuck = None
+            if stuck is not None:
+                raise NodeTimeoutError(node_id, timeout_sec)
+
+            future = self._isolated_executor().submit(handler, compiled, inputs, event)
+            deadline = time.monotonic() + timeout_sec if timeout_sec > 0 else 0.0
+            while True:
+                wait_for = 0.1
+                if deadline:
+                    wait_for = min(wait_for, deadline - time.monotonic())
+                if wait_for > 0:
+                    done, _ = wait((future,), timeout=wait_for)
+                    if done:
+                        break
+                cancelled = cancel is not None and cancel.is_set()
+                if cancelled or (deadline and time.monotonic() >= deadline):
+                    with self._lock:
+                        if not future.cancel():
+                            self._stuck_nodes[node_id] = future
+                        if cancelled:
+                            self._nodes_cancelled += 1
+                    if cancelled:
+                        raise WorkflowCancelledError()
+                    raise NodeTimeoutError(node_id, timeout_sec)
+            return future.result()
+
+        return call
+
     def start_event_driven(
         self,
         workflow_data: Mapping[str, Any],
@@ -250,100 +888,343 @@ class WorkflowEngine:
     ) -> None:
         self.stop_event_driven()
 
-        workflow = self._prepare_workflow(workflow_data, start_node_id=start_node_id)
-        self._validate_workflow_contract(workflow)
-        order = self._get_execution_order(workflow)
+        plan = self.compile_workflow(workflow_data, start_node_id=start_node_id)
+        workflow = plan.workflow
+        operators = self._create_operators(plan)
 
         with self._lock:
             self._workflow = workflow
-            self._execution_order = order
+            self._plan = plan
+            self._operators = operators
+            self._node_timeouts = {}
+            self._nodes_cancelled = 0
+            self._operator_flushes = 0
+            self._events_deduplicated = 0
+            self._plan_swaps = 0
             self._last_error = ""
             self._started_at = time.time()
             self._events_processed = 0
             self._events_failed = 0
             self._last_event_ts = 0.0
 
+        self._cancel = threading.Event()
+        with self._correlation_lock:
+            self._recent_correlations.clear()
         self._running.set()
-        self._queue.clear()
-        self._queue.reset_metrics(reset_dropped=True)
+        self._queue.configure(**self._build_queue_policy(workflow))
+        self._max_concurrency = self._resolve_max_concurrency(workflow)
+        self._partition_fields = self._resolve_partition_fields(workflow)
+        self._slots = threading.Semaphore(self._max_concurrency)
+        with self._partition_lock:
+            self._active_partitions.clear()
+            self._partition_backlog.clear()
+            self._partition_dropped = 0
+        self._executor = ThreadPoolExecutor(
+            max_workers=self._max_concurrency,
+            thread_name_prefix="workflow-worker",
+        )
 
-        self._subscriptions = []
-        for pattern in listen_patterns:
-            sub_id = self._bus.subscribe(pattern, self._on_event, subscriber_id="workflow_engine")
-            self._subscriptions.append(sub_id)
+        prefilter = self._subscription_filters(plan)
+        with self._lock:
+            self._subscription_filter_count = len(prefilter)
+        self._listen_patterns = tuple(listen_patterns)
+        self._subscriptions = self._subscribe(prefilter)
 
         self._worker = threading.Thread(target=self._event_loop, daemon=True)
         self._worker.start()
+        self._start_operator_timer(plan, operators)
+
+    def swap_workflow(
+        self,
+        workflow_data: Mapping[str, Any] | WorkflowDefinition,
+        *,
+        start_node_id: str = "",
+    ) -> bool:
+        """
+        Troca o plano do workflow em execucao sem parar a fila: eventos ja
+        enfileirados rodam com o plano novo; os em andamento terminam com o
+        antigo. Retorna False (sem trocar nada) se o engine nao esta rodando ou
+        se `queue`/`max_concurrency`/`partition_key` mudaram - nesses casos e
+        preciso reiniciar com start_event_driven().
+        """
+        if not self._running.is_set() or self._plan is None:
+            return False
+        plan = self.compile_workflow(workflow_data, start_node_id=start_node_id)
+        with self._lock:
+            old_plan = self._plan
+            old_operators = self._operators
+        if self._restart_config(plan.workflow) != self._restart_config(old_plan.workflow):
+            return False
+
+        operators = self._create_operators(plan)
+        prefilter = self._subscription_filters(plan)
+        with self._lock:
+            self._workflow = plan.workflow
+            self._plan = plan
+            self._operators = operators
+            self._subscription_filter_count = len(prefilter)
+            self._plan_swaps += 1
+
+        # Assina antes de soltar as assinaturas antigas (sem janela sem
+        # assinatura); entregas em dobro nesse meio tempo caem na correlacao.
+        old_subscriptions = self._subscriptions
+        self._subscriptions = self._subscribe(prefilter)
+        for sub_id in old_subscriptions:
+            self._bus.unsubscribe(sub_id)
+
+        # Estado pendente dos operadores antigos e emitido com o plano antigo.
+        self._stop_operator_timer()
+        self._flush_operators(
+            old_plan,
+            old_operators,
+            self._timed_operators(old_plan, old_operators),
+            float("inf"),
+            self._cancel,
+        )
+        self._start_operator_timer(plan, operators)
+        return True
+
+    @staticmethod
+    def _restart_config(workflow: WorkflowDefinition) -> tuple[str, ...]:
+        return tuple(
+            json.dumps(workflow.config.get(key), sort_keys=True, default=str)
+            for key in RESTART_CONFIG_KEYS
+        )
+
+    def _subscribe(self, prefilter: tuple[EventFilter, ...]) -> list[str]:
+        return [
+            self._bus.subscribe(
+                pattern,
+                self._on_event,
+                any_filters=prefilter,
+                subscriber_id="workflow_engine",
+            )
+            for pattern in self._listen_patterns
+        ]
 
     def stop_event_driven(self) -> None:
         self._running.clear()
+        self._cancel.set()
         for sub_id in self._subscriptions:
             self._bus.unsubscribe(sub_id)
         self._subscriptions = []
         self._queue.clear()
-        self._queue.is_processing = False
+        with self._partition_lock:
+            self._partition_backlog.clear()
         if self._worker and self._worker.is_alive():
             self._worker.join(timeout=1.5)
         self._worker = None
+        self._stop_operator_timer()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        self._queue.is_processing = False
+
+    @staticmethod
+    def _subscription_filters(plan: CompiledWorkflow) -> tuple[EventFilter, ...]:
+        """
+        Uniao dos filtros dos nodes raiz, aplicada ja no emit do bus: eventos
+        que nenhum node raiz aceitaria nem entram na fila. Se algum node raiz
+        nao tem filtro, todo evento pode disparar o workflow (sem pre-filtro).
+        """
+        union: dict[tuple[str, str], EventFilter] = {}
+        for compiled in plan.nodes:
+            if compiled.inbound:
+                continue
+            if not compiled.filters:
+                return ()
+            for flt in compiled.filters:
+                union.setdefault((flt.event, flt.condition.strip()), flt)
+        return tuple(union.values())
+
+    @staticmethod
+    def _resolve_max_concurrency(workflow: WorkflowDefinition) -> int:
+        try:
+            value = int(workflow.config.get("max_concurrency", 1) or 1)
+        except (TypeError, ValueError):
+            value = 1
+        return max(1, min(value, MAX_CONCURRENCY_LIMIT))
+
+    @staticmethod
+    def _resolve_partition_fields(workflow: WorkflowDefinition) -> tuple[str, ...]:
+        raw = workflow.config.get("partition_key")
+        if isinstance(raw, str):
+            raw = [part for part in raw.replace(":", ",").split(",")]
+        if not isinstance(raw, list):
+            return DEFAULT_PARTITION_KEY
+        fields = tuple(str(item).strip() for item in raw if str(item).strip())
+        return fields or DEFAULT_PARTITION_KEY
+
+    def _partition_key(self, event: Event) -> str:
+        # "event_type" usa o tipo do evento; demais nomes vem do payload.
+        payload = event.payload if isinstance(event.payload, dict) else {}
+        values = []
+        for name in self._partition_fields:
+            value = event.type if name == "event_type" else payload.get(name)
+            if value is not None:
+                values.append(str(value))
+        return ":".join(values) if values else event.type
+
+    @staticmethod
+    def _queue_rules(workflow: WorkflowDefinition) -> tuple[QueueClassRule, ...]:
+        queue_cfg = workflow.config.get("queue")
+        raw_classes = queue_cfg.get("classes") if isinstance(queue_cfg, Mapping) else None
+        if not isinstance(raw_classes, list) or not raw_classes:
+            raw_classes = DEFAULT_QUEUE_CLASSES
+        rules = [QueueClassRule.from_dict(item) for item in raw_classes if isinstance(item, Mapping)]
+        rules = [rule for rule in rules if rule.priority_class.name]
+        rules.sort(key=lambda rule: -rule.priority_class.priority)
+        return tuple(rules)
+
+    def _build_queue_policy(self, workflow: WorkflowDefinition) -> dict[str, Any]:
+        rules = self._queue_rules(workflow)
+        queue_cfg = workflow.config.get("queue")
+        queue_cfg = queue_cfg if isinstance(queue_cfg, Mapping) else {}
+
+        def classify(event: Event) -> str:
+            for rule in rules:
+                for event_filter in rule.filters:
+                    if event_filter.matches(event):
+                        return rule.priority_class.name
+            return ""
+
+        coalesce_key = None
+        fields = queue_cfg.get("coalesce_key")
+        if isinstance(fields, str):
+            fields = [fields]
+        fields = tuple(str(item).strip() for item in fields or [] if str(item).strip())
+        if fields:
+            def coalesce_key(event: Event) -> str | None:
+                payload = event.payload if isinstance(event.payload, dict) else {}
+                values = [payload.get(name) for name in fields]
+                if all(value is None for value in values):
+                    return None
+                return "|".join([event.type, *(str(value) for value in values)])
+
+        return {
+            "classes": tuple(rule.priority_class for rule in rules),
+            "classify": classify,
+            "coalesce_key": coalesce_key,
+        }
+
+    def _claim_correlation(self, correlation: str) -> bool:
+        """True na primeira entrega de uma correlacao; False nas repetidas."""
+        with self._correlation_lock:
+            if correlation in self._recent_correlations:
+                self._events_deduplicated += 1
+                return False
+            self._recent_correlations[correlation] = None
+            if len(self._recent_correlations) > CORRELATION_WINDOW:
+                self._recent_correlations.popitem(last=False)
+        return True
 
     def _on_event(self, event: Event) -> None:
         if not self._running.is_set():
             return
+        if not self._claim_correlation(event.correlation):
+            return
         added = self._queue.put(event)
         if not added:
             logger.warning("Fila de eventos cheia, descartando evento: %s", event.type)
 
     def _event_loop(self) -> None:
+        # Despachante: so tira da fila priorizada quando ha worker livre, para
+        # que a ordem de prioridade continue valendo sob carga.
+        slots = self._slots
+        executor = self._executor
         while self._running.is_set():
-            event = self._queue.get(timeout_sec=0.5)
-            if event is None:
+            if not slots.acquire(timeout=0.5):
                 continue
+            popped = self._queue.get_timed(timeout_sec=0.5)
+            if popped is None:
+                slots.release()
+                continue
+            event, enqueued_at = popped
+            key = self._partition_key(event)
+            with self._partition_lock:
+                if key in self._active_partitions:
+                    backlog = self._partition_backlog.setdefault(key, deque())
+                    if len(backlog) >= self._backlog_limit:
+                        backlog.popleft()
+                        self._partition_dropped += 1
+                    backlog.append((event, enqueued_at))
+                    slots.release()
+                    self._queue.task_done()
+                    continue
+                self._active_partitions.add(key)
             self._queue.is_processing = True
-            event_ok = False
+            self._queue.task_done()
             try:
-                self._process_event(event)
-                event_ok = True
-            except Exception as exc:
-                with self._lock:
-                    self._last_error = str(exc)
-                logger.error("Erro no processamento de evento: %s", exc)
-            finally:
-                with self._lock:
-                    if event_ok:
-                        self._events_processed += 1
-                    else:
-                        self._events_failed += 1
-                    self._last_event_ts = time.time()
-                self._queue.is_processing = False
-                self._queue.task_done()
+                executor.submit(self._run_partition, key, event, slots)
+            except RuntimeError:
+                # Executor encerrado por stop_event_driven.
+                with self._partition_lock:
+                    self._active_partitions.discard(key)
+                slots.release()
+                return
+
+    def _run_partition(self, key: str, event: Event, slots: threading.Semaphore) -> None:
+        try:
+            while event is not None:
+                self._handle_event(event)
+                event = self._next_backlog_event(key)
+        finally:
+            slots.release()
+
+    def _next_backlog_event(self, key: str) -> Event | None:
+        """Proximo evento da particao; expirados (max_age_sec) sao descartados."""
+        while True:
+            with self._partition_lock:
+                backlog = self._partition_backlog.get(key)
+                if not backlog or not self._running.is_set():
+                    self._partition_backlog.pop(key, None)
+                    self._active_partitions.discard(key)
+                    if not self._active_partitions:
+                        self._queue.is_processing = False
+                    return None
+                event, enqueued_at = backlog.popleft()
+            if not self._queue.expired(event, enqueued_at):
+                return event
+
+    def _handle_event(self, event: Event) -> None:
+        event_ok = False
+        try:
+            self._process_event(event)
+            event_ok = True
+        except WorkflowCancelledError:
+            # Interrompido por stop_event_driven(); nao conta como falha.
+            return
+        except Exception as exc:
+            with self._lock:
+                self._last_error = str(exc)
+            logger.error("Erro no processamento de evento: %s", exc)
+        with self._lock:
+            if event_ok:
+                self._events_processed += 1
+            else:
+                self._events_failed += 1
+            self._last_event_ts = time.time()
 
     def _process_event(self, event: Event) -> None:
-        workflow = self._workflow
-        if not workflow:
+        with self._lock:
+            plan = self._plan
+            operators = self._operators
+        if plan is None:
             return
-        outputs: dict[str, dict[str, Any]] = {}
-        inbound_counts = self._inbound_counts(workflow)
-
-        for node in self._execution_order:
-            if not self._node_accepts_event(node, event):
-                continue
-
-            inputs = self._resolve_inputs(node.id, workflow, outputs)
-            if not inputs and inbound_counts.get(node.id, 0) == 0:
-                inputs = self._event_to_inputs(event)
-            if not inputs and inbound_counts.get(node.id, 0) > 0:
-                continue
-
-            node_output = self._execute_node(node, inputs, event=event)
-            outputs[node.id] = node_output
+        event_inputs = self._event_to_inputs(event)
+        self._execute_plan(
+            plan, event, lambda: event_inputs, cancel=self._cancel, operators=operators
+        )
 
-    def _node_accepts_event(self, node: FlowNode, event: Event) -> bool:
-        if not node.event_filters:
-            return True
-        filters = [EventFilter(event=f.event, condition=f.condition) for f in node.event_filters if f.event]
-        if not filters:
-            return True
-        return any(f.matches(event) for f in filters)
+    def _build_node_filters(self, node: FlowNode) -> tuple[EventFilter, ...]:
+        filters = [
+            EventFilter(event=f.event, condition=f.condition)
+            for f in node.event_filters
+            if f.event
+        ]
+        # sort estavel: empate de especificidade mantem a ordem do JSON.
+        filters.sort(key=lambda flt: pattern_specificity(flt.event), reverse=True)
+        return tuple(filters)
 
     def _validate_workflow_contract(self, workflow: WorkflowDefinition) -> None:
         errors = self._collect_workflow_contract_errors(workflow)
@@ -371,12 +1252,31 @@ class WorkflowEngine:
                 continue
 
             node_map[node_id] = node
+            cache_cfg = node.config.get("cache")
+            if cache_cfg is not None and not self._valid_cache_config(cache_cfg):
+                errors.append(
+                    f"Node '{node_id}' com config.cache invalido: use {{ttl_sec: numero > 0, key: [entradas]}}."
+                )
+            for flt in node.event_filters:
+                err = condition_error(flt.condition)
+                if err:
+                    errors.append(f"Node '{node_id}' com event_filter invalido: {err}.")
             inputs, outputs, err = self._resolve_node_ports_contract(node)
             if err:
                 errors.append(err)
                 continue
             contracts[node_id] = (inputs, outputs)
 
+        queue_cfg = workflow.config.get("queue")
+        raw_classes = queue_cfg.get("classes") if isinstance(queue_cfg, Mapping) else None
+        for idx, item in enumerate(raw_classes if isinstance(raw_classes, list) else [], start=1):
+            if not isinstance(item, Mapping) or not str(item.get("name", "")).strip():
+                errors.append(f"config.queue.classes #{idx} sem name.")
+                continue
+            err = condition_error(str(item.get("condition", "") or ""))
+            if err:
+                errors.append(f"config.queue.classes '{item.get('name')}' com condicao invalida: {err}.")
+
         for idx, conn in enumerate(workflow.connections, start=1):
             conn_id = (conn.id or "").strip() or f"conn#{idx}"
             from_node = (conn.from_node or "").strip()
@@ -404,7 +1304,12 @@ class WorkflowEngine:
             source_contract = contracts.get(from_node)
             if source_contract:
                 _, source_outputs = source_contract
-                if from_port and source_outputs and from_port not in source_outputs:
+                if (
+                    from_port
+                    and from_port != TIMEOUT_PORT
+                    and source_outputs
+                    and from_port not in source_outputs
+                ):
                     errors.append(
                         f"Conexao '{conn_id}' usa porta de saida invalida '{from_port}' "
                         f"em node '{from_node}'. Portas validas: {self._format_ports(source_outputs)}."
@@ -421,6 +1326,17 @@ class WorkflowEngine:
                     )
         return errors
 
+    @staticmethod
+    def _valid_cache_config(cache_cfg: Any) -> bool:
+        if not isinstance(cache_cfg, Mapping):
+            return False
+        try:
+            ttl = float(cache_cfg.get("ttl_sec", 0) or 0)
+        except (TypeError, ValueError):
+            return False
+        key = cache_cfg.get("key")
+        return ttl > 0 and (key is None or isinstance(key, (str, list)))
+
     def _resolve_node_ports_contract(
         self,
         node: FlowNode,
@@ -468,12 +1384,16 @@ class WorkflowEngine:
         tipo = (node_type or "").strip()
         if tipo == "start":
             return set(), {"trigger"}
+        if tipo in OPERATOR_NODE_TYPES:
+            return set(OPERATOR_INPUT_PORTS), set(OPERATOR_OUTPUT_PORTS)
         if tipo == "end":
             return {"text", "response", "input", "command", "prompt", "message"}, set()
         if tipo == "manual-input":
             return {"text", "input", "command", "prompt", "message"}, {"text"}
         if tipo == "console-output":
             return {"text", "response"}, {"text"}
+        if tipo == "chat-reply-batch":
+            return {"items", "text", "message", "user", "platform"}, {"text", "replies", "count"}
         if tipo == "obs-scene-switch":
             return {"scene", "scene_name", "text", "input", "command", "message"}, {
                 "response",
@@ -622,43 +1542,222 @@ class WorkflowEngine:
             "ok": ok,
         }
 
-    def _execute_node(
-        self,
-        node: FlowNode,
-        inputs: dict[str, Any],
-        *,
-        event: Event | None,
+    def _builtin_handlers(self) -> dict[str, NodeHandler]:
+        return {
+            "start": self._run_start,
+            "end": self._run_end,
+            "manual-input": self._run_manual_input,
+            "console-output": self._run_console_output,
+            "obs-scene-switch": self._run_obs_scene_switch,
+            "obs-source-toggle": self._run_obs_source_toggle,
+            "chat-reply-batch": self._run_chat_reply_batch,
+            **{node_type: self._run_operator for node_type in OPERATOR_NODE_TYPES},
+        }
+
+    def _run_start(
+        self, compiled: CompiledNode, inputs: Mapping[str, Any], event: Event | None
     ) -> dict[str, Any]:
-        node_type = node.type
-        config = node.config
+        return {"trigger": True}
 
-        if node_type == "start":
-            return {"trigger": True}
-        if node_type == "end":
-            return {}
-        if node_type == "manual-input":
-            text = str(config.get("inputText", "") or inputs.get("text", "")).strip()
-            return {"text": text}
-        if node_type == "console-output":
-            text = str(inputs.get("text", "") or inputs.get("response", "")).strip()
-            logger.info("Workflow console output: %s", text)
-            return {"text": text}
-        if node_type == "obs-scene-switch":
-            return self._execute_obs_scene_switch(config, inputs)
-        if node_type == "obs-source-toggle":
-            return self._execute_obs_source_toggle(config, inputs)
+    def _run_end(
+        self, compiled: CompiledNode, inputs: Mapping[str, Any], event: Event | None
+    ) -> dict[str, Any]:
+        return {}
 
-        skill_name = self._resolve_skill_name(node_type)
-        if not skill_name:
-            logger.warning("No executavel para tipo de node: %s", node_type)
-            return {}
+    def _run_manual_input(
+        self, compiled: CompiledNode, inputs: Mapping[str, Any], event: Event | None
+    ) -> dict[str, Any]:
+        text = str(compiled.node.config.get("inputText", "") or inputs.get("text", "")).strip()
+        return {"text": text}
+
+    def _run_console_output(
+        self, compiled: CompiledNode, inputs: Mapping[str, Any], event: Event | None
+    ) -> dict[str, Any]:
+        text = str(inputs.get("text", "") or inputs.get("response", "")).strip()
+        logger.info("Workflow console output: %s", text)
+        return {"text": text}
+
+    def _run_obs_scene_switch(
+        self, compiled: CompiledNode, inputs: Mapping[str, Any], event: Event | None
+    ) -> dict[str, Any]:
+        return self._execute_obs_scene_switch(compiled.node.config, inputs)
+
+    def _run_obs_source_toggle(
+        self, compiled: CompiledNode, inputs: Mapping[str, Any], event: Event | None
+    ) -> dict[str, Any]:
+        return self._execute_obs_source_toggle(compiled.node.config, inputs)
+
+    def _run_chat_reply_batch(
+        self, compiled: CompiledNode, inputs: Mapping[str, Any], event: Event | None
+    ) -> dict[str, Any]:
+        # Normalmente ligado a saida `items` de um node `batch`.
+        raw_items = inputs.get("items")
+        if not isinstance(raw_items, list):
+            raw_items = [
+                {
+                    "platform": inputs.get("platform", ""),
+                    "user": inputs.get("user", ""),
+                    "text": inputs.get("text", "") or inputs.get("message", ""),
+                }
+            ]
+        items = [ChatItem.from_dict(item) for item in raw_items if isinstance(item, Mapping)]
+        pairs = generate_batch_replies(items)
+        replies = [
+            {"platform": item.platform, "user": item.user, "text": item.text, "reply": reply}
+            for item, reply in pairs
+        ]
+        return {
+            "text": "\n".join(row["reply"] for row in replies),
+            "replies": replies,
+            "count": len(replies),
+        }
+
+    def _run_operator(
+        self, compiled: CompiledNode, inputs: Mapping[str, Any], event: Event | None
+    ) -> dict[str, Any]:
+        # Sem estado da execucao (nao deveria acontecer): repassa as entradas.
+        return dict(inputs)
+
+    @staticmethod
+    def _operator_handler(operator: StreamOperator) -> NodeHandler:
+        def call(
+            compiled: CompiledNode, inputs: Mapping[str, Any], event: Event | None
+        ) -> dict[str, Any]:
+            # {} = nada a emitir agora (downstream nao roda neste evento).
+            return operator.push(inputs, time.monotonic()) or {}
+
+        return call
+
+    @staticmethod
+    def _create_operators(plan: CompiledWorkflow) -> dict[str, StreamOperator]:
+        operators: dict[str, StreamOperator] = {}
+        for compiled in plan.nodes:
+            if compiled.stateful:
+                operator = create_operator(compiled.node.type, compiled.node.config)
+                if operator is not None:
+                    operators[compiled.node.id] = operator
+        return operators
+
+    @staticmethod
+    def _timed_operators(
+        plan: CompiledWorkflow, operators: Mapping[str, StreamOperator]
+    ) -> list[tuple[int, StreamOperator]]:
+        return [
+            (idx, operators[compiled.node.id])
+            for idx, compiled in enumerate(plan.nodes)
+            if compiled.timed and compiled.node.id in operators
+        ]
+
+    def _start_operator_timer(
+        self, plan: CompiledWorkflow, operators: Mapping[str, StreamOperator]
+    ) -> None:
+        if not self._timed_operators(plan, operators):
+            return
+        self._timer_stop = threading.Event()
+        self._timer = threading.Thread(
+            target=self._operator_timer_loop,
+            args=(plan, operators, self._timer_stop, self._cancel),
+            daemon=True,
+            name="workflow-operator-timer",
+        )
+        self._timer.start()
+
+    def _stop_operator_timer(self) -> None:
+        self._timer_stop.set()
+        if self._timer and self._timer.is_alive():
+            self._timer.join(timeout=1.5)
+        self._timer = None
+
+    def _operator_timer_loop(
+        self,
+        plan: CompiledWorkflow,
+        operators: Mapping[str, StreamOperator],
+        stop: threading.Event,
+        cancel: threading.Event,
+    ) -> None:
+        # Emite janelas/lotes/debounces vencidos mesmo sem evento novo.
+        timed = self._timed_operators(plan, operators)
+        while not stop.is_set():
+            now = time.monotonic()
+            deadlines = [op.next_deadline() for _, op in timed]
+            pending = [d for d in deadlines if d is not None]
+            wait_for = min(pending) - now if pending else 0.25
+            if stop.wait(min(max(wait_for, 0.005), 0.25)):
+                return
+            if not self._flush_operators(plan, operators, timed, time.monotonic(), cancel):
+                return
+
+    def _flush_operators(
+        self,
+        plan: CompiledWorkflow,
+        operators: Mapping[str, StreamOperator],
+        timed: list[tuple[int, StreamOperator]],
+        now: float,
+        cancel: threading.Event | None,
+    ) -> bool:
+        """Roda o downstream do que venceu ate `now`; False se foi cancelado."""
+        for idx, operator in timed:
+            for output in operator.flush_due(now):
+                try:
+                    self._run_downstream(plan, idx, output, cancel, operators)
+                    with self._lock:
+                        self._operator_flushes += 1
+                except WorkflowCancelledError:
+                    return False
+                except Exception as exc:
+                    with self._lock:
+                        self._last_error = str(exc)
+                    logger.error("Erro ao emitir operador %s: %s", plan.nodes[idx].node.id, exc)
+        return True
+
+    def _run_downstream(
+        self,
+        plan: CompiledWorkflow,
+        start_idx: int,
+        output: dict[str, Any],
+        cancel: threading.Event | None,
+        operators: Mapping[str, StreamOperator],
+    ) -> list[dict[str, Any] | None]:
+        """Roda so os descendentes de `start_idx`, com `output` como saida dele."""
+        descendants: set[int] = set()
+        stack = list(plan.nodes[start_idx].dependents)
+        while stack:
+            idx = stack.pop()
+            if idx not in descendants:
+                descendants.add(idx)
+                stack.extend(plan.nodes[idx].dependents)
+
+        ctx = _RunContext(
+            lambda: {}, timeout_sec=plan.timeout_sec, cancel=cancel, operators=operators
+        )
+        outputs: list[dict[str, Any] | None] = [None] * len(plan.nodes)
+        outputs[start_idx] = output
+        for idx in sorted(descendants):
+            if cancel is not None and cancel.is_set():
+                raise WorkflowCancelledError()
+            outputs[idx] = self._run_compiled_node(plan.nodes[idx], outputs, None, ctx)
+        return outputs
 
-        entry = self._registry.load(skill_name)
+    def _run_unsupported(
+        self, compiled: CompiledNode, inputs: Mapping[str, Any], event: Event | None
+    ) -> dict[str, Any]:
+        logger.warning("No executavel para tipo de node: %s", compiled.node.type)
+        return {}
+
+    def _run_skill(
+        self, compiled: CompiledNode, inputs: Mapping[str, Any], event: Event | None
+    ) -> dict[str, Any]:
+        node = compiled.node
+        # A entrada do registry e atualizada in-place em reload(); so recarrega
+        # aqui se o modulo nao pode ser carregado na compilacao.
+        entry = compiled.skill_entry
+        if entry is None or entry.module is None:
+            entry = self._registry.load(compiled.skill_name)
         if not entry or not entry.module:
-            logger.warning("Skill nao carregada para node %s (%s)", node.id, node_type)
+            logger.warning("Skill nao carregada para node %s (%s)", node.id, node.type)
             return {}
 
-        comando = self._pick_command(inputs, config, event)
+        comando = self._pick_command(inputs, node.config, event)
         if not comando:
             return {}
 
@@ -668,6 +1767,22 @@ class WorkflowEngine:
             "text": resposta,
         }
 
+    def _execute_node(
+        self,
+        node: FlowNode,
+        inputs: dict[str, Any],
+        *,
+        event: Event | None,
+    ) -> dict[str, Any]:
+        # Caminho sem plano (chamadas avulsas); o fluxo normal usa CompiledNode.handler.
+        handler = self._builtin_handlers().get(node.type)
+        skill_name = ""
+        if handler is None:
+            skill_name = self._resolve_skill_name(node.type)
+            handler = self._run_skill if skill_name else self._run_unsupported
+        compiled = CompiledNode(node=node, inbound=(), filters=(), handler=handler, skill_name=skill_name)
+        return handler(compiled, inputs, event)
+
     def _resolve_skill_name(self, node_type: str) -> str:
         tipo = (node_type or "").strip()
         if not tipo:
@@ -706,47 +1821,40 @@ class WorkflowEngine:
                     return value.strip()
         return ""
 
-    def _event_to_inputs(self, event: Event) -> dict[str, Any]:
+    def _event_to_inputs(self, event: Event) -> Mapping[str, Any]:
+        # Visao somente-leitura sobre o payload compartilhado (sem copiar o dict).
         payload = event.payload if isinstance(event.payload, dict) else {}
-        data = dict(payload)
-        data.setdefault("event_type", event.type)
-        data.setdefault("event_source", event.source)
-        data.setdefault("event", payload)
-        return data
+        return ChainMap(
+            payload,
+            {"event_type": event.type, "event_source": event.source, "event": payload},
+        )
 
-    def _resolve_inputs(
-        self,
-        node_id: str,
-        workflow: WorkflowDefinition,
-        outputs: dict[str, dict[str, Any]],
+    @staticmethod
+    def _collect_inputs(
+        inbound: tuple[InboundLink, ...],
+        outputs: list[dict[str, Any] | None],
     ) -> dict[str, Any]:
         inputs: dict[str, Any] = {}
-        for conn in workflow.connections:
-            if conn.to_node != node_id:
-                continue
-            upstream = outputs.get(conn.from_node)
+        for link in inbound:
+            upstream = outputs[link.source]
             if not upstream:
                 continue
+            if upstream.get("timed_out") is True:
+                if link.from_port == TIMEOUT_PORT:
+                    inputs[link.target_port] = upstream.get(TIMEOUT_PORT)
+                continue
+            if link.from_port == TIMEOUT_PORT:
+                continue
 
-            value = None
-            if conn.from_port and conn.from_port in upstream:
-                value = upstream.get(conn.from_port)
+            if link.from_port and link.from_port in upstream:
+                value = upstream.get(link.from_port)
             elif "text" in upstream:
                 value = upstream.get("text")
             else:
                 value = upstream
-
-            target_port = conn.to_port or conn.from_port or "input"
-            inputs[target_port] = value
+            inputs[link.target_port] = value
         return inputs
 
-    def _inbound_counts(self, workflow: WorkflowDefinition) -> dict[str, int]:
-        counts = {node.id: 0 for node in workflow.nodes}
-        for conn in workflow.connections:
-            if conn.to_node in counts:
-                counts[conn.to_node] += 1
-        return counts
-
     def _build_adjacency(self, workflow: WorkflowDefinition) -> dict[str, list[str]]:
         adjacency = {node.id: [] for node in workflow.nodes}
         for conn in workflow.connections:
@@ -781,6 +1889,7 @@ class WorkflowEngine:
             name=workflow.name,
             nodes=nodes,
             connections=connections,
+            config=workflow.config,
         )
 
     def _get_execution_order(self, workflow: WorkflowDefinition) -> list[FlowNode]:
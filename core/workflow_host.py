@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Mapping
+
+from core.event_bus import EventBus, event_bus
+from core.skill_registry import SkillRegistry
+from core.workflow_engine import WorkflowEngine
+
+
+logger = logging.getLogger("WorkflowHost")
+
+
+@dataclass(slots=True)
+class HostedWorkflow:
+    id: str
+    engine: WorkflowEngine
+    payload: dict[str, Any]
+    path: str
+    listen_patterns: tuple[str, ...]
+    start_node_id: str
+    started_at: float
+
+
+class WorkflowHost:
+    """
+    Roda varios workflows event-driven ao mesmo tempo.
+
+    Cada workflow tem o proprio WorkflowEngine (fila, workers, metricas e
+    ciclo de vida); todos compartilham o mesmo EventBus (indice de assinaturas)
+    e o mesmo SkillRegistry.
+    """
+
+    def __init__(
+        self,
+        *,
+        registry: SkillRegistry | None = None,
+        bus: EventBus | None = None,
+        queue_size: int = 100,
+    ):
+        self._registry = registry or SkillRegistry()
+        self._bus = bus or event_bus
+        self._queue_size = queue_size
+        self._workflows: dict[str, HostedWorkflow] = {}
+        self._lock = threading.RLock()
+
+    def start(
+        self,
+        workflow_id: str,
+        payload: Mapping[str, Any],
+        *,
+        path: str = "",
+        listen_patterns: tuple[str, ...] = ("chat.*",),
+        start_node_id: str = "",
+    ) -> HostedWorkflow:
+        """Inicia (ou reinicia, se ja rodando) o workflow `workflow_id`."""
+        wf_id = (workflow_id or "").strip()
+        if not wf_id:
+            raise ValueError("workflow_id vazio.")
+        patterns = tuple(p for p in (listen_patterns or ()) if str(p).strip()) or ("chat.*",)
+        with self._lock:
+            self.stop(wf_id)
+            engine = WorkflowEngine(
+                registry=self._registry,
+                bus=self._bus,
+                queue_size=self._queue_size,
+            )
+            engine.start_event_driven(
+                payload,
+                listen_patterns=patterns,
+                start_node_id=(start_node_id or "").strip(),
+            )
+            hosted = HostedWorkflow(
+                id=wf_id,
+                engine=engine,
+                payload=dict(payload),
+                path=path,
+                listen_patterns=patterns,
+                start_node_id=(start_node_id or "").strip(),
+                started_at=time.time(),
+            )
+            self._workflows[wf_id] = hosted
+        logger.info("Workflow '%s' iniciado (%s)", wf_id, ", ".join(patterns))
+        return hosted
+
+    def stop(self, workflow_id: str) -> bool:
+        with self._lock:
+            hosted = self._workflows.pop((workflow_id or "").strip(), None)
+        if hosted is None:
+            return False
+        hosted.engine.stop_event_driven()
+        logger.info("Workflow '%s' parado", hosted.id)
+        return True
+
+    def stop_all(self) -> int:
+        with self._lock:
+            ids = list(self._workflows)
+        return sum(1 for wf_id in ids if self.stop(wf_id))
+
+    def reload(
+        self,
+        workflow_id: str,
+        payload: Mapping[str, Any] | None = None,
+    ) -> HostedWorkflow:
+        """Reinicia o workflow com o mesmo id/patterns (e payload novo, se informado)."""
+        hosted = self.get(workflow_id)
+        if hosted is None:
+            raise KeyError(f"Workflow '{workflow_id}' nao esta rodando.")
+        return self.start(
+            hosted.id,
+            payload if payload is not None else hosted.payload,
+            path=hosted.path,
+            listen_patterns=hosted.listen_patterns,
+            start_node_id=hosted.start_node_id,
+        )
+
+    def swap(self, workflow_id: str, payload: Mapping[str, Any]) -> bool:
+        """
+        Troca o plano do workflow sem parar a fila (WorkflowEngine.swap_workflow);
+        se a config exigir, reinicia. Retorna True quando foi troca a quente.
+        """
+        hosted = self.get(workflow_id)
+        if hosted is None:
+            raise KeyError(f"Workflow '{workflow_id}' nao esta rodando.")
+        with self._lock:
+            if hosted.engine.swap_workflow(payload, start_node_id=hosted.start_node_id):
+                hosted.payload = dict(payload)
+                logger.info("Workflow '%s' atualizado a quente", hosted.id)
+                return True
+        self.reload(hosted.id, payload)
+        return False
+
+    def get(self, workflow_id: str) -> HostedWorkflow | None:
+        with self._lock:
+            return self._workflows.get((workflow_id or "").strip())
+
+    def ids(self) -> list[str]:
+        with self._lock:
+            return sorted(self._workflows)
+
+    def get_status(self) -> list[dict[str, Any]]:
+        """Uma linha por workflow, ordenada por id."""
+        with self._lock:
+            hosted_list = [self._workflows[wf_id] for wf_id in sorted(self._workflows)]
+        rows: list[dict[str, Any]] = []
+        for hosted in hosted_list:
+            row = hosted.engine.get_status()
+            row["id"] = hosted.id
+            row["path"] = hosted.path
+            row["listen_patterns"] = list(hosted.listen_patterns)
+            row["start_node_id"] = hosted.start_node_id
+            rows.append(row)
+        return rows
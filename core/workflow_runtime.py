@@ -1,21 +1,34 @@
 from __future__ import annotations
 
+import hashlib
 import json
 import logging
 import os
 import threading
+from collections import OrderedDict
 from pathlib import Path
 from typing import Any, Mapping
 
-from core.skill_registry import SkillRegistry
-from core.workflow_engine import WorkflowEngine
+from core.skill_registry import SkillRegistry, reload_generation
+from core.workflow_catalog import WorkflowCatalog
+from core.workflow_engine import CompiledWorkflow, WorkflowEngine
+from core.workflow_host import WorkflowHost
 
 
 _LOCK = threading.RLock()
 _REGISTRY = SkillRegistry()
+# _ENGINE roda execucoes lineares (run_once/validacao); workflows event-driven
+# rodam no _HOST, um engine por workflow.
 _ENGINE = WorkflowEngine(registry=_REGISTRY)
+_HOST = WorkflowHost(registry=_REGISTRY)
 _LOADED_WORKFLOW: dict[str, Any] | None = None
 _LOADED_WORKFLOW_PATH: str = ""
+_LOADED_WORKFLOW_HASH: str = ""
+# Planos compilados por (hash do conteudo, start_node_id).
+_PLAN_CACHE: OrderedDict[tuple[str, str], CompiledWorkflow] = OrderedDict()
+_PLAN_CACHE_MAX = 16
+_PLAN_CACHE_GENERATION = -1
+_PLAN_CACHE_STATS = {"hits": 0, "misses": 0, "invalidations": 0}
 logger = logging.getLogger("WorkflowRuntime")
 
 
@@ -34,6 +47,11 @@ def _templates_dir() -> Path:
     return (workflow_dir() / "templates").resolve()
 
 
+# Indice id -> arquivo (fingerprint mtime/tamanho); ver start_workflow_watcher().
+_CATALOG = WorkflowCatalog(workflow_dir)
+_HOT_SWAPS = {"swapped": 0, "restarted": 0, "failed": 0}
+
+
 def _ensure_dirs() -> None:
     workflow_dir().mkdir(parents=True, exist_ok=True)
     _templates_dir().mkdir(parents=True, exist_ok=True)
@@ -55,29 +73,62 @@ def _parse_workflow_file(path: Path) -> dict[str, Any]:
     return data
 
 
+def workflow_hash(data: Mapping[str, Any]) -> str:
+    raw = json.dumps(data, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _set_loaded_workflow(payload: dict[str, Any], path: str) -> None:
+    global _LOADED_WORKFLOW, _LOADED_WORKFLOW_PATH, _LOADED_WORKFLOW_HASH
+    _LOADED_WORKFLOW = payload
+    _LOADED_WORKFLOW_PATH = path
+    _LOADED_WORKFLOW_HASH = workflow_hash(payload)
+    invalidate_plan_cache()
+
+
+def invalidate_plan_cache() -> None:
+    with _LOCK:
+        if _PLAN_CACHE:
+            _PLAN_CACHE_STATS["invalidations"] += 1
+        _PLAN_CACHE.clear()
+
+
+def _cached_plan(
+    payload: Mapping[str, Any],
+    content_hash: str,
+    start_node_id: str,
+) -> CompiledWorkflow:
+    # O mesmo plano e entregue a execucoes concorrentes: CompiledWorkflow nao
+    # guarda estado (o engine cria o estado dos operadores a cada execucao).
+    global _PLAN_CACHE_GENERATION
+    generation = reload_generation()
+    key = (content_hash, start_node_id)
+    with _LOCK:
+        if generation != _PLAN_CACHE_GENERATION:
+            invalidate_plan_cache()
+            _PLAN_CACHE_GENERATION = generation
+        plan = _PLAN_CACHE.get(key)
+        if plan is not None:
+            _PLAN_CACHE.move_to_end(key)
+            _PLAN_CACHE_STATS["hits"] += 1
+            return plan
+        _PLAN_CACHE_STATS["misses"] += 1
+    plan = _ENGINE.compile_workflow(payload, start_node_id=start_node_id)
+    with _LOCK:
+        _PLAN_CACHE[key] = plan
+        while len(_PLAN_CACHE) > _PLAN_CACHE_MAX:
+            _PLAN_CACHE.popitem(last=False)
+    return plan
+
+
+def get_plan_cache_stats() -> dict[str, Any]:
+    with _LOCK:
+        return {**_PLAN_CACHE_STATS, "size": len(_PLAN_CACHE)}
+
+
 def list_workflows() -> list[dict[str, Any]]:
     _ensure_dirs()
-    items: list[dict[str, Any]] = []
-    root = workflow_dir()
-    for path in sorted(root.rglob("*.json")):
-        if not path.is_file():
-            continue
-        if not _is_safe_under_workflow_dir(path):
-            continue
-        try:
-            data = _parse_workflow_file(path)
-            items.append(
-                {
-                    "id": str(data.get("id", "")).strip() or path.stem,
-                    "name": str(data.get("name", "")).strip() or path.stem,
-                    "path": str(path),
-                    "nodes": len(data.get("nodes", []) or []),
-                    "connections": len(data.get("connections", []) or []),
-                }
-            )
-        except Exception:
-            continue
-    return items
+    return [entry.as_dict() for entry in _CATALOG.entries()]
 
 
 def _resolve_path(path_or_name: str) -> Path:
@@ -106,43 +157,44 @@ def load_workflow(
     path: str = "",
     data: Mapping[str, Any] | None = None,
 ) -> dict[str, Any]:
-    global _LOADED_WORKFLOW, _LOADED_WORKFLOW_PATH
+    with _LOCK:
+        payload, resolved_path = _read_workflow(workflow_id=workflow_id, path=path, data=data)
+        _set_loaded_workflow(payload, resolved_path)
+        return payload
+
+
+def _read_workflow(
+    *,
+    workflow_id: str = "",
+    path: str = "",
+    data: Mapping[str, Any] | None = None,
+) -> tuple[dict[str, Any], str]:
     _ensure_dirs()
+    if data is not None:
+        return dict(data), ""
 
-    with _LOCK:
-        if data is not None:
-            payload = dict(data)
-            _LOADED_WORKFLOW = payload
-            _LOADED_WORKFLOW_PATH = ""
-            return payload
-
-        if path:
-            resolved = _resolve_path(path)
-            payload = _parse_workflow_file(resolved)
-            _LOADED_WORKFLOW = payload
-            _LOADED_WORKFLOW_PATH = str(resolved)
-            return payload
-
-        wf_id = (workflow_id or "").strip()
-        if wf_id:
-            candidates = list_workflows()
-            chosen = None
-            for item in candidates:
-                if item.get("id") == wf_id:
-                    chosen = item
-                    break
-                if Path(item.get("path", "")).stem == wf_id:
-                    chosen = item
-                    break
-            if not chosen:
-                raise FileNotFoundError(f"Workflow '{wf_id}' nao encontrado.")
-            resolved = _resolve_path(chosen["path"])
-            payload = _parse_workflow_file(resolved)
-            _LOADED_WORKFLOW = payload
-            _LOADED_WORKFLOW_PATH = str(resolved)
-            return payload
-
-        raise ValueError("Informe workflow_id, path ou data para carregar workflow.")
+    if path:
+        resolved = _resolve_path(path)
+        return _parse_workflow_file(resolved), str(resolved)
+
+    wf_id = (workflow_id or "").strip()
+    if wf_id:
+        chosen = _CATALOG.get(wf_id)
+        if chosen is None:
+            raise FileNotFoundError(f"Workflow '{wf_id}' nao encontrado.")
+        resolved = _resolve_path(chosen.path)
+        return _parse_workflow_file(resolved), str(resolved)
+
+    raise ValueError("Informe workflow_id, path ou data para carregar workflow.")
+
+
+def _hosted_id(payload: Mapping[str, Any], path: str) -> str:
+    wf_id = str(payload.get("id", "")).strip()
+    if wf_id:
+        return wf_id
+    if path:
+        return Path(path).stem
+    return "workflow"
 
 
 def get_loaded_workflow() -> dict[str, Any] | None:
@@ -152,6 +204,12 @@ def get_loaded_workflow() -> dict[str, Any] | None:
         return dict(_LOADED_WORKFLOW)
 
 
+def get_loaded_workflow_hash() -> str:
+    """Hash do conteudo do workflow carregado ("" se nenhum)."""
+    with _LOCK:
+        return _LOADED_WORKFLOW_HASH if _LOADED_WORKFLOW is not None else ""
+
+
 def get_loaded_workflow_meta() -> dict[str, Any]:
     with _LOCK:
         if _LOADED_WORKFLOW is None:
@@ -169,6 +227,7 @@ def get_loaded_workflow_meta() -> dict[str, Any]:
             "id": str(wf.get("id", "")).strip(),
             "name": str(wf.get("name", "")).strip(),
             "path": _LOADED_WORKFLOW_PATH,
+            "hash": _LOADED_WORKFLOW_HASH,
             "nodes": len(wf.get("nodes", []) or []),
             "connections": len(wf.get("connections", []) or []),
         }
@@ -183,29 +242,94 @@ def start_workflow(
     start_node_id: str = "",
 ) -> dict[str, Any]:
     payload = load_workflow(workflow_id=workflow_id, path=path, data=data)
+    with _LOCK:
+        resolved_path = _LOADED_WORKFLOW_PATH
     patterns = tuple(p for p in (listen_patterns or ()) if str(p).strip()) or ("chat.*",)
-    _ENGINE.start_event_driven(
+    _HOST.start(
+        _hosted_id(payload, resolved_path),
         payload,
+        path=resolved_path,
         listen_patterns=patterns,
         start_node_id=(start_node_id or "").strip(),
     )
     return get_runtime_status()
 
 
+def reload_workflow(workflow_id: str) -> dict[str, Any]:
+    """Rele o arquivo (se veio de arquivo) e reinicia o workflow em execucao."""
+    hosted = _HOST.get(workflow_id)
+    if hosted is None:
+        raise KeyError(f"Workflow '{workflow_id}' nao esta rodando.")
+    payload = None
+    if hosted.path:
+        payload, _ = _read_workflow(path=hosted.path)
+    _HOST.reload(hosted.id, payload)
+    return get_runtime_status()
+
+
+def _on_workflow_files_changed(paths: list[str]) -> None:
+    """Callback do watcher: recompila e troca a quente os workflows afetados."""
+    changed = {str(Path(p).resolve()) for p in paths}
+    for row in _HOST.get_status():
+        path = row.get("path", "")
+        if not path or str(Path(path).resolve()) not in changed:
+            continue
+        wf_id = row.get("id", "")
+        try:
+            payload, _ = _read_workflow(path=path)
+            swapped = _HOST.swap(wf_id, payload)
+            with _LOCK:
+                _HOT_SWAPS["swapped" if swapped else "restarted"] += 1
+        except Exception as exc:
+            # Arquivo invalido ou removido: o plano atual continua rodando.
+            with _LOCK:
+                _HOT_SWAPS["failed"] += 1
+            logger.warning("Workflow '%s' nao recarregado (%s): %s", wf_id, path, exc)
+
+    with _LOCK:
+        loaded_path = _LOADED_WORKFLOW_PATH
+    if loaded_path and str(Path(loaded_path).resolve()) in changed:
+        try:
+            load_workflow(path=loaded_path)
+        except Exception as exc:
+            logger.warning("Workflow carregado nao recarregado (%s): %s", loaded_path, exc)
+
+
+def start_workflow_watcher(interval_sec: float | None = None) -> str:
+    """Liga o watcher do diretorio de workflows; retorna `inotify` ou `polling`."""
+    _ensure_dirs()
+    if interval_sec is None:
+        try:
+            interval_sec = float(os.getenv("LUNA_WORKFLOW_WATCH_INTERVAL_SEC", "2") or 2)
+        except ValueError:
+            interval_sec = 2.0
+    mode = _CATALOG.watch(_on_workflow_files_changed, interval_sec=interval_sec)
+    logger.info("Watcher de workflows ativo (%s): %s", mode, workflow_dir())
+    return mode
+
+
+def stop_workflow_watcher() -> None:
+    _CATALOG.stop_watching()
+
+
+def get_catalog_stats() -> dict[str, Any]:
+    with _LOCK:
+        hot_swaps = dict(_HOT_SWAPS)
+    return {**_CATALOG.stats(), **hot_swaps}
+
+
 def run_loaded_workflow_once(
     *,
     start_node_id: str = "",
     initial_inputs: Mapping[str, Any] | None = None,
 ) -> dict[str, dict[str, Any]]:
-    payload = get_loaded_workflow()
+    with _LOCK:
+        payload = _LOADED_WORKFLOW
+        content_hash = _LOADED_WORKFLOW_HASH
     if payload is None:
         raise ValueError("Nenhum workflow carregado.")
-    outputs = _ENGINE.execute_linear(
-        payload,
-        start_node_id=(start_node_id or "").strip(),
-        initial_inputs=initial_inputs or {},
-    )
-    return outputs
+    plan = _cached_plan(payload, content_hash, (start_node_id or "").strip())
+    return _ENGINE.execute_plan(plan, initial_inputs=initial_inputs or {})
 
 
 def run_workflow_once(
@@ -216,13 +340,8 @@ def run_workflow_once(
     start_node_id: str = "",
     initial_inputs: Mapping[str, Any] | None = None,
 ) -> dict[str, Any]:
-    payload = load_workflow(workflow_id=workflow_id, path=path, data=data)
-    outputs = _ENGINE.execute_linear(
-        payload,
-        start_node_id=(start_node_id or "").strip(),
-        initial_inputs=initial_inputs or {},
-    )
-    return outputs
+    load_workflow(workflow_id=workflow_id, path=path, data=data)
+    return run_loaded_workflow_once(start_node_id=start_node_id, initial_inputs=initial_inputs)
 
 
 def validate_workflow(
@@ -240,14 +359,44 @@ def validate_workflow(
     return report
 
 
-def stop_workflow() -> dict[str, Any]:
-    _ENGINE.stop_event_driven()
+def stop_workflow(workflow_id: str = "") -> dict[str, Any]:
+    """Para o workflow `workflow_id` ou, se vazio, todos os workflows em execucao."""
+    wf_id = (workflow_id or "").strip()
+    if wf_id:
+        if not _HOST.stop(wf_id):
+            raise KeyError(f"Workflow '{wf_id}' nao esta rodando.")
+    else:
+        _HOST.stop_all()
     return get_runtime_status()
 
 
 def get_runtime_status() -> dict[str, Any]:
-    status = _ENGINE.get_status()
+    rows = _HOST.get_status()
+    running = [row for row in rows if row.get("status") == "running"]
+    latest = max(rows, key=lambda row: row.get("started_at", 0.0), default={})
+    last_errors = [row.get("last_error", "") for row in rows if row.get("last_error")]
+    processed = sum(int(row.get("events_processed", 0) or 0) for row in rows)
+    failed = sum(int(row.get("events_failed", 0) or 0) for row in rows)
+    # Campos de topo agregados (compat com o formato de workflow unico).
+    status: dict[str, Any] = {
+        "status": "running" if running else "idle",
+        "workflow_id": latest.get("workflow_id", ""),
+        "workflow_name": latest.get("workflow_name", ""),
+        "started_at": latest.get("started_at", 0.0),
+        "last_error": last_errors[-1] if last_errors else "",
+        "queue_size": sum(int(row.get("queue_size", 0) or 0) for row in rows),
+        "queue_dropped": sum(int(row.get("queue_dropped", 0) or 0) for row in rows),
+        "queue_processing": any(row.get("queue_processing") for row in rows),
+        "events_processed": processed,
+        "events_failed": failed,
+        "events_total": processed + failed,
+        "last_event_ts": max((row.get("last_event_ts", 0.0) for row in rows), default=0.0),
+        "running_count": len(running),
+        "workflows": rows,
+    }
     status["loaded_workflow"] = get_loaded_workflow_meta()
+    status["plan_cache"] = get_plan_cache_stats()
+    status["catalog"] = get_catalog_stats()
     return status
 
 
@@ -256,6 +405,10 @@ def _env_patterns(raw: str) -> tuple[str, ...]:
     return values or ("chat.*",)
 
 
+def _env_list(raw: str) -> list[str]:
+    return [item.strip() for item in (raw or "").split(",") if item.strip()]
+
+
 def autostart_workflow_from_env() -> dict[str, Any]:
     enabled = os.getenv("LUNA_WORKFLOW_AUTOSTART", "0").strip() == "1"
     workflow_id = os.getenv("LUNA_WORKFLOW_AUTO_ID", "").strip()
@@ -279,6 +432,12 @@ def autostart_workflow_from_env() -> dict[str, Any]:
     if not enabled:
         return result
 
+    if os.getenv("LUNA_WORKFLOW_WATCH", "0").strip() == "1":
+        try:
+            result["watch_mode"] = start_workflow_watcher()
+        except Exception as exc:
+            logger.warning("Falha ao iniciar watcher de workflows: %s", exc)
+
     if not workflow_id and not path:
         msg = (
             "LUNA_WORKFLOW_AUTOSTART=1, mas nenhum workflow foi informado. "
@@ -288,18 +447,26 @@ def autostart_workflow_from_env() -> dict[str, Any]:
         logger.warning(msg)
         return result
 
-    try:
-        status = start_workflow(
-            workflow_id=workflow_id,
-            path=path,
-            listen_patterns=listen_patterns,
-            start_node_id=start_node_id,
-        )
-        result["started"] = True
-        result["status"] = status
-        return result
-    except Exception as exc:
-        result["error"] = str(exc)
-        logger.warning("Falha no autostart de workflow: %s", exc)
-        return result
+    # IDs/caminhos separados por virgula sobem varios workflows juntos.
+    targets = [{"workflow_id": item} for item in _env_list(workflow_id)]
+    targets += [{"path": item} for item in _env_list(path)]
+    errors: list[str] = []
+    started: list[str] = []
+    for target in targets:
+        try:
+            start_workflow(
+                **target,
+                listen_patterns=listen_patterns,
+                start_node_id=start_node_id,
+            )
+            started.append(next(iter(target.values())))
+        except Exception as exc:
+            errors.append(f"{next(iter(target.values()))}: {exc}")
+            logger.warning("Falha no autostart de workflow %s: %s", target, exc)
+
+    result["started"] = bool(started)
+    result["started_workflows"] = started
+    result["status"] = get_runtime_status()
+    result["error"] = "; ".join(errors)
+    return result
 
@@ -8,11 +8,21 @@ import time
 import sys
 import json
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+try:
+    from core.event_bridge import EventBridgeClient, bridge_enabled
+except Exception:
+    EventBridgeClient = None
+
+    def bridge_enabled():
+        return False
+
 class RadialMenuEel:
     def __init__(self):
         self.menu_visible = False
         self.arquivo_sinal = os.path.join(tempfile.gettempdir(), "luna_menu_open.signal")
         self.ultima_verificacao = 0
+        self.bridge = None
         
         # Caminho da pasta web
         self.web_folder = os.path.join(os.path.dirname(__file__), 'web')
@@ -43,6 +53,13 @@ class RadialMenuEel:
     def execute_command(self, cmd):
         """Chamado pelo JavaScript quando clica em botão"""
         print(f"🎯 Comando: {cmd}")
+        if self.bridge is not None:
+            try:
+                self.bridge.publish("ui.menu.command", {"command": cmd}, source="radial_menu")
+                return True
+            except Exception as e:
+                print(f"⚠️ Event bridge indisponivel, usando clipboard: {e}")
+                self.bridge = None
         pyperclip.copy(f"@menu:{cmd}")
         return True
     
@@ -102,6 +119,33 @@ class RadialMenuEel:
             
             time.sleep(0.2)
     
+    def escutar_event_bridge(self):
+        """Recebe 'ui.menu.open' pelo event bridge; volta ao arquivo de sinal se falhar"""
+        try:
+            client = EventBridgeClient().connect()
+            client.subscribe(["ui.menu.open"])
+            self.bridge = client
+            print("🔌 Conectado ao event bridge da Luna")
+        except Exception as e:
+            print(f"⚠️ Event bridge indisponivel ({e}); usando arquivo de sinal")
+            self.verificar_comando_sinal()
+            return
+
+        def _on_event(event):
+            try:
+                os.remove(self.arquivo_sinal)
+            except OSError:
+                pass
+            print("🎯 Sinal recebido pelo event bridge! Abrindo menu...")
+            self.abrir_menu()
+
+        try:
+            client.listen(_on_event)
+        except Exception as e:
+            print(f"⚠️ Event bridge desconectado ({e}); usando arquivo de sinal")
+            self.bridge = None
+            self.verificar_comando_sinal()
+
     def abrir_menu(self):
         """Abre a janela do menu"""
         if not self.menu_visible:
@@ -113,7 +157,10 @@ class RadialMenuEel:
         
         # Thread para verificar arquivo de sinal
         print("🎤 Iniciando monitoramento de sinais...")
-        sinal_thread = threading.Thread(target=self.verificar_comando_sinal, daemon=True)
+        alvo = self.verificar_comando_sinal
+        if EventBridgeClient is not None and bridge_enabled():
+            alvo = self.escutar_event_bridge
+        sinal_thread = threading.Thread(target=alvo, daemon=True)
         sinal_thread.start()
         
         print("\n✅ MENU PRONTO!")
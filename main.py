@@ -1,14 +1,17 @@
 ﻿from core.voice import ouvir, falar
-from core.intent import detectar_intencao
+from core.command_context import CommandContext
 from core.command_orchestrator import processar_comando_orquestrado
 from core.workflow_runtime import autostart_workflow_from_env
 from core.realtime_panel import iniciar_painel, atualizar_estado
 from core.chat_ingest import start_chat_ingest
+from core.event_bridge import start_event_bridge_from_env
+from core.event_bus import event_bus
 from core.push_to_talk import iniciar_push_to_talk, parar_push_to_talk
 from config.state import STATE
 from config.env import init_env
 import sys
 import signal
+import threading
 import subprocess
 import pyperclip
 import logging
@@ -38,8 +41,7 @@ _workflow_autostart = autostart_workflow_from_env()
 if _workflow_autostart.get("enabled"):
     if _workflow_autostart.get("started"):
         wf_ref = (
-            _workflow_autostart.get("workflow_id")
-            or _workflow_autostart.get("path")
+            ", ".join(_workflow_autostart.get("started_workflows") or ())
             or "(workflow)"
         )
         patterns = ", ".join(_workflow_autostart.get("listen_patterns") or ())
@@ -50,6 +52,10 @@ if _workflow_autostart.get("enabled"):
 
 start_chat_ingest()
 
+_event_bridge = start_event_bridge_from_env()
+if _event_bridge:
+    status(f"🔌 Event bridge ativo em {_event_bridge.address}")
+
 
 def encerrar(sig=None, frame=None):
     status("Encerrando a Luna...")
@@ -74,6 +80,14 @@ signal.signal(signal.SIGINT, encerrar)
 if hasattr(signal, "SIGTERM"):
     signal.signal(signal.SIGTERM, encerrar)
 
+
+def solicitar_encerramento():
+    # sys.exit fora da thread principal (callback do bus/PTT) so mata aquela
+    # thread; o sinal faz encerrar() rodar na thread principal.
+    if threading.current_thread() is threading.main_thread():
+        encerrar()
+    signal.raise_signal(getattr(signal, "SIGTERM", signal.SIGINT))
+
 if os.getenv("LUNA_VISION_AUTO_ENABLED", "1") == "1":
     try:
         from skills.vision import iniciar_visao_automatica_sempre
@@ -114,12 +128,24 @@ status("🟢 LUNA ONLINE")
 PTT_ENABLED = os.getenv("LUNA_PTT_ENABLED", "0") == "1"
 
 
+# Voz/PTT e menu (thread do event bus) chegam aqui ao mesmo tempo; STATE e TTS
+# nao sao thread-safe, entao um comando por vez.
+_COMMAND_LOCK = threading.Lock()
+
+
 def handle_command(cmd: str):
+    with _COMMAND_LOCK:
+        _handle_command(cmd)
+
+
+def _handle_command(cmd: str):
     if not cmd:
         return
 
-    if "encerrar" in cmd.lower():
-        encerrar()
+    ctx = CommandContext.from_text(cmd, source="voice")
+    if "encerrar" in ctx.lower:
+        solicitar_encerramento()
+        return
 
     em_espera = (
         STATE.esperando_nome_sequencia
@@ -130,19 +156,20 @@ def handle_command(cmd: str):
     intent = None
     if not em_espera:
         status("🧠 Processando intencao...")
-        intent = detectar_intencao(cmd)
+        ctx = ctx.classified(raw=True)
+        intent = ctx.intent
         if intent:
             logger.info("Intent detectada", extra={"intent": intent})
 
         if not intent and STATE.get_modo_ativacao() == "assistente":
-            if not cmd.lower().startswith("luna"):
+            if not ctx.addressed:
                 status("Nenhuma intencao reconhecida")
                 return
     else:
         status("✍️ Modo direto: capturando dados da sequencia...")
 
     try:
-        resposta = processar_comando_orquestrado(cmd, intent, source="voice")
+        resposta = processar_comando_orquestrado(cmd, intent, source="voice", context=ctx)
     except Exception:
         logger.warning("Falha ao processar comando")
         resposta = "Tive um problema ao processar isso. Tenta de novo?"
@@ -160,6 +187,22 @@ def handle_command(cmd: str):
         status("Nenhuma resposta gerada")
 
 
+def _on_menu_command(event):
+    cmd = str((event.payload or {}).get("command") or "").strip()
+    if cmd:
+        status(f"📌 Comando via menu: {cmd}")
+        handle_command(cmd)
+
+
+# Menu radial via event bridge (sem depender do clipboard).
+event_bus.subscribe(
+    "ui.menu.command",
+    _on_menu_command,
+    subscriber_id="main",
+    mode="async",
+    max_pending=5,
+)
+
 try:
     if PTT_ENABLED:
         STATE.set_modo_ativacao("vtuber")
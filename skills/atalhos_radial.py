@@ -2,6 +2,8 @@
 import os
 import tempfile
 
+from core.event_bus import emit_event
+
 
 SKILL_INFO = {
     "nome": "Atalhos Radial",
@@ -20,6 +22,8 @@ def inicializar():
 
 def executar(comando: str) -> str:
     """Envia sinal para abrir o menu."""
+    # Menu conectado ao event bridge recebe na hora; o arquivo fica de fallback.
+    emit_event("ui.menu.open", {}, source="atalhos_radial")
     arquivo_sinal = os.path.join(tempfile.gettempdir(), "luna_menu_open.signal")
     try:
         with open(arquivo_sinal, "w", encoding="utf-8") as f:
@@ -14,7 +14,6 @@ from google.genai import types
 import logging
 import yaml
 import pyperclip
-import unicodedata
 import re
 
 from config.env import init_env
@@ -23,6 +22,7 @@ from core import memory
 from core.prompt_injector import PromptSection, build_prompt, build_temperamento_section
 from core.realtime_panel import atualizar_estado
 from core.http_client import SESSION
+from core.intent import normalizar_texto
 
 
 init_env()
@@ -67,9 +67,17 @@ def executar(comando: str) -> str:
     msg = (comando or "").strip()
     if not msg:
         return "Diz ai."
+    return _responder(_injetar_clipboard_se_necessario(msg))
 
-    msg = _injetar_clipboard_se_necessario(msg)
 
+def executar_contexto(ctx) -> str:
+    """Entrada do router com CommandContext: reaproveita a forma ja normalizada."""
+    if not ctx.clean:
+        return "Diz ai."
+    return _responder(_injetar_clipboard_se_necessario(ctx.clean, ctx.norm))
+
+
+def _responder(msg: str) -> str:
     memoria = _tratar_memoria(msg)
     if memoria:
         return memoria
@@ -96,14 +104,9 @@ def _tratar_memoria(msg: str) -> Optional[str]:
     return None
 
 
-def _injetar_clipboard_se_necessario(msg: str) -> str:
-    msg_lower = msg.lower().strip()
-    msg_norm = (
-        unicodedata.normalize("NFKD", msg_lower)
-        .encode("ascii", "ignore")
-        .decode("ascii")
-    )
-    msg_norm = msg_norm.replace("luna", "").strip()
+def _injetar_clipboard_se_necessario(msg: str, msg_norm: Optional[str] = None) -> str:
+    if msg_norm is None:
+        msg_norm = normalizar_texto(msg.lower().strip()).replace("luna", "").strip()
     gatilhos = [
         "o que e isso",
         "o que e isso?",
@@ -1,10 +1,11 @@
 # skills/price.py
 import logging
 import os
-import unicodedata
 
 import requests
 
+from core.intent import normalizar_texto
+
 
 SKILL_INFO = {
     "nome": "Price",
@@ -33,7 +34,15 @@ def inicializar():
 
 def executar(comando: str) -> str:
     """Função principal chamada pelo Router."""
-    cripto_alvo = extrair_nome_cripto(comando)
+    return _responder(extrair_nome_cripto(comando))
+
+
+def executar_contexto(ctx) -> str:
+    """Entrada com CommandContext: mesmo texto (sem "luna") que executar() recebe."""
+    return _responder(extrair_nome_cripto(ctx.clean))
+
+
+def _responder(cripto_alvo: str | None) -> str:
     if not cripto_alvo:
         return "Você não disse qual moeda quer. Eu não leio mentes, pelo menos não sem cobrar extra."
 
@@ -66,8 +75,7 @@ CRYPTO_MAP = {
 
 def extrair_nome_cripto(frase: str) -> str | None:
     frase = (frase or "").lower().replace("luna", "").strip()
-    texto = unicodedata.normalize("NFD", frase)
-    texto = texto.encode("ascii", "ignore").decode("utf-8")
+    texto = normalizar_texto(frase, "NFD")
     texto = "".join(ch if ch.isalnum() or ch.isspace() else " " for ch in texto)
 
     remover = [
@@ -45,8 +45,15 @@ def inicializar():
 
 def executar(comando: str) -> str:
     """Função principal que gerencia o fluxo de sequências."""
-    cmd = (comando or "").lower().replace("luna", "").strip()
+    return _processar((comando or "").lower().replace("luna", "").strip())
 
+
+def executar_contexto(ctx) -> str:
+    """Entrada com CommandContext: `ctx.clean` já vem minúsculo e sem "luna"."""
+    return _processar(ctx.clean)
+
+
+def _processar(cmd: str) -> str:
     if STATE.esperando_nome_sequencia:
         return finalizar_salvamento(cmd)
 